@@ -1,19 +1,20 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
 import sys
-import time
 import threading
-import queue
+import time
 import socket
 import json
-import serial.tools.list_ports
 
 # Import the run functions from our modules
+# (flarm_client and pyserial are imported only when FLARM input is used)
 from modules import adsb_client
-from modules import flarm_client
 from modules import broadcaster
 from modules import sample_traffic_generator
+from modules import process_worker
+from modules.ring_buffer import RingBuffer
 # gdl90 module is used by broadcaster, no direct import needed here usually
 
 DEFAULT_DUMP1090_HOST = '127.0.0.1'
@@ -21,9 +22,12 @@ DEFAULT_DUMP1090_PORT = 30002
 DEFAULT_SERIAL_BAUD = 38400 # Common FLARM baud rate
 DEFAULT_UDP_PORT = 4000
 DEFAULT_UDP_BROADCAST_IP = '255.255.255.255' # Standard broadcast address
+STATS_INTERVAL = 10.0 # Seconds between queue drop reports
+SHUTDOWN_TIMEOUT = 5.0 # Total seconds to wait for all workers to stop
 
 def list_serial_ports():
     """List available serial ports."""
+    import serial.tools.list_ports
     ports = serial.tools.list_ports.comports()
     if not ports:
         print("No serial ports found.")
@@ -33,6 +37,40 @@ def list_serial_ports():
         print(f"  {i+1}. {port.device} - {port.description} ({port.hwid})")
     return [port.device for port in ports]
 
+def set_thread_affinity(cpu, name):
+    """
+    Pins the calling thread to a single CPU core (Linux only).
+
+    sched_setaffinity with pid 0 applies to the calling thread, so this must
+    be invoked from inside the thread being pinned. Silently skipped on
+    platforms without sched_setaffinity.
+    """
+    if cpu is None or not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        os.sched_setaffinity(0, {cpu})
+        print(f"  {name} pinned to CPU {cpu}")
+    except (OSError, ValueError) as e:
+        print(f"  Warning: Could not pin {name} to CPU {cpu}: {e}")
+
+def worker_target(target, name, stop_event, cpu=None):
+    """
+    Wraps a worker thread target.
+
+    The wrapped thread pins itself to ``cpu`` on entry (if given) and sets
+    ``stop_event`` when it exits, so the main thread is notified of a dead
+    worker immediately instead of polling is_alive().
+    """
+    def run(*args):
+        set_thread_affinity(cpu, name)
+        try:
+            target(*args)
+        finally:
+            if not stop_event.is_set():
+                print(f"!!! Thread {name} has stopped unexpectedly. Initiating shutdown. !!!")
+                stop_event.set()
+    return run
+
 def main():
     parser = argparse.ArgumentParser(description="GDL90 Broadcaster for ADS-B and FLARM data.")
 
@@ -43,8 +81,10 @@ def main():
                         help=f"Port number for dump1090 raw feed (default: {DEFAULT_DUMP1090_PORT})")
 
     # FLARM Source Arguments
-    parser.add_argument('--serial-port', type=str, required=True,
+    parser.add_argument('--serial-port', type=str,
                         help="Serial port device for FLARM input (e.g., /dev/ttyUSB0, COM3). Use --list-ports to see available ports.")
+    parser.add_argument('--no-flarm', action='store_true',
+                        help="Run without FLARM input (implied by --serial-port /dev/null)")
     parser.add_argument('--serial-baud', type=int, default=DEFAULT_SERIAL_BAUD,
                         help=f"Baud rate for the serial port (default: {DEFAULT_SERIAL_BAUD})")
 
@@ -52,7 +92,9 @@ def main():
     parser.add_argument('--udp-port', type=int, default=DEFAULT_UDP_PORT,
                         help=f"UDP port for GDL90 broadcast (default: {DEFAULT_UDP_PORT})")
     parser.add_argument('--udp-broadcast-ip', default='255.255.255.255', help='UDP broadcast IP address (default: 255.255.255.255)')
-    parser.add_argument('--interface', type=str, help='Network interface to bind to (e.g., eth0, wlan0)')
+    parser.add_argument('--interface', type=str, nargs='+', help='Network interface(s) to broadcast on (e.g., eth0 wlan0); one socket per interface')
+    parser.add_argument('--udp-burst', type=int, default=broadcaster.DEFAULT_UDP_BURST,
+                        help=f"Max queued messages drained per broadcaster loop, before heartbeat/ownship work runs (default: {broadcaster.DEFAULT_UDP_BURST})")
 
     # Add spoofing arguments
     spoof_group = parser.add_argument_group('GPS Spoofing Options')
@@ -66,6 +108,22 @@ def main():
     traffic_group.add_argument('--sample-traffic-distance', type=float, default=5.0,
                              help='Distance (in nautical miles) for sample traffic pattern (default: 5.0)')
 
+    # CPU Affinity Options
+    # Pinning keeps each long-lived worker on one core, avoiding scheduler
+    # migrations and keeping its cache warm (e.g. away from the core servicing
+    # RTL-SDR USB interrupts). On multi-socket/NUMA hosts, pick cores on the
+    # same node as the network interface; the Pi has a single node.
+    affinity_group = parser.add_argument_group('CPU Affinity Options (Linux only)')
+    affinity_group.add_argument('--adsb-cpu', type=int, help='CPU core to pin the ADS-B client thread to')
+    affinity_group.add_argument('--flarm-cpu', type=int, help='CPU core to pin the FLARM client thread to')
+    affinity_group.add_argument('--broadcaster-cpu', type=int, help='CPU core to pin the GDL90 broadcaster thread to')
+    affinity_group.add_argument('--traffic-cpu', type=int, help='CPU core to pin the sample traffic generator thread to')
+
+    # Process Options
+    process_group = parser.add_argument_group('Process Options')
+    process_group.add_argument('--adsb-process', action='store_true',
+                               help='Decode ADS-B in a separate process (its own GIL and core) instead of a thread')
+
     # Utility Arguments
     parser.add_argument('--list-ports', action='store_true',
                         help="List available serial ports and exit.")
@@ -76,9 +134,17 @@ def main():
         list_serial_ports()
         sys.exit(0)
 
+    if args.serial_port == os.devnull:
+        args.no_flarm = True
+    if not args.serial_port and not args.no_flarm:
+        parser.error("--serial-port is required unless --no-flarm is given")
+
     print("Starting GDL90 Broadcaster...")
     print(f"  ADS-B Source: {args.dump1090_host}:{args.dump1090_port}")
-    print(f"  FLARM Source: {args.serial_port} @ {args.serial_baud} baud")
+    if args.no_flarm:
+        print("  FLARM Source: Disabled")
+    else:
+        print(f"  FLARM Source: {args.serial_port} @ {args.serial_baud} baud")
     print(f"  GDL90 Output: UDP Broadcast to {args.udp_broadcast_ip}:{args.udp_port}")
     
     if args.generate_sample_traffic:
@@ -87,32 +153,44 @@ def main():
     print("Press Ctrl+C to stop.")
 
     # --- Thread Setup ---
-    data_queue = queue.Queue(maxsize=1000) # Limit queue size to prevent memory issues
+    # Lock-free-consumer MPSC ring shared by all client threads and the broadcaster.
+    # Producer contract: clients must never block on it. They call
+    # data_queue.put_nowait(item) (or push_many) and ignore queue.Full; the
+    # ring counts the drop in data_queue.dropped, which is reported below.
+    # Limit queue size to prevent memory issues; updates for an aircraft that is
+    # still queued are merged into its pending record rather than taking a slot
+    data_queue = RingBuffer(maxsize=1000, coalesce_key=broadcaster.traffic_coalesce_key)
     stop_event = threading.Event()
 
     threads = []
 
-    # ADS-B Client Thread
+    # ADS-B Client Thread (or, with --adsb-process, the thread that forwards
+    # records from the ADS-B client process; the process is pinned instead)
+    adsb_target, adsb_cpu = adsb_client.run_client, args.adsb_cpu
+    if args.adsb_process:
+        adsb_target, adsb_cpu = process_worker.process_target(adsb_client.run_client, args.adsb_cpu), None
     adsb_thread = threading.Thread(
-        target=adsb_client.run_client,
+        target=worker_target(adsb_target, "ADS-B Client", stop_event, adsb_cpu),
         args=(args, data_queue, stop_event),
         name="ADS-B Client",
         daemon=True # Daemon threads exit when the main program exits
     )
     threads.append(adsb_thread)
 
-    # FLARM Client Thread
-    flarm_thread = threading.Thread(
-        target=flarm_client.run_client,
-        args=(args, data_queue, stop_event),
-        name="FLARM Client",
-        daemon=True
-    )
-    threads.append(flarm_thread)
+    # FLARM Client Thread (pulls in pyserial, so only imported when used)
+    if not args.no_flarm:
+        from modules import flarm_client
+        flarm_thread = threading.Thread(
+            target=worker_target(flarm_client.run_client, "FLARM Client", stop_event, args.flarm_cpu),
+            args=(args, data_queue, stop_event),
+            name="FLARM Client",
+            daemon=True
+        )
+        threads.append(flarm_thread)
 
     # Broadcaster Thread
     broadcast_thread = threading.Thread(
-        target=broadcaster.run_broadcaster,
+        target=worker_target(broadcaster.run_broadcaster, "GDL90 Broadcaster", stop_event, args.broadcaster_cpu),
         args=(args, data_queue, stop_event),
         name="GDL90 Broadcaster",
         daemon=True
@@ -122,7 +200,7 @@ def main():
     # Sample Traffic Generator Thread (if enabled)
     if args.generate_sample_traffic:
         sample_traffic_thread = threading.Thread(
-            target=sample_traffic_generator.run_generator,
+            target=worker_target(sample_traffic_generator.run_generator, "Sample Traffic Generator", stop_event, args.traffic_cpu),
             args=(args, data_queue, stop_event),
             name="Sample Traffic Generator",
             daemon=True
@@ -136,33 +214,32 @@ def main():
         print(f"  Started {thread.name}")
 
     # --- Main Loop ---
-    # Keep the main thread alive to handle signals (like Ctrl+C)
-    # and potentially monitor thread health.
+    # Keep the main thread alive to handle signals (like Ctrl+C).
+    # Workers set stop_event when they exit, so there is nothing to poll:
+    # just sleep until shutdown is requested or a worker dies, waking every
+    # STATS_INTERVAL to report any queue drops.
 
     try:
-        while not stop_event.is_set():
-            # Check if any thread has died unexpectedly
-            all_alive = True
-            for thread in threads:
-                if not thread.is_alive():
-                    print(f"!!! Thread {thread.name} has stopped unexpectedly. Initiating shutdown. !!!")
-                    all_alive = False
-                    break
-            if not all_alive:
-                stop_event.set() # Signal other threads to stop
-                break
-
-            time.sleep(1) # Check thread health every second
+        reported_drops = 0
+        while not stop_event.wait(STATS_INTERVAL):
+            dropped = data_queue.dropped
+            if dropped != reported_drops:
+                print(f"Warning: Data queue full, dropped {dropped - reported_drops} messages "
+                      f"in the last {STATS_INTERVAL:.0f}s ({dropped} total)")
+                reported_drops = dropped
 
     except KeyboardInterrupt:
         print("\nCtrl+C detected. Stopping threads gracefully...")
         stop_event.set()
-        # Wait for threads to finish
+        # Wait for threads to finish. Workers wait on stop_event rather than
+        # sleeping, so they normally exit within one loop iteration; the
+        # timeout is shared so a stuck worker can't multiply the wait.
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
         for thread in threads:
             # Only join threads that were actually started and might still be running
             if thread.is_alive():
                 print(f"  Waiting for {thread.name} to stop...")
-                thread.join(timeout=5) # Give threads a chance to exit cleanly
+                thread.join(timeout=max(0, deadline - time.monotonic())) # Give threads a chance to exit cleanly
                 if thread.is_alive():
                     print(f"  Warning: {thread.name} did not stop within timeout.")
         print("Threads stopped.")
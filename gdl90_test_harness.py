@@ -3,7 +3,7 @@
 GDL90 Test Harness: Run broadcaster (with sample traffic) and receiver together for integration testing.
 
 Usage:
-    python3 gdl90_test_harness.py [--location surfers_paradise] [--port 4000] [--interface eth0] [--distance 5.0] [--verbose]
+    python3 gdl90_test_harness.py [--location surfers_paradise] [--port 4000] [--interface eth0] [--distance 5.0] [--verbose] [--log-file harness.log]
 """
 
 import argparse
@@ -13,22 +13,57 @@ import signal
 import sys
 import os
 
+RESET = b'\033[0m'
+READ_SIZE = 8192
+
 def stream_output(proc, prefix, color):
+    """
+    Copies a child's output to our stdout, prefixing and colouring each line.
+
+    Reads the pipe in large blocks and writes each block of complete lines
+    with a single write, rather than one readline() and write() per line.
+    """
+    fd = proc.stdout.fileno()
+    out = sys.stdout.buffer
+    head = color.encode() + prefix.encode()
+    newline_prefix = b'\n' + prefix.encode()
+    pending = bytearray()
     try:
-        for line in iter(proc.stdout.readline, b''):
-            if not line:
+        while True:
+            chunk = os.read(fd, READ_SIZE)
+            if not chunk:
                 break
-            sys.stdout.write(f"{color}{prefix}{line.decode(errors='replace')}\033[0m")
-            sys.stdout.flush()
+            pending += chunk
+            if b'\n' not in chunk:
+                continue
+            complete, _, tail = pending.rpartition(b'\n')
+            out.write(head + complete.replace(b'\n', newline_prefix) + b'\n' + RESET)
+            out.flush()
+            pending = bytearray(tail)
+        if pending:
+            out.write(head + pending.replace(b'\n', newline_prefix) + b'\n' + RESET)
+            out.flush()
     except Exception as e:
         sys.stderr.write(f"\033[91m[HARNESS ERROR] {prefix} output error: {e}\033[0m\n")
 
-def run_process(cmd, prefix, color):
+def run_process(cmd, prefix, color, log_fd=None):
+    """
+    Starts a child process.
+
+    By default its output is piped back and echoed with a coloured prefix by
+    a stream_output thread. If ``log_fd`` is given, the child writes straight
+    to that (O_APPEND) file instead: no pipe, no reader thread and no copy
+    through the harness, which matters for --verbose runs.
+    """
+    if log_fd is not None:
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        proc = subprocess.Popen(cmd, stdout=log_fd, stderr=subprocess.STDOUT, env=env)
+        return proc, None
     proc = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        bufsize=1
+        bufsize=0  # stream_output reads the raw pipe fd directly
     )
     t = threading.Thread(target=stream_output, args=(proc, prefix, color), daemon=True)
     t.start()
@@ -41,6 +76,7 @@ def main():
     parser.add_argument('--interface', default='eth0', help='Network interface for receiver')
     parser.add_argument('--distance', type=float, default=5.0, help='Sample traffic pattern distance (NM)')
     parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
+    parser.add_argument('--log-file', help='Append child output directly to this file instead of echoing it (e.g. tail -f it)')
     args = parser.parse_args()
 
     # Colors
@@ -73,8 +109,17 @@ def main():
     print(f"{BLUE}[HARNESS] Starting broadcaster: {' '.join(broadcaster_cmd)}\033[0m")
     print(f"{GREEN}[HARNESS] Starting receiver: {' '.join(receiver_cmd)}\033[0m")
 
-    broadcaster_proc, broadcaster_thread = run_process(broadcaster_cmd, "[BROADCASTER] ", BLUE)
-    receiver_proc, receiver_thread = run_process(receiver_cmd, "[RECEIVER]   ", GREEN)
+    # Both children share one O_APPEND descriptor; the kernel keeps each
+    # write atomic, so lines from the two processes do not tear
+    log_fd = None
+    if args.log_file:
+        log_fd = os.open(args.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        print(f"[HARNESS] Writing child output to {args.log_file}")
+
+    broadcaster_proc, broadcaster_thread = run_process(broadcaster_cmd, "[BROADCASTER] ", BLUE, log_fd)
+    receiver_proc, receiver_thread = run_process(receiver_cmd, "[RECEIVER]   ", GREEN, log_fd)
+    if log_fd is not None:
+        os.close(log_fd)  # The children hold their own copies
 
     def terminate_all(signum, frame):
         print(f"\n{RED}[HARNESS] Terminating processes...\033[0m")
@@ -93,15 +138,24 @@ def main():
     signal.signal(signal.SIGINT, terminate_all)
     signal.signal(signal.SIGTERM, terminate_all)
 
+    # Block until a child exits rather than polling. waitid(WNOWAIT) leaves
+    # the child unreaped so poll() below can still collect its return code.
+    idle = threading.Event()
     try:
         while True:
+            if hasattr(os, 'waitid'):
+                try:
+                    os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOWAIT)
+                except ChildProcessError:
+                    pass
+            else:
+                idle.wait(0.2)
             if broadcaster_proc.poll() is not None:
                 print(f"{RED}[HARNESS] Broadcaster exited with code {broadcaster_proc.returncode}\033[0m")
                 break
             if receiver_proc.poll() is not None:
                 print(f"{RED}[HARNESS] Receiver exited with code {receiver_proc.returncode}\033[0m")
                 break
-            threading.Event().wait(0.2)
     finally:
         terminate_all(None, None)
 
@@ -4,9 +4,8 @@ import socket
 import struct
 import argparse
 import time
-from datetime import datetime, timezone
 import sys
-import select
+from collections import namedtuple
 
 # Import from the new module structure
 try:
@@ -14,7 +13,7 @@ try:
         FLAG_BYTE, CONTROL_ESCAPE, ESCAPE_XOR,
         MSG_ID_HEARTBEAT, MSG_ID_OWNSHIP_REPORT, MSG_ID_OWNSHIP_GEO_ALT, MSG_ID_TRAFFIC_REPORT
     )
-    from modules.gdl90.crc import calculate_crc
+    from modules.gdl90.crc import crc16
 except ImportError:
     print("Error: Could not import from modules.gdl90 package.")
     print("Ensure this script is run from the project root directory and modules are accessible.")
@@ -23,85 +22,157 @@ except ImportError:
 # --- GDL90 Frame Parsing ---
 
 def unstuff_data(stuffed_data):
-    """Removes GDL90 byte stuffing."""
+    """
+    Removes GDL90 byte stuffing.
+
+    Most frames contain no escapes, so that case is a single C-level scan.
+    Otherwise the unescaped runs between escapes are copied as slices and
+    only the escaped bytes are handled individually.
+    """
+    index = stuffed_data.find(CONTROL_ESCAPE)
+    if index == -1:
+        return bytes(stuffed_data)
     unstuffed = bytearray()
-    escape_next = False
-    for byte in stuffed_data:
-        if escape_next:
-            unstuffed.append(byte ^ ESCAPE_XOR)
-            escape_next = False
-        elif byte == CONTROL_ESCAPE:
-            escape_next = True
-        else:
-            unstuffed.append(byte)
+    start = 0
+    length = len(stuffed_data)
+    while index != -1:
+        unstuffed += stuffed_data[start:index]
+        if index + 1 < length: # A trailing escape has nothing to escape; drop it
+            unstuffed.append(stuffed_data[index + 1] ^ ESCAPE_XOR)
+        start = index + 2
+        index = stuffed_data.find(CONTROL_ESCAPE, start)
+    unstuffed += stuffed_data[start:]
     return bytes(unstuffed)
 
-def parse_frame(raw_data):
+def unstuff_and_check(stuffed_payload_with_crc):
+    """
+    Unstuffs a frame body and verifies its CRC in one step.
+
+    The CRC is compared as an integer via crc16(), so no CRC byte objects
+    are created.
+
+    Returns:
+        (message_payload, crc_ok); message_payload is None if the frame is
+        too short to hold an ID and a CRC
+    """
+    unstuffed = unstuff_data(stuffed_payload_with_crc)
+    n = len(unstuffed) - 2 # Length of the message payload
+    if n < 1: # Need at least ID + 2 CRC bytes
+        return None, False
+    message_payload = unstuffed[:n]
+    received_crc = unstuffed[n] | (unstuffed[n + 1] << 8) # LSB, MSB
+    return message_payload, crc16(message_payload) == received_crc
+
+def parse_frame(raw_data, offset=0, end=None, scan_from=None):
     """
     Parses a raw byte sequence to find and validate a GDL90 frame.
     Returns the message payload (ID + Data) if valid, otherwise None.
     Also returns the number of bytes consumed from the raw_data buffer.
-    """
-    start_index = raw_data.find(FLAG_BYTE)
-    if start_index == -1:
-        return None, 0 # No start flag found, consume nothing
 
-    end_index = raw_data.find(FLAG_BYTE, start_index + 1)
+    Args:
+        raw_data: Receive buffer (bytes or bytearray)
+        offset: Index of the first unconsumed byte; the returned byte count
+                is relative to it, so the caller can advance a read cursor
+                instead of slicing the buffer
+        end: Index just past the last received byte (default: len(raw_data)),
+             for buffers that are preallocated larger than their contents
+        scan_from: Index the closing flag search may resume from. After a call
+                   that found an incomplete frame, the caller can pass the
+                   previous ``end`` so the bytes already searched are not
+                   scanned again.
+    """
+    if end is None:
+        end = len(raw_data)
+    if offset < end and raw_data[offset] == FLAG_BYTE:
+        start_index = offset # Usual case: the previous frame ended right before this one
+    else:
+        start_index = raw_data.find(FLAG_BYTE, offset, end)
+        if start_index == -1:
+            return None, 0 # No start flag found, consume nothing
+
+    search_from = start_index + 1
+    if scan_from is not None and scan_from > search_from:
+        search_from = scan_from
+    end_index = raw_data.find(FLAG_BYTE, search_from, end)
     if end_index == -1:
         # Found start but no end yet, need more data. Consume nothing for now.
         # Or, if buffer is very large, maybe discard up to start_index? For now, consume 0.
         return None, 0
 
-    stuffed_payload_with_crc = raw_data[start_index + 1 : end_index]
-    bytes_consumed = end_index + 1 # Consume up to and including the end flag
-
-    if not stuffed_payload_with_crc:
-        # print("Empty frame found") # Debug
-        return None, bytes_consumed # Empty frame, consume it
+    bytes_consumed = end_index + 1 - offset # Consume up to and including the end flag
+    return _frame_payload(raw_data[start_index + 1 : end_index]), bytes_consumed
 
-    try:
-        unstuffed_payload_with_crc = unstuff_data(stuffed_payload_with_crc)
-    except Exception as e:
-        print(f"Error unstuffing data: {e}")
-        return None, bytes_consumed # Consume the bad frame
+def parse_frames(raw_data, offset=0, end=None, scan_from=None):
+    """
+    Finds and validates every complete GDL90 frame in a buffer in one pass.
 
-    if len(unstuffed_payload_with_crc) < 3: # Need at least ID + 2 CRC bytes
-        # print(f"Frame too short after unstuffing: {len(unstuffed_payload_with_crc)} bytes") # Debug
-        return None, bytes_consumed # Consume the bad frame
+    Takes the same arguments as parse_frame, but walks the buffer with a
+    single cursor instead of being called again for each frame.
 
-    message_payload = unstuffed_payload_with_crc[:-2]
-    received_crc = unstuffed_payload_with_crc[-2:]
+    Returns:
+        (payloads, new_offset): the message payload of each complete frame
+        in order (None for an invalid frame), and the index just past the
+        last frame consumed (``offset`` if there was none)
+    """
+    if end is None:
+        end = len(raw_data)
+    payloads = []
+    find = raw_data.find
+    while True:
+        if offset < end and raw_data[offset] == FLAG_BYTE:
+            start_index = offset # Usual case: frames are back to back
+        else:
+            start_index = find(FLAG_BYTE, offset, end)
+            if start_index == -1:
+                break # No start flag
+        search_from = start_index + 1
+        if scan_from is not None and scan_from > search_from:
+            search_from = scan_from
+        end_index = find(FLAG_BYTE, search_from, end)
+        if end_index == -1:
+            break # Incomplete frame, need more data
+        payloads.append(_frame_payload(raw_data[start_index + 1 : end_index]))
+        offset = end_index + 1 # Consume up to and including the end flag
+        scan_from = None
+    return payloads, offset
+
+def _frame_payload(stuffed_payload_with_crc):
+    """Returns the message payload of a frame body, or None if it is invalid."""
+    if not stuffed_payload_with_crc:
+        # print("Empty frame found") # Debug
+        return None # Empty frame
 
     try:
-        calculated_crc = calculate_crc(message_payload)
+        message_payload, crc_ok = unstuff_and_check(stuffed_payload_with_crc)
     except Exception as e:
-        print(f"Error calculating CRC: {e}")
-        return None, bytes_consumed # Consume the bad frame
+        print(f"Error unstuffing/checking data: {e}")
+        return None
 
-    if received_crc != calculated_crc:
-        # print(f"CRC mismatch! Got: {received_crc.hex()}, Calc: {calculated_crc.hex()}, Payload: {message_payload.hex()}") # Debug
-        return None, bytes_consumed # Consume the bad frame
+    if message_payload is None or not crc_ok:
+        # Too short after unstuffing, or CRC mismatch
+        return None
 
     # If we reach here, the frame is valid
-    return message_payload, bytes_consumed
+    return message_payload
 
 # --- GDL90 Value Decoding ---
 
+# Precompiled layouts, so decoding does not re-parse a format string per call
+_UINT16_BE = struct.Struct('>H')
+_HEARTBEAT = struct.Struct('<BBBH') # ID, Status1, Status2, Timestamp low 16 bits (LE)
+_OWNSHIP_GEO_ALT = struct.Struct('>HH') # Geo altitude, VPL (after the ID byte)
+# ID(1) Status(1) ICAO(3) Lat(3) Lon(3) Alt/Misc(2) NavInt(1) GS(2) VV(2) Track(1) Emitter(1) Callsign(8) = 28 bytes
+_TRAFFIC_REPORT = struct.Struct('>BB3s3s3s2sB2s2sBB8s')
+
 def decode_lat_lon(three_bytes):
     """Decodes GDL90 3-byte latitude or longitude into degrees."""
     if len(three_bytes) != 3:
         return None
-    # Unpack as 3 bytes, big-endian, then handle 2's complement for 24 bits
-    semicircles = (three_bytes[0] << 16) | (three_bytes[1] << 8) | three_bytes[2]
-    # Check if the sign bit (bit 23) is set
-    if semicircles & (1 << 23):
-        # Perform 2's complement conversion for 24 bits
-        semicircles -= (1 << 24)
-
+    # 24-bit big-endian two's complement; a signed 24-bit value is already
+    # within -2^23..2^23-1, so the result is always in [-180, 180)
+    semicircles = int.from_bytes(three_bytes, 'big', signed=True)
     # Convert semicircles to degrees
-    degrees = semicircles * (180.0 / (2**23))
-    # Clamp to valid range just in case
-    return max(-180.0, min(180.0, degrees))
+    return semicircles * (180.0 / (1 << 23))
 
 def decode_altitude_pressure(two_bytes):
     """Decodes GDL90 12-bit pressure altitude into feet."""
@@ -117,7 +188,7 @@ def decode_altitude_pressure(two_bytes):
 def decode_altitude_geometric(two_bytes):
     """Decodes GDL90 16-bit geometric altitude into feet."""
     if len(two_bytes) != 2: return None
-    encoded_alt = struct.unpack('>H', two_bytes)[0]
+    encoded_alt, = _UINT16_BE.unpack(two_bytes)
     if encoded_alt == 0xFFFF: # Invalid/Unknown
         return None
     # Value = (Altitude_ft + 1000) / 5
@@ -140,9 +211,8 @@ def decode_vertical_velocity(two_bytes):
     # Check for invalid value 0x800 (-2048) which means unknown/invalid
     if encoded_vv == 0x800:
         return None
-    # Handle 12-bit two's complement
-    if encoded_vv & (1 << 11): # Check sign bit
-        encoded_vv -= (1 << 12)
+    # Handle 12-bit two's complement without a branch on the sign bit
+    encoded_vv = (encoded_vv ^ 0x800) - 0x800
     # Value = VV_fpm / 64
     fpm = encoded_vv * 64.0
     return fpm
@@ -158,99 +228,143 @@ def decode_track_heading(one_byte):
 def decode_icao_address(three_bytes):
     """Decodes GDL90 3-byte ICAO address into a hex string."""
     if len(three_bytes) != 3: return "Invalid"
-    icao_int = (three_bytes[0] << 16) | (three_bytes[1] << 8) | three_bytes[2]
-    return f"{icao_int:06X}"
+    return f"{int.from_bytes(three_bytes, 'big'):06X}"
+
+# Maps every byte value to itself if printable ASCII, otherwise to '?'
+_CALLSIGN_TABLE = bytes(b if 32 <= b <= 126 else ord('?') for b in range(256))
 
 def decode_callsign(eight_bytes):
     """Decodes GDL90 8-byte callsign."""
     if len(eight_bytes) != 8: return "Invalid"
-    try:
-        # Replace non-printable chars, strip trailing spaces
-        cleaned = bytes(b if 32 <= b <= 126 else ord('?') for b in eight_bytes)
-        return cleaned.decode('ascii').strip()
-    except UnicodeDecodeError:
-        return "DecodeErr"
+    # Replace non-printable chars, strip surrounding spaces; after the
+    # translation every byte is printable ASCII, so decoding cannot fail
+    return eight_bytes.translate(_CALLSIGN_TABLE).decode('ascii').strip()
 
 # --- Message Decoding Functions ---
-
-def decode_heartbeat(payload):
+#
+# Each message type has a read_* function that unpacks a payload into a
+# namedtuple of raw values, and a format_* function that turns such a record
+# into display strings. String formatting, the bulk of the work, therefore
+# only happens for messages that are printed; decode_* do both.
+
+Heartbeat = namedtuple('Heartbeat', [
+    'uat_initialized', 'cdti_available', 'ground_uplink', 'fisb_available',
+    'gps_valid', 'maintenance_required', 'ident_active', 'seconds_since_midnight',
+])
+OwnshipReport = namedtuple('OwnshipReport', [
+    'latitude', 'longitude', 'altitude_pressure', 'misc_flags', 'nic', 'nac_p',
+    'ground_speed', 'vertical_velocity', 'track',
+])
+OwnshipGeoAltitude = namedtuple('OwnshipGeoAltitude', ['altitude_geometric', 'vpl_code'])
+TrafficReport = namedtuple('TrafficReport', [
+    'icao', 'callsign', 'alert_status', 'address_type', 'latitude', 'longitude',
+    'altitude_pressure', 'nic', 'nac_p', 'ground_speed', 'vertical_velocity',
+    'track', 'track_type', 'emitter_category',
+])
+
+# Display names indexed by code; None marks codes without a name
+_OWNSHIP_STATUS_NAMES = (None, "Airborne", "On Ground")
+_ADDRESS_TYPE_NAMES = ("ADS-B/ICAO", "Self-assigned", "TIS-B/Fine", "TIS-B/Coarse", "Surface", "Reserved")
+_ALERT_STATUS_NAMES = ("No Alert", "Traffic Alert")
+# Basic emitter category mapping (refer to DO-282B / GDL90 spec for full list)
+_EMITTER_NAMES = (
+    "No Info", "Light", "Small", "Large", "High Vortex", "Heavy",
+    "High Perf", "Rotorcraft", None, "Glider", "Lighter-than-air",
+    "Parachute", "Ultralight", None, "UAV", "Space",
+    None, "Surface/Emergency", "Surface/Service", "Point Obstacle",
+    "Cluster Obstacle", "Line Obstacle",
+)
+
+def _code_name(names, code):
+    """Returns the display name for a (non-negative) code, or "Code N"."""
+    name = names[code] if code < len(names) else None
+    return name if name is not None else f"Code {code}"
+
+def read_heartbeat(payload):
     # Heartbeat payload = ID(1) + Status1(1) + Status2(1) + TS_Low(2) = 5 bytes
     if len(payload) < 5: return None
-    # Unpack ID, Status1, Status2 as big-endian bytes
-    # Unpack Timestamp lower 16 bits as little-endian unsigned short
-    msg_id, status1, status2 = struct.unpack('>BBB', payload[:3])
-    ts_lower_16, = struct.unpack('<H', payload[3:5]) # Comma unpacks the single tuple element
-
-    # Status Byte 1
-    uat_init = bool(status1 & 0x80)
-    ratcs = bool(status1 & 0x40) # Reserved
-    cdti_avail = bool(status1 & 0x20)
-    gnd_uplink = bool(status1 & 0x10)
-    fisb_avail = bool(status1 & 0x08)
+    # ID, Status1, Status2 are single bytes (byte order is irrelevant);
+    # the timestamp's lower 16 bits are a little-endian unsigned short
+    msg_id, status1, status2, ts_lower_16 = _HEARTBEAT.unpack_from(payload, 0)
 
     # Status Byte 2
     # Bit 7 (MSB) contains bit 16 of the timestamp
     ts_bit16 = (status2 & 0x80) >> 7
-    gps_valid = bool(status2 & 0x40)
-    maint_req = bool(status2 & 0x20)
-    ident_active = bool(status2 & 0x10)
     # reserved_bits = status2 & 0x0F # Not usually displayed
 
     # Timestamp: Reconstruct from lower 16 bits and the bit stored in Status2
     # Note: GDL90 spec v1.0 doesn't explicitly define timestamp type bit, assume UTC based on create_heartbeat_message
     utc_timestamp_field = (ts_bit16 << 16) | ts_lower_16
-    seconds_since_midnight = utc_timestamp_field / 10.0 # GDL90 timestamp is 0.1s increments
 
+    return Heartbeat(
+        uat_initialized=bool(status1 & 0x80),
+        # Status1 bit 6 (0x40) is reserved (RATCS)
+        cdti_available=bool(status1 & 0x20),
+        ground_uplink=bool(status1 & 0x10),
+        fisb_available=bool(status1 & 0x08),
+        gps_valid=bool(status2 & 0x40),
+        maintenance_required=bool(status2 & 0x20),
+        ident_active=bool(status2 & 0x10),
+        seconds_since_midnight=utc_timestamp_field / 10.0, # GDL90 timestamp is 0.1s increments
+    )
+
+def format_heartbeat(record):
     return {
         "Type": "Heartbeat",
-        "UAT Initialized": uat_init,
-        "CDTI Available": cdti_avail,
-        "Ground Uplink": gnd_uplink,
-        "FIS-B Available": fisb_avail,
-        # "Timestamp Type": "GPS" if ts_type_gps else "UTC", # Bit 7 is used for timestamp, not type - Removed this line
-        "GPS Valid": gps_valid,
-        "Maintenance Req": maint_req,
-        "IDENT Active": ident_active,
-        # "Timestamp (sec*10)": utc_timestamp_field, # Raw value
-        "Seconds Since Midnight": f"{seconds_since_midnight:.1f}",
+        "UAT Initialized": record.uat_initialized,
+        "CDTI Available": record.cdti_available,
+        "Ground Uplink": record.ground_uplink,
+        "FIS-B Available": record.fisb_available,
+        "GPS Valid": record.gps_valid,
+        "Maintenance Req": record.maintenance_required,
+        "IDENT Active": record.ident_active,
+        "Seconds Since Midnight": f"{record.seconds_since_midnight:.1f}",
     }
 
-def decode_ownship_report(payload):
+def read_ownship_report(payload):
     if len(payload) < 16: return None
     # ID(1) Lat(3) Lon(3) Alt(2) Misc(1) NavInt(1) GS(2) VV(2) Track(1) = 16 bytes
-    lat = decode_lat_lon(payload[1:4])
-    lon = decode_lat_lon(payload[4:7])
-    alt_press = decode_altitude_pressure(payload[7:9])
     misc_byte = payload[9]
     nav_integrity_byte = payload[10]
-    gs_knots = decode_velocity(payload[11:13])
-    vv_fpm = decode_vertical_velocity(payload[13:15])
-    track_deg = decode_track_heading(payload[15:16])
-
-    misc_flags = (misc_byte >> 4) & 0x0F # e.g., 1=Airborne, 2=On Ground
-    nic = (nav_integrity_byte >> 4) & 0x0F
-    nac_p = nav_integrity_byte & 0x0F
+    return OwnshipReport(
+        latitude=decode_lat_lon(payload[1:4]),
+        longitude=decode_lat_lon(payload[4:7]),
+        altitude_pressure=decode_altitude_pressure(payload[7:9]),
+        misc_flags=(misc_byte >> 4) & 0x0F, # e.g., 1=Airborne, 2=On Ground
+        nic=(nav_integrity_byte >> 4) & 0x0F,
+        nac_p=nav_integrity_byte & 0x0F,
+        ground_speed=decode_velocity(payload[11:13]),
+        vertical_velocity=decode_vertical_velocity(payload[13:15]),
+        track=decode_track_heading(payload[15:16]),
+    )
 
-    misc_map = {1: "Airborne", 2: "On Ground"}
+def format_ownship_report(record):
+    lat, lon, alt_press = record.latitude, record.longitude, record.altitude_pressure
+    gs_knots, vv_fpm, track_deg = record.ground_speed, record.vertical_velocity, record.track
 
     return {
         "Type": "Ownship Report",
         "Latitude": f"{lat:.5f}" if lat is not None else "Invalid",
         "Longitude": f"{lon:.5f}" if lon is not None else "Invalid",
         "Altitude (Press)": f"{alt_press:.0f} ft" if alt_press is not None else "Invalid",
-        "Status": misc_map.get(misc_flags, f"Code {misc_flags}"),
-        "NIC": nic,
-        "NACp": nac_p,
+        "Status": _code_name(_OWNSHIP_STATUS_NAMES, record.misc_flags),
+        "NIC": record.nic,
+        "NACp": record.nac_p,
         "Ground Speed": f"{gs_knots:.0f} kts" if gs_knots is not None else "Invalid",
         "Vertical Velocity": f"{vv_fpm:.0f} fpm" if vv_fpm is not None else "Invalid",
         "Track": f"{track_deg:.1f}°" if track_deg is not None else "Invalid",
     }
 
-def decode_ownship_geo_altitude(payload):
+def read_ownship_geo_altitude(payload):
      if len(payload) < 5: return None
      # ID(1) AltGeo(2) VPL(2) = 5 bytes
-     alt_geo = decode_altitude_geometric(payload[1:3])
-     vpl_code = struct.unpack('>H', payload[3:5])[0]
+     encoded_alt, vpl_code = _OWNSHIP_GEO_ALT.unpack_from(payload, 1)
+     # Value = (Altitude_ft + 1000) / 5; 0xFFFF is invalid/unknown
+     alt_geo = (encoded_alt * 5.0) - 1000.0 if encoded_alt != 0xFFFF else None
+     return OwnshipGeoAltitude(altitude_geometric=alt_geo, vpl_code=vpl_code)
+
+def format_ownship_geo_altitude(record):
+     alt_geo, vpl_code = record.altitude_geometric, record.vpl_code
 
      # TODO: Decode VPL code to meters if needed
      vpl_display = f"Code {vpl_code}" if vpl_code != 0xFFFF else "Unknown (>185m)"
@@ -261,23 +375,40 @@ def decode_ownship_geo_altitude(payload):
          "VPL": vpl_display,
      }
 
-def decode_traffic_report(payload):
+def read_traffic_report(payload):
     if len(payload) < 28: return None
-    # ID(1) Status(1) ICAO(3) Lat(3) Lon(3) Alt(2) NavInt(1) GS(2) VV(2) Track(1) Emitter(1) Callsign(8) = 28 bytes
-    status_byte = payload[1]
-    icao = decode_icao_address(payload[2:5])
-    lat = decode_lat_lon(payload[5:8])
-    lon = decode_lat_lon(payload[8:11])
-    alt_press = decode_altitude_pressure(payload[11:13])
-    nav_integrity_byte = payload[13]
-    gs_knots = decode_velocity(payload[14:16]) # Bytes 15-16 (indices 14, 15)
+    # Split the whole report in one call; see _TRAFFIC_REPORT for the layout
+    return _traffic_record(_TRAFFIC_REPORT.unpack_from(payload, 0))
+
+def read_traffic_reports(payloads):
+    """
+    Reads a batch of Traffic Report payloads.
+
+    The payloads are joined and split by a single Struct.iter_unpack pass,
+    rather than unpacked one call at a time.
+
+    Args:
+        payloads: Iterable of Traffic Report payloads (ID + data)
+
+    Returns:
+        List of TrafficReport records, one per payload of at least 28 bytes
+        (shorter payloads are skipped, extra trailing bytes are ignored)
+    """
+    size = _TRAFFIC_REPORT.size
+    data = b"".join(p[:size] for p in payloads if len(p) >= size)
+    return [_traffic_record(fields) for fields in _TRAFFIC_REPORT.iter_unpack(data)]
+
+def _traffic_record(fields):
+    """Builds a TrafficReport from the fields of a _TRAFFIC_REPORT unpack."""
+    (_, status_byte, icao_bytes, lat_bytes, lon_bytes, alt_bytes, nav_integrity_byte,
+     gs_bytes, vv_bytes, track_byte, emitter_cat, callsign_bytes) = fields
 
     # Vertical Velocity Decoding (handled directly here)
     # Sign bit is in Byte 16 (index 15), bit 3
-    vv_sign_bit = (payload[15] >> 3) & 0x01
+    vv_sign_bit = (gs_bytes[1] >> 3) & 0x01
     # Magnitude bits 10-3 are in Byte 17 (index 16)
     # Magnitude bits 2-0 are in Byte 18 (index 17), bits 7-5
-    vv_mag_11bit = (payload[16] << 3) | (payload[17] >> 5)
+    vv_mag_11bit = (vv_bytes[0] << 3) | (vv_bytes[1] >> 5)
 
     vv_fpm = None
     if vv_mag_11bit != 0x7FF: # 0x7FF (2047) is invalid/unknown
@@ -285,30 +416,30 @@ def decode_traffic_report(payload):
         if vv_sign_bit == 1:
             vv_fpm *= -1
 
-    track_deg = decode_track_heading(payload[18:19]) # Byte 19 (index 18)
-    emitter_cat = payload[19] # Byte 20 (index 19)
-    callsign = decode_callsign(payload[20:28]) # Bytes 21-28 (indices 20-27)
-
     # Extract Misc field from Byte 13 (index 12) - lower 4 bits
-    misc_packed_byte = payload[12]
-    misc_val = misc_packed_byte & 0x0F
-    track_type_bits = misc_val & 0x03 # Bits 1 and 0 determine track validity/type
-
-    alert_status = (status_byte >> 4) & 0x0F
-    addr_type = status_byte & 0x0F
-    nic = (nav_integrity_byte >> 4) & 0x0F
-    nac_p = nav_integrity_byte & 0x0F
-
-    addr_type_map = {0: "ADS-B/ICAO", 1: "Self-assigned", 2: "TIS-B/Fine", 3: "TIS-B/Coarse", 4: "Surface", 5: "Reserved"}
-    alert_status_map = {0: "No Alert", 1: "Traffic Alert"}
-    # Basic emitter category mapping (refer to DO-282B / GDL90 spec for full list)
-    emitter_map = {
-        0: "No Info", 1: "Light", 2: "Small", 3: "Large", 4: "High Vortex", 5: "Heavy",
-        6: "High Perf", 7: "Rotorcraft", 9: "Glider", 10: "Lighter-than-air",
-        11: "Parachute", 12: "Ultralight", 14: "UAV", 15: "Space",
-        17: "Surface/Emergency", 18: "Surface/Service", 19: "Point Obstacle",
-        20: "Cluster Obstacle", 21: "Line Obstacle"
-    }
+    misc_val = alt_bytes[1] & 0x0F
+
+    return TrafficReport(
+        icao=icao_bytes.hex().upper(),
+        callsign=decode_callsign(callsign_bytes), # Bytes 21-28 (indices 20-27)
+        alert_status=(status_byte >> 4) & 0x0F,
+        address_type=status_byte & 0x0F,
+        latitude=int.from_bytes(lat_bytes, 'big', signed=True) * (180.0 / (1 << 23)),
+        longitude=int.from_bytes(lon_bytes, 'big', signed=True) * (180.0 / (1 << 23)),
+        altitude_pressure=decode_altitude_pressure(alt_bytes),
+        nic=(nav_integrity_byte >> 4) & 0x0F,
+        nac_p=nav_integrity_byte & 0x0F,
+        ground_speed=decode_velocity(gs_bytes), # Bytes 15-16 (indices 14, 15)
+        vertical_velocity=vv_fpm,
+        track=track_byte * (360.0 / 256.0), # Byte 19 (index 18)
+        track_type=misc_val & 0x03, # Bits 1 and 0 determine track validity/type
+        emitter_category=emitter_cat, # Byte 20 (index 19)
+    )
+
+def format_traffic_report(record):
+    lat, lon, alt_press = record.latitude, record.longitude, record.altitude_pressure
+    gs_knots, vv_fpm, track_deg = record.ground_speed, record.vertical_velocity, record.track
+    track_type_bits = record.track_type
 
     # Format track based on validity bits
     track_display = "Invalid"
@@ -322,26 +453,58 @@ def decode_traffic_report(payload):
 
     return {
         "Type": "Traffic Report",
-        "ICAO": icao,
-        "Callsign": callsign if callsign else "-",
-        "Alert Status": alert_status_map.get(alert_status, f"Code {alert_status}"),
-        "Address Type": addr_type_map.get(addr_type, f"Code {addr_type}"),
+        "ICAO": record.icao,
+        "Callsign": record.callsign if record.callsign else "-",
+        "Alert Status": _code_name(_ALERT_STATUS_NAMES, record.alert_status),
+        "Address Type": _code_name(_ADDRESS_TYPE_NAMES, record.address_type),
         "Latitude": f"{lat:.5f}" if lat is not None else "Invalid",
         "Longitude": f"{lon:.5f}" if lon is not None else "Invalid",
         "Altitude (Press)": f"{alt_press:.0f} ft" if alt_press is not None else "Invalid",
-        "NIC": nic,
-        "NACp": nac_p,
+        "NIC": record.nic,
+        "NACp": record.nac_p,
         "Ground Speed": f"{gs_knots:.0f} kts" if gs_knots is not None else "Invalid",
         "Vertical Velocity": f"{vv_fpm:.0f} fpm" if vv_fpm is not None else "Invalid",
         "Track": track_display,
-        "Emitter Cat": emitter_map.get(emitter_cat, f"Code {emitter_cat}"),
+        "Emitter Cat": _code_name(_EMITTER_NAMES, record.emitter_category),
     }
 
-DECODERS = {
-    MSG_ID_HEARTBEAT: decode_heartbeat,
-    MSG_ID_OWNSHIP_REPORT: decode_ownship_report,
-    MSG_ID_OWNSHIP_GEO_ALT: decode_ownship_geo_altitude,
-    MSG_ID_TRAFFIC_REPORT: decode_traffic_report,
+FORMATTERS = {
+    Heartbeat: format_heartbeat,
+    OwnshipReport: format_ownship_report,
+    OwnshipGeoAltitude: format_ownship_geo_altitude,
+    TrafficReport: format_traffic_report,
+}
+
+def format_for_display(record):
+    """Returns the labelled display strings for a record from a read_* function."""
+    return FORMATTERS[type(record)](record)
+
+def decode_heartbeat(payload):
+    """Decodes a Heartbeat payload into display strings, or None if it is too short."""
+    record = read_heartbeat(payload)
+    return format_heartbeat(record) if record else None
+
+def decode_ownship_report(payload):
+    """Decodes a Ownship Report payload into display strings, or None if it is too short."""
+    record = read_ownship_report(payload)
+    return format_ownship_report(record) if record else None
+
+def decode_ownship_geo_altitude(payload):
+    """Decodes a Ownship Geo Altitude payload into display strings, or None if it is too short."""
+    record = read_ownship_geo_altitude(payload)
+    return format_ownship_geo_altitude(record) if record else None
+
+def decode_traffic_report(payload):
+    """Decodes a Traffic Report payload into display strings, or None if it is too short."""
+    record = read_traffic_report(payload)
+    return format_traffic_report(record) if record else None
+
+# Raw decoders by message ID; output is formatted only for displayed messages
+READERS = {
+    MSG_ID_HEARTBEAT: read_heartbeat,
+    MSG_ID_OWNSHIP_REPORT: read_ownship_report,
+    MSG_ID_OWNSHIP_GEO_ALT: read_ownship_geo_altitude,
+    MSG_ID_TRAFFIC_REPORT: read_traffic_report,
 }
 
 MESSAGE_TYPE_NAMES = {
@@ -351,9 +514,47 @@ MESSAGE_TYPE_NAMES = {
     MSG_ID_TRAFFIC_REPORT: "Traffic Report",
 }
 
+# Names as matched by --filter (lower case, no spaces), computed once
+MESSAGE_FILTER_NAMES = {
+    message_id: name.lower().replace(" ", "") for message_id, name in MESSAGE_TYPE_NAMES.items()
+}
+
 
 # --- Main Listener Logic ---
 
+# (whole second, "HH:MM:SS") of the last timestamp formatted by utc_time_str
+_time_prefix_cache = [None, ""]
+
+def utc_time_str(now=None):
+    """
+    Formats a wall-clock time as UTC HH:MM:SS.mmm for output lines.
+
+    The HH:MM:SS part is only formatted once per second; messages within
+    the same second just append their milliseconds.
+
+    Args:
+        now: Time as returned by time.time() (defaults to the current time)
+    """
+    if now is None:
+        now = time.time()
+    # Round to whole microseconds first, as datetime does
+    second = int(now)
+    micros = round((now - second) * 1000000)
+    if micros >= 1000000:
+        second += 1
+        micros -= 1000000
+    if second != _time_prefix_cache[0]:
+        _time_prefix_cache[1] = time.strftime('%H:%M:%S', time.gmtime(second))
+        _time_prefix_cache[0] = second
+    return f"{_time_prefix_cache[1]}.{micros // 1000:03d}"
+
+# Datagrams are received straight into a preallocated buffer of this size
+RECV_BUFFER_SIZE = 262144
+RECV_SIZE = 4096 # Maximum bytes read per datagram
+RECV_TIMEOUT = 0.1 # Seconds; bounds how late the periodic stats can be
+MAX_DRAIN = 64 # Extra queued datagrams read per wake-up before parsing
+SOCKET_RCVBUF = 4 << 20 # Kernel receive buffer requested, to ride out output stalls
+
 def main():
     parser = argparse.ArgumentParser(description="GDL90 Message Listener and Decoder")
     parser.add_argument('--port', type=int, default=4000,
@@ -368,17 +569,28 @@ def main():
                         help="Show message statistics periodically")
     parser.add_argument('--verbose', '-v', action='store_true',
                         help="Increase output verbosity (show CRC errors, unknown IDs, etc.)")
+    parser.add_argument('--rcvbuf', type=int, default=SOCKET_RCVBUF,
+                        help=f"Socket receive buffer size in bytes (default: {SOCKET_RCVBUF})")
     args = parser.parse_args()
 
     # Normalize filter names to lower case for comparison
-    filter_types = [f.lower() for f in args.filter] if args.filter else None
+    filter_types = frozenset(f.lower() for f in args.filter) if args.filter else None
 
     print(f"Listening for GDL90 messages on UDP {args.bind_address}:{args.port}...")
     if filter_types:
         print(f"Filtering for message types: {', '.join(args.filter)}")
 
     sock = None
-    buffer = b""
+    drain_sock = None
+    # Preallocated receive buffer: bytes before `head` have been parsed and
+    # bytes from `tail` on are free. Datagrams are received in place at
+    # `tail` and frames parsed in place from `head`, so nothing is copied
+    # per datagram or per frame.
+    buffer = bytearray(RECV_BUFFER_SIZE)
+    buffer_view = memoryview(buffer)
+    head = 0
+    tail = 0
+    scan_from = None # Where to resume looking for the end of a partial frame
     msg_counts = {}
     last_stats_time = time.monotonic()
     total_msgs = 0
@@ -392,64 +604,93 @@ def main():
         # Enable broadcasting reception if needed, though binding to 0.0.0.0 usually suffices
         # sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1) # May require root
         sock.bind((args.bind_address, args.port))
-        sock.setblocking(False) # Use non-blocking socket with select
+        # A larger kernel buffer lets bursts queue up while we are busy printing
+        # instead of being dropped; Linux caps it at net.core.rmem_max
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, args.rcvbuf)
+        except OSError as e:
+            print(f"Could not set receive buffer size: {e}")
+        if args.verbose:
+            print(f"Socket receive buffer: {sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes")
+        # Blocking reads with a timeout: one syscall per datagram, and the loop
+        # still wakes up every 100ms when idle to print statistics
+        sock.settimeout(RECV_TIMEOUT)
+        # Non-blocking handle on the same socket, for draining whatever else is
+        # queued once a datagram has arrived (MSG_DONTWAIT on a socket with a
+        # timeout would still wait for the timeout)
+        drain_sock = sock.dup()
+        drain_sock.setblocking(False)
         print("Socket bound successfully. Press Ctrl+C to stop.")
 
         while True:
-            # Use select for non-blocking read with timeout
-            ready_to_read, _, _ = select.select([sock], [], [], 0.1) # 100ms timeout
-
-            if ready_to_read:
-                try:
-                    data, addr = sock.recvfrom(4096) # Read up to 4096 bytes
-                    # print(f"Received {len(data)} bytes from {addr}") # Debug raw receive
-                    total_bytes += len(data)
-                    buffer += data
-                except socket.error as e:
-                    print(f"Socket error receiving data: {e}")
-                    time.sleep(1) # Avoid busy-loop on error
-                    continue
-                except Exception as e:
-                    print(f"Unexpected error receiving data: {e}")
-                    time.sleep(1)
-                    continue
+            if RECV_BUFFER_SIZE - tail < RECV_SIZE:
+                # Out of room at the end: move the unparsed bytes to the front
+                buffer[:tail - head] = buffer[head:tail]
+                tail -= head
+                if scan_from is not None:
+                    scan_from -= head
+                head = 0
+            try:
+                nbytes, addr = sock.recvfrom_into(buffer_view[tail:], RECV_SIZE)
+                # print(f"Received {nbytes} bytes from {addr}") # Debug raw receive
+                total_bytes += nbytes
+                tail += nbytes
+                # Pick up any datagrams that queued behind it before parsing
+                for _ in range(MAX_DRAIN):
+                    if RECV_BUFFER_SIZE - tail < RECV_SIZE:
+                        break # Parse what we have first; compaction makes room
+                    try:
+                        nbytes, addr = drain_sock.recvfrom_into(buffer_view[tail:], RECV_SIZE)
+                    except BlockingIOError:
+                        break
+                    total_bytes += nbytes
+                    tail += nbytes
+            except socket.timeout:
+                pass # Nothing received; fall through to the periodic stats
+            except socket.error as e:
+                print(f"Socket error receiving data: {e}")
+                time.sleep(1) # Avoid busy-loop on error
+                continue
+            except Exception as e:
+                print(f"Unexpected error receiving data: {e}")
+                time.sleep(1)
+                continue
 
             # Process the buffer to find frames
-            while True:
-                original_buffer_len = len(buffer)
-                payload, consumed = parse_frame(buffer)
-
-                if consumed > 0:
-                    # Frame processed (valid or invalid), remove consumed bytes
-                    buffer = buffer[consumed:]
-                elif len(buffer) > 4096: # Prevent buffer growing indefinitely if no flags found
-                     print("Buffer overflow without finding frame flags, clearing buffer.")
-                     buffer = b""
-                     break # Exit inner loop, wait for more data
-                else:
-                    # No complete frame found or no start flag, need more data
-                    break # Exit inner loop, wait for more data
-
+            payloads, head = parse_frames(buffer, head, tail, scan_from)
+            if tail - head > 4096: # Prevent buffer growing indefinitely if no flags found
+                print("Buffer overflow without finding frame flags, clearing buffer.")
+                head = tail = 0
+                scan_from = None
+            else:
+                # No complete frame remains. Everything up to `tail` has been
+                # searched for a closing flag.
+                scan_from = tail
+
+            for payload in payloads:
                 if payload:
                     total_msgs += 1
                     message_id = payload[0]
                     msg_counts[message_id] = msg_counts.get(message_id, 0) + 1
 
-                    decoder = DECODERS.get(message_id)
+                    reader = READERS.get(message_id)
                     msg_type_name = MESSAGE_TYPE_NAMES.get(message_id, f"ID 0x{message_id:02X}")
 
                     # Apply filtering
                     should_display = True
-                    if filter_types and msg_type_name.lower().replace(" ", "") not in filter_types:
-                         should_display = False
+                    if filter_types:
+                        filter_name = MESSAGE_FILTER_NAMES.get(message_id)
+                        if filter_name is None: # Unknown ID, e.g. "id0x05"
+                            filter_name = msg_type_name.lower().replace(" ", "")
+                        should_display = filter_name in filter_types
 
                     if should_display:
-                        if decoder:
-                            decoded_msg = decoder(payload)
-                            if decoded_msg:
-                                timestamp_str = datetime.now(timezone.utc).strftime("%H:%M:%S.%f")[:-3]
+                        if reader:
+                            record = reader(payload)
+                            if record:
+                                timestamp_str = utc_time_str()
                                 print(f"--- {timestamp_str} | {msg_type_name} (ID: 0x{message_id:02X}) ---")
-                                for key, value in decoded_msg.items():
+                                for key, value in format_for_display(record).items():
                                     if key != "Type": # Don't print type again
                                         print(f"  {key}: {value}")
                                 if args.raw:
@@ -457,18 +698,22 @@ def main():
                                 print("-" * (len(timestamp_str) + len(msg_type_name) + 15)) # Match header length
                             else:
                                 if args.verbose:
-                                    print(f"[{datetime.now(timezone.utc).strftime('%H:%M:%S.%f')[:-3]}] Failed to decode {msg_type_name}, Payload: {payload.hex()}")
+                                    print(f"[{utc_time_str()}] Failed to decode {msg_type_name}, Payload: {payload.hex()}")
                         else:
                             unknown_msgs += 1
                             if args.verbose:
-                                print(f"[{datetime.now(timezone.utc).strftime('%H:%M:%S.%f')[:-3]}] Unknown message ID: 0x{message_id:02X}, Payload: {payload.hex()}")
-                elif consumed > 0: # Frame was consumed but invalid (CRC error, short, etc.)
+                                print(f"[{utc_time_str()}] Unknown message ID: 0x{message_id:02X}, Payload: {payload.hex()}")
+                else: # Frame was consumed but invalid (CRC error, short, etc.)
                     crc_errors += 1
                     if args.verbose:
                          # CRC errors are common if data stream is noisy or frames overlap
                          # Only print if verbose to avoid flooding console
-                         print(f"[{datetime.now(timezone.utc).strftime('%H:%M:%S.%f')[:-3]}] Invalid frame detected (CRC/Format Error)")
+                         print(f"[{utc_time_str()}] Invalid frame detected (CRC/Format Error)")
+
 
+            if head == tail:
+                head = tail = 0 # Everything parsed: start again at the front
+                scan_from = None
 
             # Print stats periodically
             now = time.monotonic()
@@ -492,6 +737,8 @@ def main():
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
     finally:
+        if drain_sock:
+            drain_sock.close()
         if sock:
             sock.close()
             print("Socket closed.")
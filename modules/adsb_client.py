@@ -1,205 +1,361 @@
 import pyModeS as pms
-from pyModeS.extra.tcpclient import TcpClient
+from binascii import unhexlify
+import selectors
+import socket
 import time
 import queue
 import threading
+from collections import OrderedDict
 from datetime import datetime
 import logging
+from .mode_s import crc24, cpr_word, global_position
 
-class AdsbClient(TcpClient):
+log = logging.getLogger(__name__)
+
+RECV_BUFFER_SIZE = 65536 # Receive buffer; holds many complete raw-format lines
+CONNECT_TIMEOUT = 5.0 # Seconds to wait for dump1090 to accept the connection
+POLL_INTERVAL = 0.5 # Seconds between stop event checks while the feed is idle
+MAX_CPR_AIRCRAFT = 4096 # CPR state is kept for at most this many recently seen aircraft
+
+# First byte of a DF17 message is 10001xxx (0x88-0x8F), in either hex case
+DF17_PREFIXES = frozenset(prefix for b in range(0x88, 0x90)
+                          for prefix in (f'{b:02X}', f'{b:02x}'))
+
+
+def split_raw_messages(data, ts):
+    """
+    Splits dump1090 raw-format output (``*<hex>;`` per message) into messages.
+
+    Args:
+        data: Bytes-like data ending at a ';' (any partial message after the
+              last ';' must already have been held back)
+        ts: Receive timestamp given to every message in the chunk
+
+    Returns:
+        List of [hex_msg, ts] pairs, without the '*' and ';' framing
+    """
+    messages = []
+    for frame in data.split(b';')[:-1]:
+        start = frame.rfind(b'*')
+        if start >= 0:
+            # latin-1 never fails; a non-hex message is rejected by the hex decode later
+            messages.append([frame[start + 1:].decode('latin-1'), ts])
+    return messages
+
+
+class AdsbClient:
     """
     Connects to a dump1090 source (like port 30002) and decodes ADS-B messages.
     Puts decoded aircraft data into a queue.
+
+    The raw feed is read with recv_into into one preallocated buffer and split
+    on ';' with bytes methods, so framing costs a few C calls per read rather
+    than a Python loop over every received byte.
     """
     def __init__(self, host, port, data_queue, stop_event):
-        # Reverting to 'raw' datatype for port 30002, will handle framing manually
-        super().__init__(host, port, datatype='raw')
+        self.host = host
+        self.port = port
+        self.socket = None
+        self._buffer = bytearray(RECV_BUFFER_SIZE)
         self.data_queue = data_queue
         self.stop_event = stop_event
         self._thread = None
-        # Add state for CPR decoding, keyed by ICAO
-        self.cpr_data = {}
-        logging.info(f"ADS-B Client: Connecting to {host}:{port}...")
+        self._debug = False # DEBUG logging enabled; refreshed once per batch
+        # CPR decoding state, keyed by ICAO: one [t_even, cpr_even, t_odd, cpr_odd]
+        # list per aircraft, each frame kept as its 34-bit CPR word. Kept in
+        # least-recently-updated order so the oldest aircraft can be evicted.
+        self.cpr_data = OrderedDict()
+        log.info(f"ADS-B Client: Connecting to {host}:{port}...")
 
     def handle_messages(self, messages):
         """
         Processes raw messages, decodes ADS-B, and puts relevant data into the queue.
+
+        The batch is handled in two passes: the first drops everything that
+        is not a well-formed DF17 message with a valid CRC, the second decodes
+        the survivors. Most traffic on port 30002 is Mode-S surveillance
+        replies, so the cheap checks run back-to-back over the whole batch
+        and only ADS-B frames reach the pyModeS decoders.
+        """
+        # Check the log levels once per batch, so the per-message log sites
+        # below cost a local flag test rather than a logger call
+        self._debug = debug = log.isEnabledFor(logging.DEBUG)
+        info = log.isEnabledFor(logging.INFO)
+
+        # Log the raw messages received by the handler (skipped entirely unless debugging)
+        if debug:
+            for msg, ts in messages:
+                log.debug("ADS-B Raw Handled: '%s' (len=%d) @ %s", msg, len(msg), ts)
+
+        if self.stop_event.is_set():
+            log.info("ADS-B Client: Stop event received, stopping message handling.")
+            # Signal the client to stop receiving more data
+            self.stop()
+            return # Exit the handler
+
+        # Latest merged state per aircraft in this batch; only that reaches the queue
+        updates = {}
+        # One guard for the whole batch rather than one per message: decoding
+        # a validated message is not expected to raise, and if it ever does the
+        # updates gathered so far are still queued below
+        msg = None
+        try:
+            for msg, msg_bytes, ts in self.filter_messages(messages):
+                aircraft_data = self.decode_message(msg, msg_bytes, ts)
+                # Only process and print/queue if we have more than just basic info
+                if len(aircraft_data) > 3:
+                    # Log the decoded data for visibility; the timestamp is only
+                    # formatted when INFO is actually enabled
+                    if info:
+                        timestamp_str = datetime.fromtimestamp(ts).strftime("%H:%M:%S.%f")[:-3]
+                        log.info("ADS-B Decoded [%s]: %s", timestamp_str, aircraft_data)
+                    pending = updates.get(aircraft_data['icao'])
+                    if pending is None:
+                        updates[aircraft_data['icao']] = aircraft_data
+                    else:
+                        pending.update(aircraft_data)
+        except Exception as e:
+            log.error("ADS-B Client: ERROR decoding %s, skipping rest of batch: %s", msg, e)
+            if debug:
+                import traceback
+                log.debug(traceback.format_exc()) # Print full traceback for debugging
+
+        if updates:
+            records = list(updates.values())
+            if debug:
+                log.debug("adsb_client queue input: %s", records)
+            # Never block the dump1090 reader: records that don't fit are
+            # counted by the queue and gdl90_broadcaster logs the total periodically
+            self.data_queue.push_many(records)
+
+    def filter_messages(self, messages):
         """
-        # --- Add print statement to see raw messages received by the handler ---
-        for msg, ts in messages:
-            logging.debug(f"ADS-B Raw Handled: '{msg}' (len={len(msg)}) @ {ts}")
-        # --- End of added print statement ---
+        Validates a batch of raw messages.
+
+        Args:
+            messages: List of [raw_msg, timestamp] pairs from split_raw_messages
 
+        Returns:
+            List of (hex_msg, msg_bytes, timestamp) tuples for the DF17
+            messages with a valid CRC, in arrival order
+        """
+        debug = self._debug
+        frames = []
         for raw_msg, ts in messages:
-            if self.stop_event.is_set():
-                logging.info("ADS-B Client: Stop event received, stopping message handling.")
-                # Signal the client to stop receiving more data
-                if hasattr(self, 'stop'): # Check if stop method exists
-                    self.stop()
-                return # Exit the handler loop
-
-            # Manually strip '*' and ';' framing for raw mode
-            msg = raw_msg
-            if isinstance(msg, str) and msg.startswith('*') and msg.endswith(';'):
-                msg = msg[1:-1]
-            elif isinstance(msg, bytes) and msg.startswith(b'*') and msg.endswith(b';'):
-                # If pyModeS gives bytes, decode and strip
-                try:
-                    msg = msg.decode('ascii')[1:-1]
-                except UnicodeDecodeError:
-                    logging.error(f"ADS-B Decode Error: Could not decode '{raw_msg}' as ASCII")
-                    continue
+            # split_raw_messages already strips the '*' and ';' framing and
+            # always yields str; strip it here only if a framed message slips through
+            msg = raw_msg[1:-1] if raw_msg[:1] == '*' else raw_msg
 
-            # Now perform checks on the potentially stripped message 'msg'
-            if not msg or len(msg) != 28: # Check for standard 28-char hex length
-                # Optionally print skipped messages if debugging framing issues
-                # print(f"ADS-B Skipping msg (len {len(msg)}): '{msg}' from raw '{raw_msg}'")
+            # Check for the standard 28-char hex length of an extended squitter
+            if len(msg) != 28:
                 continue
 
-            df = pms.df(msg)
-            if df != 17: # Only process ADS-B messages (DF17)
+            # Only process ADS-B messages (DF17). The DF is the top 5 bits of the
+            # first byte, so it can be read off the first two hex digits
+            # without converting the rest of a message that is then discarded.
+            if msg[:2] not in DF17_PREFIXES:
                 continue
 
-            if pms.crc(msg) != 0: # Check CRC
-                # Add print statement here to see if CRC is failing
-                logging.debug(f"ADS-B CRC Failed: {msg}")
+            # Convert the hex once; the remaining fields are then plain byte reads.
+            # unhexlify is a strict fixed-format decoder (no whitespace skipping),
+            # about 2.5x faster than bytes.fromhex on a 28-digit message.
+            try:
+                msg_bytes = unhexlify(msg)
+            except ValueError: # binascii.Error, or non-ASCII text
+                if debug:
+                    log.debug("ADS-B Invalid hex: %s", msg)
                 continue
 
-            # If we reach here, it's a DF17 message with a valid CRC.
-            icao = pms.icao(msg)
-            tc = pms.adsb.typecode(msg)
+            if crc24(msg_bytes) != 0: # Check CRC
+                # Corrupt frames are routine at marginal reception; only
+                # format them when debugging
+                if debug:
+                    log.debug("ADS-B CRC Failed: %s", msg)
+                continue
 
-            aircraft_data = {'source': 'adsb', 'icao': icao, 'timestamp': datetime.fromtimestamp(ts)} # Use message timestamp
+            frames.append((msg, msg_bytes, ts))
+        return frames
 
-            try:
-                if 1 <= tc <= 4: # Identification and Category
-                    callsign = pms.adsb.callsign(msg)
-                    if callsign:
-                        aircraft_data['callsign'] = callsign.strip('_')
-                elif 9 <= tc <= 18: # Airborne Position (with Baro Altitude)
-                    logging.debug(f"Processing TC {tc} for {icao}")
-                    alt = pms.adsb.altitude(msg)
-                    if alt is not None:
-                        aircraft_data['altitude'] = alt # Altitude in feet
-                        logging.debug(f"Decoded Altitude: {alt} for {icao}")
-                    # Decode NIC and NACp if available
-                    # NIC/NACp cannot be reliably decoded from TC 9-18 using standard pyModeS functions.
-                    # Broadcaster will use default (0) if not updated by other message types (e.g., TC28-31).
-                    aircraft_data['nic'] = None # Set to None explicitly
-                    aircraft_data['nac_p'] = None # Set to None explicitly
-                    aircraft_data['nic'] = None # Set to None directly
-                    aircraft_data['nac_p'] = None # Set to None directly
-
-                    # --- CPR Decoding Logic ---
-                    # Ensure ICAO entry exists in cpr_data
-                    if icao not in self.cpr_data:
-                        self.cpr_data[icao] = {'odd': None, 'even': None}
-
-                    # Determine frame type and store message/timestamp
-                    oe_flag = pms.adsb.oe_flag(msg)
-                    frame_type = 'even' if oe_flag == 0 else 'odd'
-                    self.cpr_data[icao][frame_type] = {'ts': ts, 'msg': msg}
-                    logging.debug(f"Stored {frame_type} frame for {icao} at {ts}")
-
-                    # Check if we have a recent pair
-                    odd_frame = self.cpr_data[icao]['odd']
-                    even_frame = self.cpr_data[icao]['even']
-
-                    if odd_frame and even_frame:
-                        t_odd = odd_frame['ts']
-                        t_even = even_frame['ts']
-                        msg_odd = odd_frame['msg']
-                        msg_even = even_frame['msg']
-
-                        logging.debug(f"Found pair for {icao}. Odd: {t_odd}, Even: {t_even}")
-                        # Check if the pair is recent enough (e.g., within 10 seconds)
-                        if abs(t_odd - t_even) < 10.0:
-                            # Attempt to decode position
-                            logging.debug(f"Attempting position decode for {icao}")
-                            position = pms.adsb.position(msg_even, msg_odd, t_even, t_odd)
-                            if position:
-                                aircraft_data['latitude'] = position[0]
-                                aircraft_data['longitude'] = position[1]
-                                logging.debug(f"Position Decoded: {position} for {icao}")
-                                # Optional: Clear the used frames to prevent re-computation
-                                # self.cpr_data[icao] = {'odd': None, 'even': None}
-
-                elif tc == 19: # Airborne Velocity
-                    vel = pms.adsb.velocity(msg) # (speed, heading, vert_rate, speed_type)
-                    if vel and vel[0] is not None:
-                        aircraft_data['speed'] = vel[0] # knots
-                        aircraft_data['heading'] = vel[1] # degrees
-                        aircraft_data['track'] = vel[1]   # ADSB TC19 velocity info is actually track angle, not heading
-                        aircraft_data['vert_rate'] = vel[2] # fpm
-                        aircraft_data['speed_type'] = vel[3]
-                # Add other typecodes if needed for GDL90 (e.g., Surface Position 5-8, GNSS Alt 20-22)
+    def decode_message(self, msg, msg_bytes, ts):
+        """
+        Decodes one validated DF17 message.
 
-                # Only process and print/queue if we have more than just basic info
-                if len(aircraft_data) > 3:
-                    # Print the decoded data to the console for visibility
-                    timestamp_str = aircraft_data['timestamp'].strftime("%H:%M:%S.%f")[:-3]
-                    logging.info(f"ADS-B Decoded [{timestamp_str}]: {aircraft_data}")
-                    try:
-                        logging.debug(f"adsb_client queue input: {aircraft_data}")
-                        self.data_queue.put(aircraft_data, block=False)
-                    except queue.Full:
-                        # Handle queue full scenario if necessary, e.g., log a warning
-                        # print("Warning: ADS-B data queue is full. Discarding message.")
-                        # print("Warning: ADS-B data queue is full. Discarding message.")
-                        pass
+        Each pyModeS decoder is only called for the typecodes it accepts, so
+        none of them raise for a message that passed filter_messages; a field
+        they cannot decode comes back as None and is left out.
 
-            except Exception as e:
-                # Print specific errors during decoding
-                logging.error(f"ADS-B Client: ERROR decoding TC {tc} for {icao}: {e}")
-                import traceback
-                logging.debug(traceback.format_exc()) # Print full traceback for debugging
-                pass # Continue processing other messages
+        Args:
+            msg: The message as a 28-character hex string
+            msg_bytes: The same message as 14 bytes
+            ts: Receive timestamp (seconds since the epoch)
+
+        Returns:
+            Dict of decoded aircraft data
+        """
+        debug = self._debug
+        icao = msg[2:8] # AA field, same text pms.icao returns for DF17
+        tc = msg_bytes[4] >> 3 # First 5 bits of the ME field
+
+        # Message receive time as epoch seconds; nothing downstream needs a datetime
+        aircraft_data = {'source': 'adsb', 'icao': icao, 'timestamp': ts}
+
+        if 1 <= tc <= 4: # Identification and Category
+            callsign = pms.adsb.callsign(msg)
+            if callsign:
+                aircraft_data['callsign'] = callsign.strip('_')
+        elif 9 <= tc <= 18: # Airborne Position (with Baro Altitude)
+            if debug:
+                log.debug("Processing TC %d for %s", tc, icao)
+            alt = pms.adsb.altitude(msg)
+            if alt is not None:
+                aircraft_data['altitude'] = alt # Altitude in feet
+                if debug:
+                    log.debug("Decoded Altitude: %s for %s", alt, icao)
+            # Decode NIC and NACp if available
+            # NIC/NACp cannot be reliably decoded from TC 9-18 using standard pyModeS functions.
+            # Broadcaster will use default (0) if not updated by other message types (e.g., TC28-31).
+            aircraft_data['nic'] = aircraft_data['nac_p'] = None # Set to None explicitly
+
+            # --- CPR Decoding Logic ---
+            # Ensure ICAO entry exists in cpr_data, evicting the aircraft
+            # updated longest ago once the table is full
+            cpr_data = self.cpr_data
+            state = cpr_data.get(icao)
+            if state is None:
+                state = cpr_data[icao] = [None, None, None, None]
+                if len(cpr_data) > MAX_CPR_AIRCRAFT:
+                    cpr_data.popitem(last=False)
+            else:
+                cpr_data.move_to_end(icao)
+
+            # Store the frame's timestamp and CPR word in its even/odd slot
+            oe_flag = (msg_bytes[6] >> 2) & 1 # ME bit 22
+            slot = oe_flag << 1
+            state[slot] = ts
+            state[slot + 1] = cpr_word(msg_bytes)
+            if debug:
+                log.debug("Stored %s frame for %s at %s", 'odd' if oe_flag else 'even', icao, ts)
+
+            # Check if we have a recent pair
+            t_even, cpr_even, t_odd, cpr_odd = state
+            if t_even is not None and t_odd is not None:
+                if debug:
+                    log.debug("Found pair for %s. Odd: %s, Even: %s", icao, t_odd, t_even)
+                # Check if the pair is recent enough (e.g., within 10 seconds)
+                if abs(t_odd - t_even) < 10.0:
+                    # Attempt to decode position
+                    if debug:
+                        log.debug("Attempting position decode for %s", icao)
+                    position = global_position(cpr_even, cpr_odd, t_even, t_odd)
+                    if position:
+                        aircraft_data['latitude'] = position[0]
+                        aircraft_data['longitude'] = position[1]
+                        if debug:
+                            log.debug("Position Decoded: %s for %s", position, icao)
+
+        elif tc == 19: # Airborne Velocity
+            vel = pms.adsb.velocity(msg) # (speed, heading, vert_rate, speed_type)
+            if vel is not None and vel[0] is not None:
+                aircraft_data['speed'] = vel[0] # knots
+                aircraft_data['heading'] = vel[1] # degrees
+                aircraft_data['track'] = vel[1]   # ADSB TC19 velocity info is actually track angle, not heading
+                aircraft_data['vert_rate'] = vel[2] # fpm
+                aircraft_data['speed_type'] = vel[3]
+        # Add other typecodes if needed for GDL90 (e.g., Surface Position 5-8, GNSS Alt 20-22)
+
+        return aircraft_data
+
+    def connect(self):
+        """Opens the TCP connection to dump1090 and switches it to non-blocking mode."""
+        self.socket = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        self.socket.setblocking(False)
+
+    def read_messages(self):
+        """
+        Reads the raw feed until the stop event is set or dump1090 closes the
+        connection, passing each batch of complete messages to handle_messages.
+
+        The socket is only read once the selector reports it readable, and the
+        selector wakes every POLL_INTERVAL seconds so a stop request is seen
+        promptly without another thread having to close the socket under us.
+        """
+        buf = self._buffer
+        view = memoryview(buf)
+        size = len(buf)
+        tail = 0
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.socket, selectors.EVENT_READ)
+            while not self.stop_event.is_set():
+                if not selector.select(POLL_INTERVAL):
+                    continue
+                try:
+                    received = self.socket.recv_into(view[tail:])
+                except BlockingIOError:
+                    continue
+                if not received:
+                    log.info("ADS-B Client: dump1090 closed the connection.")
+                    return
+                ts = time.time()
+                tail += received
+
+                end = buf.rfind(b';', 0, tail) + 1
+                if not end:
+                    if tail == size:
+                        tail = 0 # A full buffer without a single ';' is not raw-format data
+                    continue
+                messages = split_raw_messages(buf[:end], ts)
+                # Keep the partial message after the last ';' for the next read
+                remainder = tail - end
+                buf[:remainder] = buf[end:tail]
+                tail = remainder
+                if messages:
+                    self.handle_messages(messages)
 
     def run(self):
-        """Calls the parent TcpClient's run method to handle socket operations."""
-        logging.info("ADS-B Client: Starting run loop.")
+        """Connects to dump1090 and handles its messages until stopped or disconnected."""
+        log.info("ADS-B Client: Starting run loop.")
         try:
-            # Call the parent class's run method which handles socket connection and data reading
-            # The parent's run method should handle the stop_event internally or through exceptions.
-            super().run()
+            self.connect()
+            self.read_messages()
         except ConnectionRefusedError:
-            # This might be caught by the parent, but added here for clarity if needed.
-            logging.error(f"ADS-B Client: Connection refused to {self.host}:{self.port}")
+            log.error(f"ADS-B Client: Connection refused to {self.host}:{self.port}")
         except OSError as e:
-             logging.error(f"ADS-B Client: Socket error during run: {e}")
+             log.error(f"ADS-B Client: Socket error during run: {e}")
         except Exception as e:
-            # Catch any other unexpected errors during the parent's run execution
-            logging.error(f"ADS-B Client: Unexpected error in run method: {e}")
+            # Catch any other unexpected errors while reading or decoding
+            log.error(f"ADS-B Client: Unexpected error in run method: {e}")
         finally:
             # This block executes whether the try block succeeded or failed.
-            logging.info("ADS-B Client: Run loop finished.")
-            # Ensure stop is called to clean up resources if the parent's run exits.
-            if hasattr(self, 'stop'):
-                self.stop()
+            log.info("ADS-B Client: Run loop finished.")
+            # Release the socket; run_client decides whether to reconnect
+            self.close()
 
     def start_thread(self):
         """Starts the client in a separate thread."""
         if self._thread is None or not self._thread.is_alive():
             self._thread = threading.Thread(target=self.run, daemon=True)
             self._thread.start()
-            logging.info("ADS-B Client: Thread started.")
+            log.info("ADS-B Client: Thread started.")
         else:
-            logging.info("ADS-B Client: Thread already running.")
+            log.info("ADS-B Client: Thread already running.")
 
     def stop(self):
-        """Safely stop the client and close the socket if it exists."""
-        logging.info("ADS-B Client: Stopping...")
+        """Signals all threads to stop and closes the socket."""
+        log.info("ADS-B Client: Stopping...")
         self.stop_event.set() # Signal threads using this event
+        self.close()
+
+    def close(self):
+        """Safely closes the socket if it exists."""
         if self.socket:
             try:
                 self.socket.close()
-                logging.info("ADS-B Client: Socket closed.")
+                log.info("ADS-B Client: Socket closed.")
             except Exception as e:
-                logging.error(f"ADS-B Client: Error closing socket: {e}")
+                log.error(f"ADS-B Client: Error closing socket: {e}")
+            self.socket = None
         else:
-            logging.info("ADS-B Client: No socket to close.")
-        # Call the superclass stop if necessary, though it might be redundant now
-        # super().stop() # Be cautious if the superclass method has side effects
+            log.info("ADS-B Client: No socket to close.")
 
 # --- Function to be called by the main script ---
 
@@ -212,35 +368,31 @@ def run_client(args, data_queue, stop_event):
         client = None
         try:
             client = AdsbClient(args.dump1090_host, args.dump1090_port, data_queue, stop_event)
-            # The base TcpClient's run() method likely contains the main loop.
-            # We need to ensure it respects the stop_event.
-            # Let's try running the client's internal loop directly if possible,
-            # or wrap the call to run() in our own loop that checks the stop event.
-            # The modified run() method above attempts to handle this.
-            client.run() # This will block until stop_event is set or connection fails
+            client.run() # This will block until stop_event is set or the connection drops
 
         except ConnectionRefusedError:
-            logging.error(f"ADS-B Main: Connection refused to {args.dump1090_host}:{args.dump1090_port}. Retrying in 10 seconds...")
+            log.error(f"ADS-B Main: Connection refused to {args.dump1090_host}:{args.dump1090_port}. Retrying in 10 seconds...")
         except OSError as e:
-             logging.error(f"ADS-B Main: OS Error connecting to dump1090: {e}. Retrying in 10 seconds...")
+             log.error(f"ADS-B Main: OS Error connecting to dump1090: {e}. Retrying in 10 seconds...")
         except Exception as e:
-            logging.error(f"ADS-B Main: Error running client: {e}")
+            log.error(f"ADS-B Main: Error running client: {e}")
             # Avoid rapid restarts on persistent errors
-            logging.error("ADS-B Main: Unexpected error. Retrying in 10 seconds...")
+            log.error("ADS-B Main: Unexpected error. Retrying in 10 seconds...")
 
         finally:
-            # Ensure client was successfully initialized before trying to stop it
-            if client and hasattr(client, 'stop'):
-                client.stop() # Ensure cleanup if the loop exits unexpectedly
+            # Ensure client was successfully initialized before trying to close it
+            if client:
+                client.close() # Ensure cleanup if the loop exits unexpectedly
 
-        if not stop_event.is_set():
-            time.sleep(10) # Wait before retrying connection
+        if stop_event.wait(10): # Wait before retrying, but wake at once on shutdown
+            break
 
-    logging.info("ADS-B Client Thread: Exiting.")
+    log.info("ADS-B Client Thread: Exiting.")
 
 # Example usage (for testing the module directly)
 if __name__ == '__main__':
     import argparse
+    from .ring_buffer import RingBuffer
 
     parser = argparse.ArgumentParser(description="ADS-B Client Module")
     parser.add_argument('--dump1090-host', type=str, default='127.0.0.1', help='dump1090 host')
@@ -254,7 +406,7 @@ if __name__ == '__main__':
         format="%(asctime)s %(levelname)s: %(message)s"
     )
 
-    test_queue = queue.Queue()
+    test_queue = RingBuffer()
     test_stop_event = threading.Event()
 
     logging.info("Testing ADS-B Client Module...")
@@ -0,0 +1,136 @@
+"""
+Per-aircraft state table for the broadcaster.
+
+dump1090 emits several message types per aircraft per second (position,
+altitude, velocity, identification), but only the latest combined state of
+each aircraft needs to reach the EFB. The table keeps one record per ICAO
+address that is updated in place, and a dirty set of the aircraft that
+changed since the broadcaster last swept it. The broadcaster then encodes
+one GDL90 traffic report per *changed aircraft* per cycle, rather than one
+per message received, and at most once per reporting interval per aircraft.
+
+Records are plain dicts because updates are partial: each ADS-B message
+type only carries some of the fields, and they are merged over time. The
+time each aircraft was last heard from is kept in a separate icao -> time
+dict rather than in its record, so the once-a-second aging sweep is a scan
+over plain floats instead of a lookup in every record.
+
+All times are time.monotonic(): a Pi without an RTC steps its wall clock
+when NTP or GPS time arrives, which must not age out (or freeze) traffic.
+"""
+import time
+
+# Aircraft not heard from for this long are dropped from the table
+STALE_AFTER = 30.0
+
+
+class AircraftTable:
+    """
+    Latest known state per aircraft, keyed by ICAO address.
+
+    Not thread-safe: owned by the broadcaster thread.
+    """
+
+    def __init__(self):
+        self.records = {}  # icao -> merged state dict
+        self.last_seen = {}  # icao -> monotonic time of the last update
+        self._dirty = {}  # icao -> None; a dict keeps the update order
+        self.last_sent = {}  # icao -> monotonic time it was last taken
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, icao):
+        return icao in self.records
+
+    def get(self, icao):
+        """Returns the record for ``icao``, or None if unknown."""
+        return self.records.get(icao)
+
+    def update(self, icao, data, now=None):
+        """
+        Merges a (possibly partial) update into the aircraft's record and
+        marks it dirty.
+
+        Args:
+            icao: ICAO address (hex string)
+            data: Dict of fields to merge
+            now: Monotonic time of the update (defaults to time.monotonic())
+
+        Returns:
+            The updated record
+        """
+        record = self.records.get(icao)
+        if record is None:
+            record = self.records[icao] = {}
+        record.update(data)
+        self.last_seen[icao] = time.monotonic() if now is None else now
+        self._dirty[icao] = None
+        return record
+
+    def take_dirty(self, min_interval=0.0, now=None):
+        """
+        Returns the aircraft updated since the last call and clears their
+        dirty flags.
+
+        With ``min_interval``, an aircraft returned less than ``min_interval``
+        seconds ago is held back and stays dirty; next_due() says when the
+        first held aircraft can be returned again.
+
+        Args:
+            min_interval: Minimum seconds between returns of one aircraft
+            now: Monotonic time (defaults to time.monotonic())
+
+        Returns:
+            List of (icao, record) tuples, in the order they were first updated
+        """
+        if not self._dirty:
+            return []
+        if now is None:
+            now = time.monotonic()
+        dirty, self._dirty = self._dirty, {}
+        records = self.records
+        last_sent = self.last_sent
+        taken = []
+        for icao in dirty:
+            record = records.get(icao)
+            if record is None:
+                continue
+            sent = last_sent.get(icao)
+            if sent is not None and now - sent < min_interval:
+                self._dirty[icao] = None
+                continue
+            last_sent[icao] = now
+            taken.append((icao, record))
+        return taken
+
+    def next_due(self, min_interval):
+        """
+        Returns the monotonic time at which the first aircraft held back by
+        take_dirty(min_interval) becomes due, or None if none are dirty.
+        Aircraft never taken before are due at once (-inf).
+        """
+        if not self._dirty:
+            return None
+        last_sent = self.last_sent
+        return min(last_sent.get(icao, float('-inf')) for icao in self._dirty) + min_interval
+
+    def expire(self, max_age=STALE_AFTER, now=None):
+        """
+        Removes aircraft that have not been updated within ``max_age`` seconds.
+
+        Args:
+            max_age: Maximum age in seconds
+            now: Monotonic time (defaults to time.monotonic())
+
+        Returns:
+            List of the removed ICAO addresses
+        """
+        cutoff = (time.monotonic() if now is None else now) - max_age
+        stale = [icao for icao, seen in self.last_seen.items() if seen < cutoff]
+        for icao in stale:
+            del self.records[icao]
+            del self.last_seen[icao]
+            self.last_sent.pop(icao, None)
+            self._dirty.pop(icao, None)
+        return stale
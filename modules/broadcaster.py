@@ -1,16 +1,51 @@
+import ipaddress
 import socket
+import sys
 import time
-import queue
 import threading
 import json
 import os
 from datetime import datetime, timezone
-from .gdl90 import create_heartbeat_message, create_ownship_report, create_ownship_geo_altitude, create_traffic_report
+from .gdl90 import (create_heartbeat_frame_template, frame_heartbeat, heartbeat_timestamp,
+                    frame_message_into, create_ownship_report, create_ownship_geo_altitude,
+                    create_traffic_payload)
+from .aircraft_table import AircraftTable
+from .nmea import parse_record
+from .ring_buffer import RingBuffer
+from .udp_batch import UdpBatchSender
 import logging
 
 # Constants
 HEARTBEAT_INTERVAL = 1.0  # Send heartbeat every 1 second
 DEFAULT_GPS_VALID = True # Assume GPS is valid for now for heartbeat
+DEFAULT_UDP_BURST = 256 # Max queued records drained per loop before the periodic work runs
+PERIODIC_INTERVAL = 1.0 # Ownship, geo altitude and traffic aging run every second
+TRAFFIC_SOURCES = ('adsb', 'sample_traffic')
+TRAFFIC_TIMEOUT = 30.0 # Drop traffic not heard from for this many seconds
+TRAFFIC_REPORT_INTERVAL = 1.0 # Max one traffic report per aircraft per interval
+SEND_BUFFER_SIZE = 1500 # Preallocated buffer that traffic frames are encoded into
+MAX_TRAFFIC_FRAME = 2 + 2 * (28 + 2) # Flags + worst-case stuffed 28-byte payload and CRC
+SEND_SOCKET_BUFFER = 1 << 20 # Requested socket send buffer size
+# Linux-only option, not exported by the socket module: sets the send buffer
+# past the net.core.wmem_max cap that applies to SO_SNDBUF (needs CAP_NET_ADMIN)
+SO_SNDBUFFORCE = 32 if sys.platform.startswith('linux') else None
+
+
+def traffic_coalesce_key(data):
+    """
+    Coalescing key for the data queue: pending updates for the same aircraft
+    are merged, since only the latest state is broadcast anyway.
+
+    Args:
+        data: Queue record from one of the clients
+
+    Returns:
+        (source, icao) for traffic records, None for anything else
+    """
+    if isinstance(data, dict) and data.get('source') in TRAFFIC_SOURCES and data.get('icao'):
+        return (data['source'], data['icao'])
+    return None
+
 
 class Broadcaster:
     def __init__(self, args, data_queue, stop_event):
@@ -19,51 +54,171 @@ class Broadcaster:
         self.data_queue = data_queue
         self.stop_event = stop_event
         self.sock = None
+        self.batch_sender = None
+        self.sockets = [] # (socket, UdpBatchSender) per interface
+        # Records drained per loop; the frames they produce are sent together
+        self.udp_burst = max(1, getattr(args, 'udp_burst', DEFAULT_UDP_BURST) or DEFAULT_UDP_BURST)
+        self.pending_messages = []
+        # Traffic frames are framed straight into this buffer and queued as
+        # memoryview slices of it, rather than as a new bytes object each
+        self.send_buf = bytearray(SEND_BUFFER_SIZE)
+        self.send_view = memoryview(self.send_buf)
+        self.send_buf_used = 0
         self.last_heartbeat_time = 0
+        # Pre-encoded heartbeats for both GPS-valid flags; only the timestamp changes
+        self.heartbeat_templates = {
+            gps_valid: create_heartbeat_frame_template(gps_valid=gps_valid) for gps_valid in (True, False)
+        }
+        # Last encoded frame per periodic message, keyed by its inputs
+        self.frame_cache = {}
         # Add state for ownship data if needed for reports
         self.ownship_data = {}
-        # Add state for traffic data (dictionary keyed by ICAO hex)
-        self.traffic_data = {}
+        # Latest state per aircraft (keyed by ICAO hex); traffic reports are
+        # encoded once per changed aircraft per burst, not once per message
+        self.traffic_table = AircraftTable()
+        self.traffic_data = self.traffic_table.records
+        # Monotonic time of the current queue drain, shared by its records
+        self.drain_time = None
+        # Queue records are dispatched on their source, then FLARM records on
+        # their sentence type, with one dict lookup each
+        self._source_handlers = {
+            'adsb': self._handle_traffic,
+            'sample_traffic': self._handle_traffic,
+            'flarm': self._handle_flarm,
+        }
+        self._flarm_handlers = {'PFLAA': self._handle_pflaa}
+        # GPS data from FLARM is ignored entirely while location spoofing is enabled
+        if not (getattr(args, 'spoof_gps', False) or getattr(args, 'location_file', None) is not None):
+            self._flarm_handlers.update({
+                'GPGGA': self._handle_gga, 'GNGGA': self._handle_gga,
+                'GPRMC': self._handle_rmc, 'GNRMC': self._handle_rmc,
+                'PGRMZ': self._handle_pgrmz,
+            })
         logging.info(f"Broadcaster: Initialized for {self.broadcast_address[0]}:{self.broadcast_address[1]}")
 
+    def interfaces(self):
+        """Returns the interfaces to broadcast on ([None] = default route)."""
+        interface = getattr(self.args, 'interface', None)
+        if not interface:
+            return [None]
+        if isinstance(interface, str):
+            return [interface]
+        return list(interface)
+
     def setup_socket(self):
-        """Creates and configures the UDP broadcast socket."""
+        """
+        Creates and configures the UDP broadcast socket(s).
+
+        One socket is created per ``--interface``, each with its own batch
+        sender, so every interface gets an independent TX path. ``self.sock``
+        and ``self.batch_sender`` refer to the first one.
+        """
+        self.sockets = []
+        for interface in self.interfaces():
+            sock = self.create_socket(interface)
+            if sock is None:
+                self.close_socket()
+                return False
+            connected = self.connect_socket(sock)
+            self.sockets.append((sock, UdpBatchSender(sock, self.broadcast_address, connected)))
+        self.sock, self.batch_sender = self.sockets[0]
+        logging.info(f"Broadcaster: {len(self.sockets)} UDP socket(s) created for {self.broadcast_address}")
+        return True
+
+    def create_socket(self, interface=None):
+        """
+        Creates a UDP broadcast socket, optionally bound to one interface.
+
+        Args:
+            interface: Network interface name, or None for the default route
+
+        Returns:
+            The socket, or None on failure
+        """
+        sock = None
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
             # Allow reusing the address (important for quick restarts)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Let the per-interface sockets share the same address/port
+            if hasattr(socket, 'SO_REUSEPORT'):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             # Enable broadcasting mode
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
             # Bind to specific interface if provided
-            if hasattr(self.args, 'interface') and self.args.interface:
+            if interface:
                 try:
                     # SO_BINDTODEVICE is Linux-specific and requires root privileges
                     # The value 25 is the socket option number for SO_BINDTODEVICE on Linux
-                    self.sock.setsockopt(socket.SOL_SOCKET, 25, self.args.interface.encode())
-                    logging.info(f"Broadcaster: Binding to interface: {self.args.interface}")
+                    sock.setsockopt(socket.SOL_SOCKET, 25, interface.encode())
+                    logging.info(f"Broadcaster: Binding to interface: {interface}")
                 except PermissionError:
-                    logging.error(f"Broadcaster: ERROR - Binding to interface {self.args.interface} requires root privileges")
-                    return False
+                    logging.error(f"Broadcaster: ERROR - Binding to interface {interface} requires root privileges")
+                    sock.close()
+                    return None
                 except Exception as e:
-                    logging.error(f"Broadcaster: ERROR - Failed to bind to interface {self.args.interface}: {e}")
+                    logging.error(f"Broadcaster: ERROR - Failed to bind to interface {interface}: {e}")
                     logging.info("Broadcaster: Continuing with default interface")
-            
-            # Set a timeout so the receive/send calls don't block indefinitely
-            self.sock.settimeout(0.5)
-            logging.info(f"Broadcaster: UDP Socket created for {self.broadcast_address}")
-            return True
+
+            # Broadcast sends never need to wait: with a large send buffer a
+            # full buffer is a transient condition, and dropping the frame
+            # beats stalling the loop (the next update supersedes it anyway)
+            self.set_send_buffer(sock)
+            sock.setblocking(False)
+            return sock
         except socket.error as e:
             logging.error(f"Broadcaster: Error creating socket: {e}")
-            self.sock = None
-            return False
         except Exception as e:
             logging.error(f"Broadcaster: Unexpected error setting up socket: {e}")
-            self.sock = None
+        if sock:
+            sock.close()
+        return None
+
+    def set_send_buffer(self, sock):
+        """
+        Sizes a socket's send buffer to SEND_SOCKET_BUFFER.
+
+        Plain SO_SNDBUF is silently capped at net.core.wmem_max (about 208 KiB
+        on a stock Raspberry Pi OS), so SO_SNDBUFFORCE is tried first; it
+        works when running as root, which --interface already requires.
+        """
+        if SO_SNDBUFFORCE is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, SO_SNDBUFFORCE, SEND_SOCKET_BUFFER)
+                return
+            except OSError:
+                pass # Not privileged: fall back to the capped option
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_SOCKET_BUFFER)
+
+    def connect_socket(self, sock):
+        """
+        Connects a UDP socket to the broadcast address, so sends skip the
+        per-datagram address conversion and route lookup. SO_BROADCAST must
+        already be set for a broadcast address.
+
+        Only broadcast and multicast destinations are connected: a connected
+        socket also reports ICMP port-unreachable errors, which a unicast
+        receiver sends whenever its EFB app is not listening.
+
+        Returns:
+            True if connected, False to keep sending with an explicit address
+        """
+        try:
+            ip = ipaddress.ip_address(self.broadcast_address[0])
+        except ValueError:
+            return False # Host name: leave resolution to sendto
+        if not (ip == ipaddress.IPv4Address('255.255.255.255') or ip.is_multicast):
+            return False
+        try:
+            sock.connect(self.broadcast_address)
+            return True
+        except OSError as e:
+            logging.warning(f"Broadcaster: Could not connect socket to {self.broadcast_address}, using sendto: {e}")
             return False
 
     def send_message(self, message_bytes):
-        """Sends a GDL90 message over the UDP socket."""
+        """Sends a GDL90 message over every UDP socket."""
         if not self.sock:
             # print("Broadcaster: Socket not available, cannot send message.")
             return False
@@ -72,9 +227,14 @@ class Broadcaster:
             return False
 
         try:
-            self.sock.sendto(message_bytes, self.broadcast_address)
+            for _, sender in self.sockets:
+                sender.send([message_bytes])
             # print(f"DEBUG: Sent {len(message_bytes)} bytes to {self.broadcast_address}") # Optional debug
             return True
+        except BlockingIOError:
+            # Send buffer full: drop this frame, the socket is still fine
+            logging.debug("Broadcaster: Send buffer full, dropped message")
+            return False
         except socket.error as e:
             logging.error(f"Broadcaster: Socket error sending message: {e}")
             # Consider closing/reopening socket on certain errors
@@ -85,186 +245,225 @@ class Broadcaster:
             return False
 
     def close_socket(self):
-        """Closes the UDP socket."""
-        if self.sock:
+        """Closes the UDP socket(s)."""
+        if self.sockets:
             logging.info("Broadcaster: Closing UDP socket.")
-            self.sock.close()
-            self.sock = None
+            for sock, _ in self.sockets:
+                sock.close()
+        self.sockets = []
+        self.sock = None
+        self.batch_sender = None
+
+    def send_messages(self, messages):
+        """
+        Sends a burst of GDL90 messages with as few syscalls as possible.
 
-    def process_data_queue(self):
-        """Processes messages from the input data queue."""
+        Returns:
+            The lowest number of messages sent on any socket
+        """
+        if not self.sock or not messages:
+            return 0
         try:
-            data = self.data_queue.get_nowait() # Non-blocking get
-            # print(f"DEBUG: Processing data: {data}") # Optional debug
+            return min(sender.send(messages) for _, sender in self.sockets)
+        except BlockingIOError:
+            # Send buffer full: drop the rest of the burst, the socket is still fine
+            logging.debug(f"Broadcaster: Send buffer full, dropped up to {len(messages)} messages")
+            return 0
+        except socket.error as e:
+            logging.error(f"Broadcaster: Socket error sending {len(messages)} messages: {e}")
+            self.close_socket()
+            return 0
+        except Exception as e:
+            logging.error(f"Broadcaster: Unexpected error sending messages: {e}")
+            return 0
+
+    def flush_pending(self):
+        """Sends all traffic frames encoded during the current burst."""
+        if not self.pending_messages:
+            return
+        sent = self.send_messages(self.pending_messages)
+        if sent < len(self.pending_messages):
+            logging.warning(f"Broadcaster: Sent {sent} of {len(self.pending_messages)} traffic messages")
+        self.pending_messages.clear()
+        self.send_buf_used = 0
+
+    def queue_frame(self, payload):
+        """
+        Frames a message payload into the send buffer and queues it for the
+        next burst send, flushing first if the buffer is nearly full.
+        """
+        if len(self.send_buf) - self.send_buf_used < MAX_TRAFFIC_FRAME:
+            self.flush_pending()
+        start = self.send_buf_used
+        self.send_buf_used += frame_message_into(self.send_buf, start, payload)
+        self.pending_messages.append(self.send_view[start:self.send_buf_used])
+
+    def build_heartbeat(self, gps_valid):
+        """Frames a heartbeat from its pre-encoded template, stamped with the current time."""
+        return frame_heartbeat(self.heartbeat_templates[bool(gps_valid)], heartbeat_timestamp())
+
+    def cached_frame(self, name, create, **kwargs):
+        """
+        Returns a framed periodic message, re-encoding it only when its inputs
+        have changed since the last call (e.g. ownship while spoofing GPS).
+
+        Args:
+            name: Cache slot for this message type
+            create: Message creation function, called with ``kwargs``
+        """
+        key = tuple(kwargs.values())
+        cached = self.frame_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        frame = create(**kwargs)
+        self.frame_cache[name] = (key, frame)
+        return frame
+
+    def process_data_queue(self, timeout=0):
+        """
+        Drains up to one burst of messages from the input data queue.
+
+        Records are handled as soon as they are available; batching only
+        happens when several are already queued when the burst starts, so
+        batching never adds latency. If the queue is empty, waits up to
+        ``timeout`` seconds for the first record.
+
+        Records only update the aircraft table; reports are encoded by
+        ``encode_dirty_traffic()``. Every record in the burst is stamped with
+        the same monotonic time, ``self.drain_time``.
+        """
+        if not self.data_queue.wait(timeout):
+            return
+        self.drain_time = time.monotonic()
+        # Each record is handled in place in its ring slot
+        self.data_queue.read_many_zero_copy(self.handle_data, self.udp_burst)
+
+    def encode_dirty_traffic(self, now=None):
+        """
+        Encodes one traffic report for every aircraft updated since the last
+        call, and queues it for the burst send. Aircraft reported within the
+        last TRAFFIC_REPORT_INTERVAL stay pending until they are due, so a
+        busy aircraft is reported at the interval, with its latest state.
+
+        Args:
+            now: Monotonic time of the current loop iteration
+        """
+        queue_frame = self.queue_frame # Bound once for the whole sweep
+        for icao, record in self.traffic_table.take_dirty(TRAFFIC_REPORT_INTERVAL, now):
+            try:
+                # Only report aircraft with a known position and altitude
+                stored_lat = record.get('latitude')
+                stored_lon = record.get('longitude')
+                # Check stored altitude as well, as it might come from a different message than lat/lon
+                stored_alt = record.get('altitude')
+
+                if stored_lat is not None and stored_lon is not None and stored_alt is not None:
+                    # We have the essentials, create the report using the latest stored data
+                    # Determine misc byte based on airborne status
+                    # Address Type: ADS-B ICAO (0)
+                    # Airborne Status: Bit 3 (0=On Ground, 1=Airborne)
+                    is_airborne = record.get('airborne_status', True) # Default to airborne
+                    misc_byte = 0x08 if is_airborne else 0x00 # Bit 3: 1=Airborne, 0=Ground
+                    # Set bits 1 & 0 to indicate True Track Angle is valid (01)
+                    # See GDL90 Spec Table 9
+                    misc_byte |= 0x01
+
+                    traffic_payload = create_traffic_payload(
+                        icao=icao,
+                        lat=stored_lat,
+                        lon=stored_lon,
+                        alt_press=stored_alt,
+                        misc_flags=misc_byte, # Pass the calculated misc flags (Airborne + Track Type)
+                        address_type=0,       # Assuming ADS-B ICAO address type for all traffic here
+                        nic=record.get('nic', 8),
+                        nac_p=record.get('nac_p', 8),
+                        horiz_vel=record.get('speed'),
+                        vert_vel=record.get('vert_rate'),
+                        # For ADS-B data, TC19 velocity messages provide track angle, not true heading
+                        # We prioritize 'track' over 'heading' for proper directional display
+                        track=record.get('track', record.get('heading')),
+                        emitter_cat=record.get('emitter_cat', 1),
+                        callsign=record.get('callsign')
+                    ) # Close the create_traffic_payload function call
+                    # Framed into the send buffer; sent with the rest of the burst by flush_pending()
+                    queue_frame(traffic_payload)
+            except Exception as e:
+                logging.error(f"Broadcaster: Error encoding traffic report for {icao}: {e}")
 
-            if data.get('source') == 'adsb' or data.get('source') == 'sample_traffic':
-                # --- ADS-B or Sample Traffic Processing ---
-                # Process both ADS-B and Sample Traffic sources the same way
-                # Sample traffic is pre-formatted to match ADS-B data structure
-                icao = data.get('icao')
-                if icao:
-                    # Update traffic data store
-                    if icao not in self.traffic_data:
-                        self.traffic_data[icao] = {'last_seen': time.time()}
-                    self.traffic_data[icao].update(data)
-                    self.traffic_data[icao]['last_seen'] = time.time()
-                    
-                    # Debug print for sample traffic
-                    if data.get('source') == 'sample_traffic':
-                        logging.debug(f"Sample Traffic: {icao} at {data.get('latitude'):.4f}, {data.get('longitude'):.4f}, alt={data.get('altitude')}")
-
-                    # After updating state, check if we have enough stored data to send a report
-                    stored_lat = self.traffic_data[icao].get('latitude')
-                    stored_lon = self.traffic_data[icao].get('longitude')
-                    # Check stored altitude as well, as it might come from a different message than lat/lon
-                    stored_alt = self.traffic_data[icao].get('altitude')
-
-                    if stored_lat is not None and stored_lon is not None and stored_alt is not None:
-                        # We have the essentials, create the report using the latest stored data
-                        # Determine misc byte based on airborne status
-                        # Address Type: ADS-B ICAO (0)
-                        # Airborne Status: Bit 3 (0=On Ground, 1=Airborne)
-                        is_airborne = self.traffic_data[icao].get('airborne_status', True) # Default to airborne
-                        misc_byte = 0x08 if is_airborne else 0x00 # Bit 3: 1=Airborne, 0=Ground
-                        # Set bits 1 & 0 to indicate True Track Angle is valid (01)
-                        # See GDL90 Spec Table 9
-                        misc_byte |= 0x01
-
-                        traffic_msg = create_traffic_report(
-                            icao=icao,
-                            lat=stored_lat,
-                            lon=stored_lon,
-                            alt_press=stored_alt,
-                            misc_flags=misc_byte, # Pass the calculated misc flags (Airborne + Track Type)
-                            address_type=0,       # Assuming ADS-B ICAO address type for all traffic here
-                            nic=self.traffic_data[icao].get('nic', 8),
-                            nac_p=self.traffic_data[icao].get('nac_p', 8),
-                            horiz_vel=self.traffic_data[icao].get('speed'),
-                            vert_vel=self.traffic_data[icao].get('vert_rate'),
-                            # For ADS-B data, TC19 velocity messages provide track angle, not true heading
-                            # We prioritize 'track' over 'heading' for proper directional display
-                            track=self.traffic_data[icao].get('track', self.traffic_data[icao].get('heading')),
-                            emitter_cat=self.traffic_data[icao].get('emitter_cat', 1),
-                            callsign=self.traffic_data[icao].get('callsign')
-                        ) # Close the create_traffic_report function call
-                        if traffic_msg:
-                            # Consider adding rate limiting here if needed, but send for now
-                            send_result = self.send_message(traffic_msg)
-                            if data.get('source') == 'sample_traffic' and not send_result:
-                                logging.warning(f"Sample Traffic: Failed to send traffic message for {icao}")
-
-            elif data.get('source') == 'flarm':
-                # --- FLARM Processing ---
-                # The raw NMEA is already printed by flarm_client
-                # We might want to convert specific FLARM messages (e.g., PFLAA)
-                # to GDL90 Traffic Reports if they represent other aircraft.
-                msg_type = data.get('msg_type')
-                fields = data.get('fields', [])
-
-                if msg_type == 'PFLAA' and len(fields) >= 6:
-                    # Example: Convert PFLAA to GDL90 Traffic Report
-                    # Note: PFLAA provides relative positions, GDL90 needs absolute.
-                    # This requires knowing ownship position. For now, we skip conversion.
-                    # print(f"DEBUG: Received FLARM PFLAA: {fields}")
-                    pass
-                elif msg_type in ['GPGGA', 'GPRMC', 'GNGGA', 'GNRMC', 'PGRMZ']:
-                    # Check if we're using location spoofing
-                    spoof_gps_enabled = getattr(self.args, 'spoof_gps', False)
-                    location_file_enabled = getattr(self.args, 'location_file', None) is not None
-                    
-                    # Skip all GPS/NMEA processing when location spoofing is enabled
-                    if spoof_gps_enabled or location_file_enabled:
-                        # Silently ignore GPS data from FLARM when spoofing is enabled
-                        pass
-                    else:
-                        # Process GPS data normally when not spoofing
-                        # Example for GPGGA:
-                        # GNGGA/GPGGA: Need index 9 for altitude, index 6 for fix quality
-                        if msg_type.endswith('GGA') and len(fields) >= 10:
-                            try:
-                                lat_nmea_str = fields[1]
-                                lat_dir = fields[2]
-                                lon_nmea_str = fields[3]
-                                lon_dir = fields[4]
-                                fix_quality_str = fields[6]
-                                alt_geo_str = fields[9] # Altitude MSL is index 9
-
-                                # Check if essential fields are non-empty before conversion
-                                if lat_nmea_str and lon_nmea_str and fix_quality_str:
-                                    lat_nmea = float(lat_nmea_str)
-                                    lon_nmea = float(lon_nmea_str)
-                                    fix_quality = int(fix_quality_str)
-                                    alt_geo = float(alt_geo_str) if alt_geo_str else None # Altitude can be empty
-
-                                    # Convert NMEA format (DDDMM.MMMM) to decimal degrees
-                                    lat_deg = int(lat_nmea / 100)
-                                    lat_min = lat_nmea - (lat_deg * 100)
-                                    self.ownship_data['latitude'] = lat_deg + (lat_min / 60.0)
-                                    if lat_dir == 'S': self.ownship_data['latitude'] *= -1
-
-                                    lon_deg = int(lon_nmea / 100)
-                                    lon_min = lon_nmea - (lon_deg * 100)
-                                    self.ownship_data['longitude'] = lon_deg + (lon_min / 60.0)
-                                    if lon_dir == 'W': self.ownship_data['longitude'] *= -1
-
-                                    self.ownship_data['altitude_geo'] = alt_geo * 3.28084 if alt_geo is not None else None # Meters to feet
-                                    self.ownship_data['gps_valid'] = fix_quality > 0
-                                else:
-                                    # If essential fields are missing, just mark GPS as invalid without defaulting to any location
-                                    logging.warning(f"FLARM Client: Missing essential GPS fields ({msg_type}). GPS marked as invalid.")
-                                    # Don't set default coordinates anymore
-                                    self.ownship_data['gps_valid'] = False
-                                    # raise ValueError("Missing essential GPS fields (lat/lon/fix)") # Removed error raising
-
-                                self.ownship_data['last_gps_update'] = time.time()
-                                # print(f"DEBUG: Updated ownship position: Lat={self.ownship_data['latitude']:.4f}, Lon={self.ownship_data['longitude']:.4f}, AltGeo={self.ownship_data['altitude_geo']}")
-                            except (ValueError, IndexError) as e:
-                                logging.error(f"FLARM Client: Error parsing GPS data ({msg_type}): {e}")
-                        # GNRMC/GPRMC: Need index 1 (status), 6 (speed), 7 (track)
-                        elif msg_type.endswith('RMC') and len(fields) >= 8:
-                            try:
-                                status = fields[1]
-                                if status == 'A': # 'A' = Active/Valid, 'V' = Void
-                                    speed_knots_str = fields[6]
-                                    track_deg_str = fields[7]
-                                    if speed_knots_str:
-                                        self.ownship_data['speed'] = float(speed_knots_str)
-                                    if track_deg_str:
-                                        self.ownship_data['track'] = float(track_deg_str)
-                                    # print(f"DEBUG: Updated ownship speed/track: Speed={self.ownship_data.get('speed'):.1f}, Track={self.ownship_data.get('track'):.1f}")
-                                else:
-                                    # If RMC is void, invalidate speed/track? Or just don't update?
-                                    # Let's just not update for now.
-                                    pass
-                            except (ValueError, IndexError) as e:
-                                logging.error(f"FLARM Client: Error parsing GPS data ({msg_type}): {e}")
-                        # PGRMZ: Need index 0 (altitude), 1 (unit)
-                        elif msg_type == 'PGRMZ' and len(fields) >= 2:
-                            try:
-                                alt_str = fields[0]
-                                unit = fields[1]
-                                if alt_str and unit.upper() == 'F': # Check for non-empty string and feet unit
-                                    self.ownship_data['altitude_press'] = int(alt_str)
-                                    # print(f"DEBUG: Updated ownship pressure altitude: AltPress={self.ownship_data['altitude_press']}")
-                                elif alt_str and unit.upper() == 'M': # Handle meters if needed
-                                    self.ownship_data['altitude_press'] = int(float(alt_str) * 3.28084)
-                                    # print(f"DEBUG: Updated ownship pressure altitude (from meters): AltPress={self.ownship_data['altitude_press']}")
-                            except (ValueError, IndexError) as e:
-                                logging.error(f"FLARM Client: Error parsing Pressure Altitude data ({msg_type}): {e}")
-                    # Handle other relevant FLARM messages (PFLAU, etc.) if needed
-
-            self.data_queue.task_done() # Signal that the item is processed
-
-        except queue.Empty:
-            # Queue is empty, nothing to do
-            pass
+    def handle_data(self, data):
+        """Handles a single ADS-B, sample traffic or FLARM record."""
+        try:
+            # print(f"DEBUG: Processing data: {data}") # Optional debug
+            handler = self._source_handlers.get(data.get('source'))
+            if handler:
+                handler(data)
         except Exception as e:
             logging.error(f"Broadcaster: Error processing data queue item: {e}")
-            # Ensure task_done is called even if there's an error processing
-            try:
-                self.data_queue.task_done()
-            except ValueError: # task_done called too many times
-                pass
+
+    def _handle_traffic(self, data):
+        """Merges an ADS-B or sample traffic record into the aircraft table."""
+        # Process both ADS-B and Sample Traffic sources the same way
+        # Sample traffic is pre-formatted to match ADS-B data structure
+        icao = data.get('icao')
+        if icao:
+            # Merge into the aircraft's state; the report is encoded
+            # by encode_dirty_traffic() at the end of the burst
+            self.traffic_table.update(icao, data, self.drain_time)
+
+            # Debug print for sample traffic
+            if data.get('source') == 'sample_traffic':
+                logging.debug(f"Sample Traffic: {icao} at {data.get('latitude'):.4f}, {data.get('longitude'):.4f}, alt={data.get('altitude')}")
+
+    def _handle_flarm(self, data):
+        """Dispatches a FLARM record on its NMEA sentence type."""
+        # The raw NMEA is already printed by flarm_client
+        handler = self._flarm_handlers.get(data.get('msg_type'))
+        if handler:
+            handler(data)
+        # Handle other relevant FLARM messages (PFLAU, etc.) if needed
+
+    def _handle_pflaa(self, data):
+        """Handles a FLARM PFLAA (traffic) sentence."""
+        # Example: Convert PFLAA to GDL90 Traffic Report
+        # Note: PFLAA provides relative positions, GDL90 needs absolute.
+        # This requires knowing ownship position. For now, we skip conversion.
+        # print(f"DEBUG: Received FLARM PFLAA: {data.get('fields')}")
+        pass
+
+    # The FLARM client has already decoded the GPS sentences into records
+
+    def _handle_gga(self, data):
+        """Updates the ownship position from a GGA record."""
+        record = data.get('record')
+        if record is None:
+            return
+        if record.latitude is not None:
+            self.ownship_data['latitude'] = record.latitude
+            self.ownship_data['longitude'] = record.longitude
+            self.ownship_data['altitude_geo'] = record.altitude_geo
+            self.ownship_data['gps_valid'] = record.gps_valid
+        else:
+            # If essential fields are missing, just mark GPS as invalid without defaulting to any location
+            logging.warning(f"FLARM Client: Missing essential GPS fields ({data.get('msg_type')}). GPS marked as invalid.")
+            self.ownship_data['gps_valid'] = False
+        self.ownship_data['last_gps_update'] = time.monotonic() if self.drain_time is None else self.drain_time
+
+    def _handle_rmc(self, data):
+        """Updates the ownship speed and track from an RMC record."""
+        # Only decoded for an active fix; void RMC has no record
+        record = data.get('record')
+        if record is None:
+            return
+        if record.speed is not None:
+            self.ownship_data['speed'] = record.speed
+        if record.track is not None:
+            self.ownship_data['track'] = record.track
+
+    def _handle_pgrmz(self, data):
+        """Updates the ownship pressure altitude from a PGRMZ record."""
+        record = data.get('record')
+        if record is not None:
+            self.ownship_data['altitude_press'] = record.altitude_press
 
 
     def run(self):
@@ -276,6 +475,7 @@ class Broadcaster:
 
         last_ownship_report_time = 0
         last_ownship_geo_alt_time = 0
+        last_traffic_expire_time = 0
         # Access the spoofing parameters from the args passed during initialization
         spoof_gps_enabled = getattr(self.args, 'spoof_gps', False)
         location_file = getattr(self.args, 'location_file', None)
@@ -296,104 +496,134 @@ class Broadcaster:
         elif spoof_gps_enabled:
             logging.info("*** Broadcaster: GPS Spoofing Enabled with default values ***")
 
-        while not self.stop_event.is_set():
-            now = time.monotonic() # Use monotonic clock for intervals
+        # --- Apply Spoofing if Enabled ---
+        # The spoofed values never change, and FLARM GPS updates are ignored
+        # while spoofing, so the ownship data is filled in once here
+        if self.location_data:
+            # Use values from the loaded location file
+            self.ownship_data.update({
+                'latitude': self.location_data.get('latitude', -28.0016),
+                'longitude': self.location_data.get('longitude', 153.4291),
+                'altitude_geo': self.location_data.get('altitude_geo', 5),
+                'altitude_press': self.location_data.get('altitude_press', 5),
+                'speed': self.location_data.get('speed', 0),
+                'track': self.location_data.get('track', 0),
+                'vert_rate': self.location_data.get('vert_rate', 0),
+                'gps_valid': self.location_data.get('gps_valid', True),
+            })
+        elif spoof_gps_enabled:
+            # Use default hardcoded values if no location file provided
+            self.ownship_data.update({
+                'latitude': -27.4698, # Brisbane Lat
+                'longitude': 153.0251, # Brisbane Lon
+                'altitude_geo': 1500, # Spoofed Geo Alt (feet)
+                'speed': 120, # Spoofed Speed (knots)
+                'track': 90, # Spoofed Track (degrees)
+                'vert_rate': 500, # Spoofed Vertical Rate (fpm) - climbing
+                'gps_valid': True,
+                'altitude_press': 1000, # Spoof pressure altitude as well
+            })
+
+        # Bound once rather than looked up on every pass of the loop. These
+        # objects are only ever updated in place, never rebound
+        stop_is_set = self.stop_event.is_set
+        monotonic = time.monotonic
+        od = self.ownship_data
+        pending = self.pending_messages
+        traffic_table = self.traffic_table
+        process_data_queue = self.process_data_queue
+        encode_dirty_traffic = self.encode_dirty_traffic
+        flush_pending = self.flush_pending
+
+        while not stop_is_set():
+            # A failed send closes the socket(s); recreate them before going on
+            if not self.sock:
+                logging.error("Broadcaster: Send failed. Attempting to reset socket...")
+                if not self.setup_socket():
+                    logging.error("Broadcaster: Failed to reset socket. Waiting before retry...")
+                    self.stop_event.wait(5)
+                    continue
+
+            # Block on the queue until the next periodic task is due, so an
+            # idle loop sleeps and arrivals are forwarded immediately
+            next_deadline = min(self.last_heartbeat_time + HEARTBEAT_INTERVAL,
+                                last_traffic_expire_time + PERIODIC_INTERVAL)
+            if 'latitude' in od and 'altitude_press' in od:
+                next_deadline = min(next_deadline, last_ownship_report_time + PERIODIC_INTERVAL)
+            if 'altitude_geo' in od:
+                next_deadline = min(next_deadline, last_ownship_geo_alt_time + PERIODIC_INTERVAL)
+            traffic_due = traffic_table.next_due(TRAFFIC_REPORT_INTERVAL)
+            if traffic_due is not None:
+                next_deadline = min(next_deadline, traffic_due)
+            process_data_queue(timeout=max(0, next_deadline - monotonic()))
+            if stop_is_set():
+                break
+            now = monotonic() # Use monotonic clock for intervals
+            # Reports for aircraft updated now, or held back and now due
+            encode_dirty_traffic(now)
 
             # Send Heartbeat periodically
             if now - self.last_heartbeat_time >= HEARTBEAT_INTERVAL:
                 # If spoofing, force GPS valid for heartbeat
-                gps_valid_flag = True if spoof_gps_enabled else self.ownship_data.get('gps_valid', False)
+                gps_valid_flag = True if spoof_gps_enabled else od.get('gps_valid', False)
                 # Print debugging info for the heartbeat
                 if spoof_gps_enabled:
                     logging.debug(f"Sending heartbeat with GPS Valid = {gps_valid_flag}")
-                heartbeat_msg = create_heartbeat_message(gps_valid=gps_valid_flag)
-                if not self.send_message(heartbeat_msg):
-                    logging.error("Broadcaster: Heartbeat send failed. Attempting to reset socket...")
-                    self.close_socket()
-                    if not self.setup_socket():
-                        logging.error("Broadcaster: Failed to reset socket. Waiting before retry...")
-                        time.sleep(5)
-                        continue
+                # Queued rather than sent, so it goes out in this loop's burst
+                pending.append(self.build_heartbeat(gps_valid_flag))
                 self.last_heartbeat_time = now
 
-            # Process items from the queue
-            self.process_data_queue()
-
-            # --- Apply Spoofing if Enabled ---
-            if self.location_data:
-                # Use values from the loaded location file
-                self.ownship_data['latitude'] = self.location_data.get('latitude', -28.0016)
-                self.ownship_data['longitude'] = self.location_data.get('longitude', 153.4291)
-                self.ownship_data['altitude_geo'] = self.location_data.get('altitude_geo', 5)
-                self.ownship_data['altitude_press'] = self.location_data.get('altitude_press', 5)
-                self.ownship_data['speed'] = self.location_data.get('speed', 0)
-                self.ownship_data['track'] = self.location_data.get('track', 0)
-                self.ownship_data['vert_rate'] = self.location_data.get('vert_rate', 0)
-                self.ownship_data['gps_valid'] = self.location_data.get('gps_valid', True)
-            elif spoof_gps_enabled:
-                # Use default hardcoded values if no location file provided
-                self.ownship_data['latitude'] = -27.4698 # Brisbane Lat
-                self.ownship_data['longitude'] = 153.0251 # Brisbane Lon
-                self.ownship_data['altitude_geo'] = 1500 # Spoofed Geo Alt (feet)
-                self.ownship_data['speed'] = 120 # Spoofed Speed (knots)
-                self.ownship_data['track'] = 90 # Spoofed Track (degrees)
-                self.ownship_data['vert_rate'] = 500 # Spoofed Vertical Rate (fpm) - climbing
-                self.ownship_data['gps_valid'] = True
-                self.ownship_data['altitude_press'] = 1000 # Spoof pressure altitude as well
-
             # Send Ownship Report periodically (e.g., every 1 second if data available)
             # Condition now relies on spoofed data or real data including pressure alt
-            if now - last_ownship_report_time >= 1.0 and 'latitude' in self.ownship_data and 'altitude_press' in self.ownship_data:
-                 ownship_report_msg = create_ownship_report(
-                      lat=self.ownship_data.get('latitude'),
-                      lon=self.ownship_data.get('longitude'),
-                      alt_press=self.ownship_data.get('altitude_press'), # Use parsed pressure altitude (NOT spoofed)
+            if now - last_ownship_report_time >= PERIODIC_INTERVAL and 'latitude' in od and 'altitude_press' in od:
+                 default_accuracy = 8 if od.get('gps_valid') else 0 # Use 8 if valid/spoofed, 0 if not
+                 ownship_report_msg = self.cached_frame('ownship', create_ownship_report,
+                      lat=od.get('latitude'),
+                      lon=od.get('longitude'),
+                      alt_press=od.get('altitude_press'), # Use parsed pressure altitude (NOT spoofed)
                       misc=1, # Airborne (TODO: Make this dynamic based on ground speed?)
-                      nic=self.ownship_data.get('nic', 8 if self.ownship_data.get('gps_valid') else 0), # Use 8 if valid/spoofed, 0 if not
-                      nac_p=self.ownship_data.get('nac_p', 8 if self.ownship_data.get('gps_valid') else 0), # Use 8 if valid/spoofed, 0 if not
-                      ground_speed=self.ownship_data.get('speed'), # Use parsed or spoofed speed
-                      track=self.ownship_data.get('track'), # Use parsed or spoofed track
-                      vert_vel=self.ownship_data.get('vert_rate'), # Still missing a source for this
+                      nic=od.get('nic', default_accuracy),
+                      nac_p=od.get('nac_p', default_accuracy),
+                      ground_speed=od.get('speed'), # Use parsed or spoofed speed
+                      track=od.get('track'), # Use parsed or spoofed track
+                      vert_vel=od.get('vert_rate'), # Still missing a source for this
                       emitter_cat=1,  # Default to Light aircraft (1)
                       callsign="OWNSHIP", # Default callsign
                       code=0  # Default priority code
                   )
                  if ownship_report_msg:
-                     self.send_message(ownship_report_msg)
+                     pending.append(ownship_report_msg)
                  last_ownship_report_time = now # Update time
 
             # Send Ownship Geo Altitude periodically if available (e.g., every 1 second)
             # Condition now relies on spoofed data or real data
-            if now - last_ownship_geo_alt_time >= 1.0 and 'altitude_geo' in self.ownship_data:
+            if now - last_ownship_geo_alt_time >= PERIODIC_INTERVAL and 'altitude_geo' in od:
+                geo_alt = od.get('altitude_geo')
                 # Debug the altitude data being sent
                 if spoof_gps_enabled:
-                    logging.debug(f"Sending ownship geo altitude = {self.ownship_data.get('altitude_geo')} feet")
+                    logging.debug(f"Sending ownship geo altitude = {geo_alt} feet")
                 
                 # Ensure altitude_geo is not None by using explicit check
                 # This will ensure we don't send None to the encoder
-                geo_alt = self.ownship_data.get('altitude_geo')
                 if geo_alt is not None:
-                    ownship_geo_msg = create_ownship_geo_altitude(
+                    ownship_geo_msg = self.cached_frame('ownship_geo', create_ownship_geo_altitude,
                         alt_geo=geo_alt, # Use parsed or spoofed geo alt
-                        vpl=self.ownship_data.get('vpl', 0xFFFF) # Vertical Protection Limit (Placeholder)
+                        vpl=od.get('vpl', 0xFFFF) # Vertical Protection Limit (Placeholder)
                     )
                     if ownship_geo_msg:
-                        self.send_message(ownship_geo_msg)
+                        pending.append(ownship_geo_msg)
                 last_ownship_geo_alt_time = now
 
-            # TODO: Implement traffic aging/removal from self.traffic_data
-            # items_to_remove = []
-            # for icao, data in self.traffic_data.items():
-            #     if now - data.get('last_seen', 0) > 60: # Remove if not seen for 60 seconds
-            #         items_to_remove.append(icao)
-            # for icao in items_to_remove:
-            #     del self.traffic_data[icao]
-            #     print(f"Broadcaster: Removed stale traffic {icao}")
+            # Everything produced this loop (heartbeat, traffic, ownship and
+            # geo altitude) goes out together in one batched send
+            flush_pending()
 
+            # Age out traffic that has not been heard from recently
+            if now - last_traffic_expire_time >= PERIODIC_INTERVAL:
+                for icao in traffic_table.expire(TRAFFIC_TIMEOUT, now):
+                    logging.debug(f"Broadcaster: Removed stale traffic {icao}")
+                last_traffic_expire_time = now
 
-            # Small sleep to prevent high CPU usage if queue is empty
-            # Adjust sleep time based on desired responsiveness vs CPU load
-            time.sleep(0.02) # 50Hz loop approx
 
         self.close_socket()
         logging.info("Broadcaster: Run loop finished.")
@@ -423,12 +653,13 @@ if __name__ == '__main__':
         udp_broadcast_ip = '127.0.0.1' # Broadcast to loopback for testing
         udp_port = 4000
 
-    test_queue = queue.Queue()
+    test_queue = RingBuffer()
     test_stop_event = threading.Event()
 
     # Add some dummy data to the queue
     test_queue.put({'source': 'adsb', 'icao': 'AABBCC', 'altitude': 15000, 'latitude': 34.0, 'longitude': -118.0, 'speed': 150, 'heading': 90, 'vert_rate': 500, 'timestamp': datetime.now(timezone.utc)})
-    test_queue.put({'source': 'flarm', 'raw_nmea': '$GPGGA,123519.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47', 'msg_type': 'GPGGA', 'fields': ['123519.00','4807.038','N','01131.000','E','1','08','0.9','545.4','M','46.9','M','',''], 'timestamp': datetime.now(timezone.utc)})
+    gga_fields = ['123519.00','4807.038','N','01131.000','E','1','08','0.9','545.4','M','46.9','M','','']
+    test_queue.put({'source': 'flarm', 'raw_nmea': '$GPGGA,123519.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47', 'msg_type': 'GPGGA', 'fields': gga_fields, 'record': parse_record('GPGGA', gga_fields), 'timestamp': datetime.now(timezone.utc)})
     test_queue.put({'source': 'flarm', 'raw_nmea': '$PFLAA,0,100,200,50,1,FLR12345,90,,100,,3', 'msg_type': 'PFLAA', 'fields': ['0','100','200','50','1','FLR12345','90','','100','','3'], 'timestamp': datetime.now(timezone.utc)})
 
 
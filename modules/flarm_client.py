@@ -4,6 +4,7 @@ import queue
 import threading
 from datetime import datetime, timezone
 import logging
+from .nmea import parse_record
 
 def parse_nmea(sentence):
     """Basic NMEA sentence parsing."""
@@ -38,7 +39,7 @@ def run_client(args, data_queue, stop_event):
     while not stop_event.is_set():
         ser = None
         try:
-            ser = serial.Serial(serial_port, baud_rate, timeout=1) # 1-second timeout
+            ser = serial.Serial(serial_port, baud_rate, timeout=0.5) # Bound any blocking read so stop_event is seen promptly
             logging.info(f"FLARM Client: Successfully connected to {serial_port}")
 
             while not stop_event.is_set():
@@ -53,6 +54,10 @@ def run_client(args, data_queue, stop_event):
 
                         buffer += data_str
 
+                        # Check the log level once per read, so lines are only
+                        # timestamped for the raw log when debugging
+                        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
                         # Process complete lines from the buffer
                         while '\n' in buffer:
                             line, buffer = buffer.split('\n', 1)
@@ -60,24 +65,33 @@ def run_client(args, data_queue, stop_event):
 
                             if line.startswith('$'):
                                 # Log raw NMEA sentence to console
-                                timestamp_str = datetime.now(timezone.utc).strftime("%H:%M:%S.%f")[:-3]
-                                logging.debug(f"FLARM Raw [{timestamp_str}]: {line}")
+                                if debug:
+                                    timestamp_str = datetime.now(timezone.utc).strftime("%H:%M:%S.%f")[:-3]
+                                    logging.debug(f"FLARM Raw [{timestamp_str}]: {line}")
 
                                 # Parse the NMEA sentence
                                 msg_type, fields = parse_nmea(line)
 
                                 if msg_type:
+                                    # Decode GPS sentences here, so the broadcaster
+                                    # thread never parses strings
+                                    try:
+                                        record = parse_record(msg_type, fields)
+                                    except ValueError as e:
+                                        logging.error(f"FLARM Client: Error parsing GPS data ({msg_type}): {e}")
+                                        record = None
                                     flarm_data = {
                                         'source': 'flarm',
                                         'raw_nmea': line,
                                         'msg_type': msg_type,
                                         'fields': fields,
+                                        'record': record,
                                         'timestamp': datetime.now(timezone.utc)
                                     }
                                     try:
-                                        data_queue.put(flarm_data, block=False)
+                                        data_queue.put_nowait(flarm_data)
                                     except queue.Full:
-                                        # logging.warning("FLARM data queue is full. Discarding message.")
+                                        # Dropped and counted by the queue; never block the serial reader
                                         pass
                     else:
                         # No data waiting, sleep briefly to prevent busy-waiting
@@ -108,7 +122,7 @@ def run_client(args, data_queue, stop_event):
         # If we're here due to an error and not stopped, wait before retrying
         if not stop_event.is_set():
             logging.info("FLARM Client: Retrying connection in 10 seconds...")
-            time.sleep(10)
+            stop_event.wait(10) # Returns immediately on shutdown
 
     # Clean up if loop exited because stop_event was set
     if ser and ser.is_open:
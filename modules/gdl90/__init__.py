@@ -8,7 +8,14 @@ for aviation data exchange.
 # Re-export key functions for simpler imports
 from .messages import (
     create_heartbeat_message,
+    create_heartbeat_payload,
+    create_heartbeat_frame_template,
+    frame_heartbeat,
+    set_heartbeat_timestamp,
+    heartbeat_timestamp,
     create_ownship_report,
     create_ownship_geo_altitude,
-    create_traffic_report
-)
\ No newline at end of file
+    create_traffic_report,
+    create_traffic_payload
+)
+from .framing import frame_message, frame_message_into
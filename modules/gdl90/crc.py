@@ -3,7 +3,23 @@ CRC calculation for GDL90 protocol messages.
 
 This module implements the CRC-16-CCITT algorithm required by the GDL90 protocol
 for message verification.
+
+calculate_crc() runs in C via ``binascii.crc_hqx``, which implements the same
+CRC-16-CCITT polynomial. The GDL90 ICD's table algorithm folds each input
+byte in *after* the table lookup (the CRC of M, rather than of M * x^16), so
+its result equals crc_hqx over all but the last two bytes, XORed with those
+two bytes. calculate_crc_py() keeps the reference table implementation.
+
+crc16() returns the same value as an int, without building a bytes object.
+It accepts any bytes-like object; a memoryview into a larger buffer is
+sliced without copying.
+
+There is deliberately no SIMD (carry-less multiply) variant: every GDL90
+message carries its own CRC, and the largest one sent here (a 28-byte
+traffic report) is below the 64-byte minimum where CRC folding pays off, so
+per-call overhead dominates and crc_hqx is already a single C call.
 """
+import binascii
 
 # CRC-16-CCITT lookup table for faster computation
 CRC16Table = (
@@ -42,9 +58,59 @@ CRC16Table = (
 )
 
 
+def crc16_state(data, state=0) -> int:
+    """
+    Runs the CRC over the leading part of a message, so that the CRC of
+    messages sharing that prefix can be finished with crc16(rest, state).
+
+    Args:
+        data: Bytes-like prefix of the message
+        state: State returned for the part of the message before ``data``
+
+    Returns:
+        The intermediate 16-bit CRC state
+    """
+    return binascii.crc_hqx(data, state)
+
+
+def crc16(data, state=0) -> int:
+    """
+    Calculates the GDL90 CRC-16-CCITT checksum as an integer.
+
+    Args:
+        data: Bytes-like object to calculate CRC for
+        state: crc16_state() of the part of the message before ``data``; when
+               given, ``data`` must be at least the last two message bytes
+
+    Returns:
+        The 16-bit CRC value
+    """
+    n = len(data)
+    if n >= 2:
+        return binascii.crc_hqx(data[:n - 2], state) ^ ((data[n - 2] << 8) | data[n - 1])
+    if n == 1:
+        return data[0]
+    return 0
+
+
 def calculate_crc(data: bytes) -> bytes:
     """
     Calculates the GDL90 CRC-16-CCITT checksum.
+
+    Args:
+        data: The bytes to calculate CRC for
+
+    Returns:
+        The 2-byte CRC value in LSB, MSB order
+    """
+    crc = crc16(data)
+    return bytes((crc & 0x00ff, crc >> 8))
+
+
+def calculate_crc_py(data: bytes) -> bytes:
+    """
+    Calculates the GDL90 CRC-16-CCITT checksum with the ICD's table algorithm.
+    Reference implementation for calculate_crc().
     
     Args:
         data: The bytes to calculate CRC for
@@ -7,6 +7,11 @@ according to the protocol specification.
 from .constants import FLAG_BYTE, CONTROL_ESCAPE, ESCAPE_XOR
 from .crc import calculate_crc
 
+_FLAG = bytes([FLAG_BYTE])
+_ESCAPE = bytes([CONTROL_ESCAPE])
+_ESCAPED_FLAG = bytes([CONTROL_ESCAPE, FLAG_BYTE ^ ESCAPE_XOR])  # 0x7D 0x5E
+_ESCAPED_ESCAPE = bytes([CONTROL_ESCAPE, CONTROL_ESCAPE ^ ESCAPE_XOR])  # 0x7D 0x5D
+
 
 def byte_stuff(raw_payload_with_crc):
     """
@@ -18,17 +23,11 @@ def byte_stuff(raw_payload_with_crc):
     Returns:
         The byte-stuffed payload ready for framing
     """
-    stuffed = bytearray()
-    for byte in raw_payload_with_crc:
-        if byte == FLAG_BYTE:
-            stuffed.append(CONTROL_ESCAPE)
-            stuffed.append(FLAG_BYTE ^ ESCAPE_XOR)  # 0x5E
-        elif byte == CONTROL_ESCAPE:
-            stuffed.append(CONTROL_ESCAPE)
-            stuffed.append(CONTROL_ESCAPE ^ ESCAPE_XOR)  # 0x5D
-        else:
-            stuffed.append(byte)
-    return bytes(stuffed)
+    # Two C-level replaces instead of a per-byte Python loop. Escapes go
+    # first, so the escapes inserted for flag bytes are not escaped again.
+    return (bytes(raw_payload_with_crc)
+            .replace(_ESCAPE, _ESCAPED_ESCAPE)
+            .replace(_FLAG, _ESCAPED_FLAG))
 
 
 def frame_message(message_payload):
@@ -47,4 +46,30 @@ def frame_message(message_payload):
     crc_bytes = calculate_crc(message_payload)  # Returns LSB, MSB
     payload_with_crc = message_payload + crc_bytes
     stuffed_payload = byte_stuff(payload_with_crc)
-    return bytes([FLAG_BYTE]) + stuffed_payload + bytes([FLAG_BYTE])
\ No newline at end of file
+    return _FLAG + stuffed_payload + _FLAG
+
+
+def frame_message_into(dst, offset, message_payload):
+    """
+    Like frame_message(), but writes the frame into a preallocated buffer
+    instead of returning a new bytes object.
+
+    Args:
+        dst: Writable buffer (e.g. a bytearray) to write the frame into
+        offset: Position in ``dst`` to start writing at
+        message_payload: The raw message bytes (message ID + message data)
+
+    Returns:
+        The number of bytes written
+
+    Raises:
+        ValueError: If the frame does not fit in ``dst``
+    """
+    stuffed_payload = byte_stuff(message_payload + calculate_crc(message_payload))
+    end = offset + len(stuffed_payload) + 2
+    if end > len(dst):
+        raise ValueError(f"GDL90 frame of {end - offset} bytes does not fit at offset {offset}")
+    dst[offset] = FLAG_BYTE
+    dst[offset + 1:end - 1] = stuffed_payload
+    dst[end - 1] = FLAG_BYTE
+    return end - offset
\ No newline at end of file
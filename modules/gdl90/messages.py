@@ -23,23 +23,58 @@ from .encoders import (
     encode_vertical_velocity,
     encode_track_heading,
     encode_icao_address,
-    encode_callsign
+    encode_callsign,
+    _makeLatitude,
+    _makeLongitude
 )
-from .framing import frame_message
+from .constants import FLAG_BYTE
+from .crc import crc16, crc16_state
+from .framing import byte_stuff, frame_message
 
 
-def create_heartbeat_message(gps_valid=False, maintenance_required=False, ident_active=False, utc_timing=True):
+# Heartbeat byte offsets patched by set_heartbeat_timestamp()
+HEARTBEAT_STATUS2_OFFSET = 2
+HEARTBEAT_TIMESTAMP_OFFSET = 3
+
+# Traffic Report payload, packed in one call. ICAO, latitude and longitude
+# are 24-bit fields, so they are packed as 32 + 32 + 16 bits:
+#   ID | Status + ICAO | Lat + Lon bits 23-16 | Lon bits 15-0 |
+#   Alt/Misc (2) | NIC/NACp | HVel/VV sign (2) | VV | Track | Emitter |
+#   Callsign (8) | Code
+_TRAFFIC_PAYLOAD = struct.Struct('>BIIH8B8sB')
+
+
+def heartbeat_timestamp(now_utc=None):
     """
-    Creates a GDL90 Heartbeat message (ID 0x00). Version 1 GDL90.
-    
+    Returns the Heartbeat timestamp field for the given (or current) time.
+
+    Args:
+        now_utc: Timezone-aware UTC datetime (defaults to now)
+
+    Returns:
+        UTC seconds since midnight * 10, max 863999 (0xD2F1F), 21 bits
+    """
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    seconds_since_midnight = (now_utc - now_utc.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+    return min(int(seconds_since_midnight * 10), 863999)
+
+
+def create_heartbeat_payload(gps_valid=False, maintenance_required=False, ident_active=False):
+    """
+    Creates an unframed GDL90 Heartbeat payload with a zero timestamp.
+
+    Only the timestamp changes between heartbeats with the same flags, so the
+    payload can be kept as a template, updated with set_heartbeat_timestamp()
+    and framed with frame_message().
+
     Args:
         gps_valid: Whether the GPS position is valid
         maintenance_required: Whether maintenance is required
         ident_active: Whether the IDENT state is active
-        utc_timing: Whether UTC timing is used
-        
+
     Returns:
-        Complete framed GDL90 Heartbeat message
+        7-byte bytearray: ID, Status1, Status2, TS1(LSB), TS2(MSB), UplinkCount, BasicLongCount
     """
     message_id = MSG_ID_HEARTBEAT
 
@@ -53,7 +88,7 @@ def create_heartbeat_message(gps_valid=False, maintenance_required=False, ident_
     status_byte1 = 0b00100000  # Assume CDTI available
 
     # Status byte 2: GPS status
-    # Bit 7: Reserved (0) - Will be set to bit 16 of timestamp below
+    # Bit 7: Reserved (0) - Will be set to bit 16 of timestamp
     # Bit 6: GPS Position Valid (1=Valid, 0=Invalid)
     # Bit 5: Maintenance Required (1=Yes, 0=No)
     # Bit 4: IDENT state active (1=Yes, 0=No)
@@ -62,40 +97,93 @@ def create_heartbeat_message(gps_valid=False, maintenance_required=False, ident_
     if gps_valid:      status_byte2 |= 0b01000000
     if maintenance_required: status_byte2 |= 0b00100000
     if ident_active:   status_byte2 |= 0b00010000
-    
+
     # Set reserved bits to match reference implementation
     status_byte2 |= 0b00000000  # All reserved bits set to 0
 
-    # Timestamp: UTC seconds since midnight * 10, max 863999 (0xD2F1F), 21 bits
-    now_utc = datetime.now(timezone.utc)
-    seconds_since_midnight = (now_utc - now_utc.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
-    utc_timestamp_field = min(int(seconds_since_midnight * 10), 863999)
-    
+    # Timestamp bytes are left at zero and message count fields
+    # (UplinkCount, Basic/LongCount) are set to zero for now
+    return bytearray([message_id, status_byte1, status_byte2, 0, 0, 0, 0])
+
+
+def set_heartbeat_timestamp(payload, utc_timestamp_field):
+    """
+    Writes a timestamp into a Heartbeat payload in place.
+
+    Args:
+        payload: bytearray from create_heartbeat_payload()
+        utc_timestamp_field: Value from heartbeat_timestamp()
+    """
     # Move bit 16 of the timestamp into the MSB of status byte 2
     ts_bit16 = (utc_timestamp_field & 0x10000) >> 16
-    status_byte2 = (status_byte2 & 0b01111111) | (ts_bit16 << 7)
-    
-    # Pack timestamp as little-endian for the lower 16 bits (GDL90 specification)
-    ts_lower_16bits = utc_timestamp_field & 0xFFFF
-    ts_byte1 = ts_lower_16bits & 0xFF           # LSB
-    ts_byte2 = (ts_lower_16bits >> 8) & 0xFF    # MSB
-
-    # Format message with 7 bytes: ID, Status1, Status2, TS1(LSB), TS2(MSB), UplinkCount, BasicLongCount
-    # Note that we're packing the timestamp in little-endian format
-    payload = struct.pack('>BBB',  # The message ID and status bytes are big-endian
-                        message_id,
-                        status_byte1,
-                        status_byte2)
-    
-    payload += struct.pack('<BB',  # The timestamp is little-endian
-                        ts_byte1,
-                        ts_byte2)
+    payload[HEARTBEAT_STATUS2_OFFSET] = (payload[HEARTBEAT_STATUS2_OFFSET] & 0b01111111) | (ts_bit16 << 7)
+
+    # The lower 16 bits are little-endian (GDL90 specification)
+    payload[HEARTBEAT_TIMESTAMP_OFFSET] = utc_timestamp_field & 0xFF             # LSB
+    payload[HEARTBEAT_TIMESTAMP_OFFSET + 1] = (utc_timestamp_field >> 8) & 0xFF  # MSB
 
-    # Add message count fields (UplinkCount, Basic/LongCount) as required by GDL90 spec
-    # Set both to zero for now
-    payload += struct.pack('BB', 0, 0)
 
-    return frame_message(payload)
+def create_heartbeat_frame_template(gps_valid=False, maintenance_required=False, ident_active=False):
+    """
+    Pre-encodes the parts of a framed Heartbeat that do not depend on the time.
+
+    The message ID and status bytes ahead of the timestamp are stuffed and run
+    through the CRC once here, so frame_heartbeat() only has to fold in the
+    two timestamp bytes and stuff the bytes after them.
+
+    Args:
+        gps_valid: Whether the GPS position is valid
+        maintenance_required: Whether maintenance is required
+        ident_active: Whether the IDENT state is active
+
+    Returns:
+        Template for frame_heartbeat()
+    """
+    payload = create_heartbeat_payload(gps_valid, maintenance_required, ident_active)
+    template = []
+    # Bit 16 of the timestamp is carried in status byte 2, so the head differs
+    for ts_bit16 in (0, 1):
+        set_heartbeat_timestamp(payload, ts_bit16 << 16)
+        head = bytes(payload[:HEARTBEAT_TIMESTAMP_OFFSET])
+        tail = bytes(payload[HEARTBEAT_TIMESTAMP_OFFSET + 2:])
+        template.append((bytes([FLAG_BYTE]) + byte_stuff(head), crc16_state(head), tail))
+    return tuple(template)
+
+
+def frame_heartbeat(template, utc_timestamp_field):
+    """
+    Builds a framed Heartbeat from a template, stamped with the given time.
+
+    Args:
+        template: Value from create_heartbeat_frame_template()
+        utc_timestamp_field: Value from heartbeat_timestamp()
+
+    Returns:
+        Complete framed GDL90 Heartbeat message, identical to framing the
+        equivalent create_heartbeat_payload()
+    """
+    head, state, tail = template[(utc_timestamp_field >> 16) & 1]
+    rest = bytes((utc_timestamp_field & 0xFF, (utc_timestamp_field >> 8) & 0xFF)) + tail
+    crc = crc16(rest, state)
+    return head + byte_stuff(rest + bytes((crc & 0xFF, crc >> 8))) + bytes([FLAG_BYTE])
+
+
+def create_heartbeat_message(gps_valid=False, maintenance_required=False, ident_active=False, utc_timing=True):
+    """
+    Creates a GDL90 Heartbeat message (ID 0x00). Version 1 GDL90.
+    
+    Args:
+        gps_valid: Whether the GPS position is valid
+        maintenance_required: Whether maintenance is required
+        ident_active: Whether the IDENT state is active
+        utc_timing: Whether UTC timing is used
+        
+    Returns:
+        Complete framed GDL90 Heartbeat message
+    """
+    payload = create_heartbeat_payload(gps_valid, maintenance_required, ident_active)
+    set_heartbeat_timestamp(payload, heartbeat_timestamp())
+    return frame_message(bytes(payload))
 
 
 def create_ownship_report(lat, lon, alt_press, misc, nic, nac_p, ground_speed, track, vert_vel, emitter_cat=1, callsign="", code=0):
@@ -252,26 +340,21 @@ def create_traffic_report(icao, lat, lon, alt_press, misc_flags, nic, nac_p, hor
     Returns:
         Complete framed GDL90 Traffic Report message
     """
+    return frame_message(bytes(create_traffic_payload(
+        icao, lat, lon, alt_press, misc_flags, nic, nac_p, horiz_vel, vert_vel, track,
+        emitter_cat, callsign, address_type, alert_status, code)))
+
+
+def create_traffic_payload(icao, lat, lon, alt_press, misc_flags, nic, nac_p, horiz_vel, vert_vel, track, emitter_cat, callsign, address_type=0, alert_status=0, code=0):
     """
-    Creates a GDL90 Traffic Report message (ID 0x14).
+    Creates an unframed GDL90 Traffic Report payload (ID 0x14), ready for
+    frame_message() or frame_message_into().
 
     Args:
-        icao (str): 24-bit ICAO address (hex string, e.g., "AABBCC").
-        lat (float): Latitude in degrees.
-        lon (float): Longitude in degrees.
-        alt_press (int): Pressure altitude in feet MSL.
-        misc_flags (int): Miscellaneous indicators (Airborne status bit 3, Track Type bits 1-0 - see GDL90 spec Table 9).
-        nic (int): Navigation Integrity Category (0-11).
-        nac_p (int): Navigation Accuracy Category for Position (0-11).
-        horiz_vel (int): Horizontal velocity (ground speed) in knots.
-        vert_vel (int): Vertical velocity in feet/minute.
-        track (int): True track/heading in degrees.
-        emitter_cat (int): Emitter category (see GDL90 spec, e.g., 1=Light).
-        callsign (str): Callsign (up to 8 chars).
-        code (int): Reserved field (0-15), typically 0.
-        
+        Same as create_traffic_report().
+
     Returns:
-        Complete framed GDL90 Traffic Report message
+        28-byte payload (without CRC or framing)
     """
     message_id = MSG_ID_TRAFFIC_REPORT
 
@@ -290,117 +373,73 @@ def create_traffic_report(icao, lat, lon, alt_press, misc_flags, nic, nac_p, hor
     else:
         icao_int = icao if isinstance(icao, int) and 0 <= icao <= 0xFFFFFF else 0
     
-    # Use shared encoder functions for lat/lon
-    lat_bytes = encode_lat_lon(lat, is_latitude=True)
-    lon_bytes = encode_lat_lon(lon, is_latitude=False)
-    
-    # Handle invalid position according to spec
-    if lat_bytes is None or lon_bytes is None:
-        lat_bytes = b'\x00\x00\x00'
-        lon_bytes = b'\x00\x00\x00'
+    # Position as 24-bit two's complement semicircles, as encode_lat_lon() does
+    if lat is None or lon is None:
+        # Handle invalid position according to spec
+        lat_24 = lon_24 = 0
         nic = 0  # NIC=0 indicates invalid position
         nac_p = 0  # NACp should also be 0 if NIC is 0
-    
+    else:
+        lat_24 = _makeLatitude(lat)
+        lon_24 = _makeLongitude(lon)
+
     # Navigation integrity and accuracy
     nic_val = nic if nic is not None else 0
     nac_p_val = nac_p if nac_p is not None else 0
     nav_integrity_byte = ((nic_val & 0x0F) << 4) | (nac_p_val & 0x0F)
-    
-    # We'll use the shared encoder functions for these values
-    # The actual encoding will happen when we build the payload
-    
+
     # Use shared encoder functions for emitter category and callsign
     callsign_bytes = encode_callsign(callsign)
-    
-    # --- Debug: Print input values ---
-    logging.debug(
-        "create_traffic_report input: "
-        "icao=%s, lat=%.4f, lon=%.4f, alt_press=%s, misc_flags=%s, nic=%s, nac_p=%s, "
-        "horiz_vel=%s, vert_vel=%s, track=%s, emitter_cat=%s, callsign=%s",
-        icao, lat, lon, alt_press, misc_flags, nic, nac_p,
-        horiz_vel, vert_vel, track, emitter_cat, callsign
-    )
+
+    # --- Debug: Print input values (the call is skipped unless debugging) ---
+    if logging.root.isEnabledFor(logging.DEBUG):
+        logging.debug(
+            "create_traffic_report input: "
+            "icao=%s, lat=%.4f, lon=%.4f, alt_press=%s, misc_flags=%s, nic=%s, nac_p=%s, "
+            "horiz_vel=%s, vert_vel=%s, track=%s, emitter_cat=%s, callsign=%s",
+            icao, lat, lon, alt_press, misc_flags, nic, nac_p,
+            horiz_vel, vert_vel, track, emitter_cat, callsign
+        )
     # --- End Debug ---
 
-    # Build the message payload
-    payload = bytearray([message_id])
+    # Bytes 12-13: Altitude (12 bits) + Misc (4 bits). The encoder returns
+    # Alt bits 11-4 in its first byte and bits 3-0 in the upper nibble of its
+    # second; the misc field (Airborne, Track Type) fills the lower nibble
+    alt_hi, alt_lo = encode_altitude_pressure(alt_press)
+    byte13 = (alt_lo & 0xF0) | (misc_flags & 0x0F)
 
-    # Status byte (alert status in upper 4 bits, address type in lower 4 bits)
-    payload.append(status_byte & 0xFF)
-    
-    # ICAO address (3 bytes)
-    payload.append((icao_int >> 16) & 0xFF)
-    payload.append((icao_int >> 8) & 0xFF)
-    payload.append(icao_int & 0xFF)
-    
-    # Add latitude and longitude bytes
-    payload.extend(lat_bytes)
-    payload.extend(lon_bytes)
-    
-    # --- Assemble Bytes 12-19 according to GDL90 Figure 2 ---
-
-    # Bytes 12-13: Altitude (12 bits) + Misc (4 bits)
-    # Get the pre-encoded 2 bytes for altitude
-    alt_encoded_bytes = encode_altitude_pressure(alt_press)
-    # Byte 12 is the first byte from the encoder (Alt bits 11-4)
-    payload.append(alt_encoded_bytes[0])
-    # Byte 13 combines the lower nibble of the second altitude byte (Alt bits 3-0)
-    # with the misc field (lower 4 bits)
-    # Byte 13: Altitude bits 3-0 (upper nibble), Misc flags (lower nibble)
-    # Ensure only relevant misc_flags (Airborne, Track Type) are used here.
-    byte13 = (alt_encoded_bytes[1] & 0xF0) | (misc_flags & 0x0F)
-    payload.append(byte13)
-
-    # Byte 14: Navigation integrity/accuracy
-    payload.append(nav_integrity_byte)
-
-    # Bytes 15-16: Horizontal Velocity (12 bits) + VV Sign (1 bit)
-    # Get the pre-encoded 2 bytes for horizontal velocity
-    hv_encoded_bytes = encode_velocity(horiz_vel)
+    # Bytes 15-16: Horizontal Velocity (12 bits) + VV Sign (1 bit, bit 3)
+    hv_hi, hv_lo = encode_velocity(horiz_vel)
     vv_sign_bit = 1 if (vert_vel is not None and vert_vel < 0) else 0
-    # Byte 15 is the first byte from the encoder (HV bits 11-4)
-    payload.append(hv_encoded_bytes[0])
-    # Byte 16 combines the lower nibble of the second HV byte (HV bits 3-0)
-    # with the VV sign bit (shifted into bit 3)
-    byte16 = (hv_encoded_bytes[1] & 0xF0) | (vv_sign_bit << 3) # Reserved bits 2-0 are 0
-    payload.append(byte16)
-
-    # Bytes 17-18: Vertical Velocity (11 bits magnitude) + Track Type (1 bit) + Track/Heading
-    # Calculate the 11-bit magnitude for VV
+    byte16 = (hv_lo & 0xF0) | (vv_sign_bit << 3) # Reserved bits 2-0 are 0
+
+    # Byte 17: Vertical Velocity magnitude bits 10-3
     encoded_vv_11bit_mag = 0x7FF # Default invalid
     if vert_vel is not None:
         # Value = abs(VV_fpm / 64), max 2047 (0x7FF)
         encoded_vv_11bit_mag = round(abs(vert_vel) / 64.0)
         if encoded_vv_11bit_mag > 2047: encoded_vv_11bit_mag = 2047
-    
-    # Track type bit in byte 17
-    # 0 = True track angle (to match misc_flags=0x01)
-    # 1 = Magnetic heading
-    track_type_bit = 0 # Explicitly use 0 for True Track Angle
-    
-    # Encode track/heading
+
+    # Byte 18: True track angle (track type 0, to match misc_flags=0x01)
     track_value = 0
     if track is not None:
         track_value = int(track * (256.0 / 360.0)) & 0xFF
-    
-    # Byte 17 contains VV magnitude bits 10-3
-    byte17 = (encoded_vv_11bit_mag >> 3) & 0xFF
-    payload.append(byte17)
-    
-    # Byte 18 combines track/heading value
-    payload.append(track_value)
 
-    # Emitter category (8 bits)
-    payload.append(emitter_cat & 0xFF)  # Byte 19
-    
-    # Callsign (8 bytes)
-    payload.extend(callsign_bytes)
-    
-    # Code (4 bits) + Emergency/Priority Code (4 bits)
-    # For now, set both to 0
-    payload.append(((code & 0x0F) << 4) | 0x00)
-    
     # Payload length = 1(ID) + 1(Status) + 3(ICAO) + 3(lat) + 3(lon) + 2(alt) + 1(NIC/NAC)
     #                  + 2(Horiz) + 2(Vert/Track) + 1(Emit) + 8(Callsign) + 1(Codes) = 28 bytes
-    
-    return frame_message(bytes(payload))
\ No newline at end of file
+    return _TRAFFIC_PAYLOAD.pack(
+        message_id,
+        (status_byte << 24) | icao_int,
+        (lat_24 << 8) | (lon_24 >> 16),
+        lon_24 & 0xFFFF,
+        alt_hi,
+        byte13,
+        nav_integrity_byte,
+        hv_hi,
+        byte16,
+        (encoded_vv_11bit_mag >> 3) & 0xFF,
+        track_value,
+        emitter_cat & 0xFF,
+        callsign_bytes,
+        (code & 0x0F) << 4 # Code (4 bits) + Emergency/Priority Code (4 bits, 0)
+    )
@@ -0,0 +1,182 @@
+"""
+Mode-S message helpers used by the ADS-B client.
+
+pyModeS implements the Mode-S CRC as a bit-at-a-time loop over the message,
+which dominates per-message decode time on a Pi-class CPU. This module
+provides a byte-at-a-time, table-driven CRC-24 instead: one table lookup and
+two shifts per byte, so a 112-bit DF17 message costs 11 iterations.
+
+It also provides the global airborne CPR position decode, working on the
+message bytes, with the latitude zone count NL looked up in a precomputed
+table of zone boundaries rather than recomputed with trigonometry.
+"""
+import math
+import struct
+from bisect import bisect_right
+
+# Mode-S CRC-24 generator polynomial (x^24 term implied)
+CRC24_POLY = 0xFFF409
+
+
+def _build_crc24_table():
+    """Returns the 256-entry CRC-24 lookup table, one entry per leading byte."""
+    table = []
+    for i in range(256):
+        crc = i << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= CRC24_POLY
+        table.append(crc & 0xFFFFFF)
+    return tuple(table)
+
+
+_CRC24_TABLE = _build_crc24_table()
+
+
+def crc24(data):
+    """
+    Computes the Mode-S CRC-24 remainder of a complete message.
+
+    The last three bytes of the message are its parity field, so for an
+    uncorrupted DF17/18 message the remainder is 0. This is the same value
+    ``pyModeS.crc`` returns for the hex form of the message.
+
+    Args:
+        data: Message bytes (bytes, bytearray or memoryview), parity included
+
+    Returns:
+        The 24-bit remainder as an int
+    """
+    table = _CRC24_TABLE
+    crc = 0
+    for byte in data[:-3]:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ byte]
+    return crc ^ int.from_bytes(data[-3:], 'big')
+
+
+def _build_nl_transitions():
+    """
+    Returns the latitudes at which the CPR longitude zone count NL drops
+    from 59 to 58, 58 to 57, ... 3 to 2, in ascending order.
+    """
+    nz = 15
+    a = 1 - math.cos(math.pi / (2 * nz))
+    return tuple(
+        math.degrees(math.acos(math.sqrt(a / (1 - math.cos(2 * math.pi / nl)))))
+        for nl in range(59, 2, -1)
+    )
+
+
+_NL_TRANSITIONS = _build_nl_transitions()
+_NL_POLE_TOLERANCE = 1e-08 + 1e-05 * 87
+
+# Message bytes 6-10: the CPR word's top 2 bits end byte 6, the low 32 follow
+_CPR_FIELDS = struct.Struct('>BI')
+
+
+def cpr_nl(lat):
+    """
+    Returns the number of CPR longitude zones at a latitude.
+
+    Looks the latitude up in the precomputed zone boundaries instead of
+    evaluating the cos/acos formula on every call.
+
+    Args:
+        lat: Latitude in degrees
+
+    Returns:
+        NL(lat), from 1 to 59
+    """
+    lat = abs(lat)
+    if lat >= 86.999:
+        # pyModeS treats anything within float tolerance of 87 as the boundary
+        if abs(lat - 87) <= _NL_POLE_TOLERANCE:
+            return 2
+        if lat > 87:
+            return 1
+    return 59 - bisect_right(_NL_TRANSITIONS, lat)
+
+
+def cpr_word(msg):
+    """
+    Extracts the CPR-encoded position from an airborne position message.
+
+    Args:
+        msg: DF17 airborne position message bytes (TC 9-18)
+
+    Returns:
+        34-bit int holding the 17-bit CPR latitude above the 17-bit longitude
+    """
+    top, low = _CPR_FIELDS.unpack_from(msg, 6)
+    return ((top & 0x03) << 32) | low
+
+
+def global_position(cpr_even, cpr_odd, t_even, t_odd):
+    """
+    Decodes a globally unambiguous airborne position from the CPR words of
+    an even/odd pair of airborne position messages.
+
+    Args:
+        cpr_even: ``cpr_word`` of the even-format message (CPR flag 0)
+        cpr_odd: ``cpr_word`` of the odd-format message (CPR flag 1)
+        t_even: Receive time of the even message
+        t_odd: Receive time of the odd message
+
+    Returns:
+        (latitude, longitude) tuple in degrees, or None if the two frames
+        straddle a latitude zone boundary
+    """
+    lat_even_cpr = (cpr_even >> 17) / 131072
+    lon_even_cpr = (cpr_even & 0x1FFFF) / 131072
+    lat_odd_cpr = (cpr_odd >> 17) / 131072
+    lon_odd_cpr = (cpr_odd & 0x1FFFF) / 131072
+
+    # Latitude index
+    j = math.floor(59 * lat_even_cpr - 60 * lat_odd_cpr + 0.5)
+    lat_even = 6.0 * (j % 60 + lat_even_cpr)  # 360 / 60
+    lat_odd = (360 / 59) * (j % 59 + lat_odd_cpr)
+    if lat_even >= 270:
+        lat_even -= 360
+    if lat_odd >= 270:
+        lat_odd -= 360
+
+    nl = cpr_nl(lat_even)
+    if nl != cpr_nl(lat_odd):
+        return None
+
+    # Use the most recent frame for the longitude
+    if t_even > t_odd:
+        lat = lat_even
+        ni = max(nl, 1)
+        lon_cpr = lon_even_cpr
+    else:
+        lat = lat_odd
+        ni = max(nl - 1, 1)
+        lon_cpr = lon_odd_cpr
+    m = math.floor(lon_even_cpr * (nl - 1) - lon_odd_cpr * nl + 0.5)
+    lon = (360 / ni) * (m % ni + lon_cpr)
+    if lon > 180:
+        lon -= 360
+    return lat, lon
+
+
+def airborne_position(even, odd, t_even, t_odd):
+    """
+    Decodes a globally unambiguous airborne position from an even/odd pair
+    of DF17 airborne position messages (TC 9-18).
+
+    Same result as ``pyModeS.adsb.position`` for the hex form of the
+    messages, computed straight from the message bytes.
+
+    Args:
+        even: Even-format message bytes (CPR flag 0)
+        odd: Odd-format message bytes (CPR flag 1)
+        t_even: Receive time of the even message
+        t_odd: Receive time of the odd message
+
+    Returns:
+        (latitude, longitude) tuple in degrees, or None if the two frames
+        straddle a latitude zone boundary
+    """
+    return global_position(cpr_word(even), cpr_word(odd), t_even, t_odd)
@@ -0,0 +1,124 @@
+"""
+NMEA helpers shared by the FLARM client and the broadcaster.
+
+The FLARM client decodes the GPS sentences the broadcaster uses into small
+records with the numbers already converted, so the broadcaster thread does
+no string parsing. Fields missing from a sentence are None.
+"""
+from collections import namedtuple
+
+METERS_TO_FEET = 3.28084
+
+# GGA fix: position in decimal degrees, MSL altitude in feet
+GgaRecord = namedtuple('GgaRecord', 'latitude longitude altitude_geo gps_valid')
+# RMC with an active fix: ground speed in knots, true track in degrees
+RmcRecord = namedtuple('RmcRecord', 'speed track')
+# Garmin PGRMZ: pressure altitude in feet
+PgrmzRecord = namedtuple('PgrmzRecord', 'altitude_press')
+
+# GGA sentence with no usable position (missing lat/lon/fix quality)
+GGA_NO_FIX = GgaRecord(None, None, None, False)
+
+
+def nmea_to_decimal(nmea, is_negative=False):
+    """
+    Converts an NMEA (D)DDMM.MMMM coordinate to decimal degrees.
+
+    Args:
+        nmea: Coordinate as a float, degrees * 100 + minutes
+        is_negative: True for the southern/western hemisphere ('S' or 'W')
+
+    Returns:
+        The coordinate in decimal degrees
+    """
+    degrees, minutes = divmod(nmea, 100.0)
+    value = degrees + minutes / 60.0
+    return -value if is_negative else value
+
+
+def parse_gga(fields):
+    """
+    Decodes the fields of a GGA sentence (GPGGA, GNGGA, ...).
+
+    Returns:
+        GgaRecord (GGA_NO_FIX if the position fields are empty), or None if
+        the sentence is too short
+    """
+    if len(fields) < 10:
+        return None
+    # fields[0] is the UTC time
+    lat_nmea_str = fields[1]
+    lon_nmea_str = fields[3]
+    fix_quality_str = fields[5]
+    alt_geo_str = fields[8] # Altitude MSL, in meters (unit in fields[9])
+    if not (lat_nmea_str and lon_nmea_str and fix_quality_str):
+        return GGA_NO_FIX
+    return GgaRecord(
+        latitude=nmea_to_decimal(float(lat_nmea_str), fields[2] == 'S'),
+        longitude=nmea_to_decimal(float(lon_nmea_str), fields[4] == 'W'),
+        altitude_geo=float(alt_geo_str) * METERS_TO_FEET if alt_geo_str else None, # Altitude can be empty
+        gps_valid=int(fix_quality_str) > 0
+    )
+
+
+def parse_rmc(fields):
+    """
+    Decodes the fields of an RMC sentence (GPRMC, GNRMC, ...).
+
+    Returns:
+        RmcRecord, or None if the sentence is too short or void ('V')
+    """
+    if len(fields) < 8 or fields[1] != 'A': # 'A' = Active/Valid, 'V' = Void
+        return None
+    speed_knots_str = fields[6]
+    track_deg_str = fields[7]
+    return RmcRecord(
+        speed=float(speed_knots_str) if speed_knots_str else None,
+        track=float(track_deg_str) if track_deg_str else None
+    )
+
+
+def parse_pgrmz(fields):
+    """
+    Decodes the fields of a PGRMZ (pressure altitude) sentence.
+
+    Returns:
+        PgrmzRecord, or None if the sentence is too short, empty or in an
+        unknown unit
+    """
+    if len(fields) < 2 or not fields[0]:
+        return None
+    unit = fields[1].upper()
+    if unit == 'F':
+        return PgrmzRecord(int(fields[0]))
+    if unit == 'M':
+        return PgrmzRecord(int(float(fields[0]) * METERS_TO_FEET))
+    return None
+
+
+_PARSERS = {
+    'GPGGA': parse_gga,
+    'GNGGA': parse_gga,
+    'GPRMC': parse_rmc,
+    'GNRMC': parse_rmc,
+    'PGRMZ': parse_pgrmz,
+}
+
+
+def parse_record(msg_type, fields):
+    """
+    Decodes the GPS sentences the broadcaster uses into a record.
+
+    Args:
+        msg_type: Sentence type without the '$', e.g. 'GPGGA'
+        fields: Comma-separated fields after the type, checksum removed
+
+    Returns:
+        GgaRecord, RmcRecord or PgrmzRecord, or None if the sentence carries
+        nothing the broadcaster uses
+
+    Raises:
+        ValueError: If a numeric field is malformed
+    """
+    parser = _PARSERS.get(msg_type)
+    return parser(fields) if parser else None
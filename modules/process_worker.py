@@ -0,0 +1,127 @@
+"""
+Runs a producer worker in a child process.
+
+Worker threads share one GIL, so the pure-Python Mode-S decode in the ADS-B
+client competes with every other thread for the interpreter. Running it in
+its own process gives it its own interpreter and core, while the rest of the
+program keeps using the in-process RingBuffer unchanged:
+
+    child process:  run_client(args, QueueWriter, child_stop_event)
+                         |  one pickled list of records per push_many()
+                    multiprocessing.Queue
+                         |
+    parent thread:  forwarder -> data_queue.push_many(batch)
+
+Only producers that talk to the data queue through ``push_many`` /
+``put_nowait`` and to the stop event through ``is_set`` / ``wait`` / ``set``
+can be moved this way. The broadcaster stays a thread: it is the ring's
+consumer, and ring coalescing and zero-copy reads only work in-process.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+
+POLL_INTERVAL = 0.5 # Seconds between checks for shutdown or a dead child
+CHILD_QUEUE_SIZE = 1000 # Batches buffered between the child and the forwarder
+JOIN_TIMEOUT = 2.0 # Seconds to wait for the child to exit before terminating it
+
+
+class QueueWriter:
+    """
+    Child-side stand-in for the RingBuffer producer interface.
+
+    Each push_many() call crosses the process boundary as a single queue
+    item, so a whole decoded batch costs one pickle and one pipe write.
+    Like the ring, it never blocks: batches that do not fit are dropped and
+    counted in ``dropped``.
+    """
+
+    def __init__(self, mp_queue):
+        self.mp_queue = mp_queue
+        self.dropped = 0
+
+    def push_many(self, items):
+        """
+        Sends a batch of records to the parent process.
+
+        Returns:
+            The number of records queued
+        """
+        if not items:
+            return 0
+        try:
+            self.mp_queue.put_nowait(list(items))
+        except queue.Full:
+            self.dropped += len(items)
+            return 0
+        return len(items)
+
+    def put_nowait(self, item):
+        """Sends a single record, raising queue.Full if it was dropped."""
+        if not self.push_many([item]):
+            raise queue.Full
+
+
+def _child_main(target, args, mp_queue, stop_event, cpu):
+    """Entry point of the child process."""
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (OSError, ValueError) as e:
+            logging.warning(f"Process Worker: Could not pin to CPU {cpu}: {e}")
+    try:
+        target(args, QueueWriter(mp_queue), stop_event)
+    except KeyboardInterrupt:
+        # Ctrl+C reaches the whole process group; the parent handles shutdown
+        pass
+
+
+def process_target(target, cpu=None):
+    """
+    Wraps a producer's ``run_client(args, data_queue, stop_event)`` so that
+    it runs in a child process.
+
+    The returned function has the same signature and is meant to be the
+    target of a thread in the parent: that thread starts the child, forwards
+    its batches into ``data_queue`` and returns when ``stop_event`` is set
+    (stopping the child) or when the child exits.
+
+    Args:
+        target: Module-level producer function (must be picklable)
+        cpu: Optional CPU core to pin the child process to
+
+    Returns:
+        Thread target taking (args, data_queue, stop_event)
+    """
+    def run(args, data_queue, stop_event):
+        mp_queue = multiprocessing.Queue(CHILD_QUEUE_SIZE)
+        child_stop = multiprocessing.Event()
+        proc = multiprocessing.Process(
+            target=_child_main,
+            args=(target, args, mp_queue, child_stop, cpu),
+            name=getattr(target, '__module__', 'worker'),
+            daemon=True
+        )
+        proc.start()
+        logging.info(f"Process Worker: Started {proc.name} as pid {proc.pid}")
+        try:
+            while not stop_event.is_set():
+                try:
+                    batch = mp_queue.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if not proc.is_alive():
+                        logging.error(f"Process Worker: {proc.name} exited with code {proc.exitcode}")
+                        break
+                    continue
+                data_queue.push_many(batch)
+        finally:
+            child_stop.set()
+            proc.join(JOIN_TIMEOUT)
+            if proc.is_alive():
+                logging.warning(f"Process Worker: {proc.name} did not stop, terminating it")
+                proc.terminate()
+                proc.join(JOIN_TIMEOUT)
+            mp_queue.cancel_join_thread()
+            mp_queue.close()
+    return run
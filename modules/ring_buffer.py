@@ -0,0 +1,342 @@
+"""
+Bounded multi-producer / single-consumer ring buffer.
+
+This module provides the hand-off between the client threads (ADS-B, FLARM,
+sample traffic) and the broadcaster thread. It replaces ``queue.Queue``, whose
+every put/get acquires a mutex and signals a condition variable.
+
+Design:
+    - Slots are a preallocated list whose size is a power of two, so a
+      sequence number maps to a slot with a single ``& mask``.
+    - Producers serialise on a small lock only to claim the next tail
+      sequence number and fill the slot.
+    - The single consumer never takes a lock: it owns the head counter and
+      clears each slot's busy flag once the item has been taken.
+    - The consumer only sleeps when the ring is empty; producers signal it
+      only when it is actually waiting, and only the first producer to see
+      it waiting does so, so the common path is signal-free.
+
+Interface is a subset of ``queue.Queue`` (``put``, ``put_nowait``, ``get``,
+``get_nowait``, ``qsize``, ``empty``, ``full``) so callers can swap it in
+without changes, and raises the same ``queue.Full`` / ``queue.Empty``. The
+consumer can also use ``pop``, ``read_zero_copy`` or ``read_many_zero_copy``
+to avoid the exception path on an empty ring.
+
+Overflow policy:
+    Traffic data is stale-tolerant, so producers should never stall on a
+    full ring. Non-blocking puts drop the newest item and count it in
+    ``dropped``. Optionally, a ``coalesce_key`` function lets a new update
+    for the same aircraft be merged into its still-pending record instead
+    of taking another slot, so a burst of messages for one ICAO address
+    costs one slot and one broadcast frame.
+"""
+import queue
+import threading
+import time
+
+DEFAULT_MAXSIZE = 1000
+
+
+class RingBuffer:
+    """
+    Bounded MPSC ring buffer with a lock-free consumer side.
+
+    Args:
+        maxsize: Maximum number of queued items. The slot array is rounded
+                 up to the next power of two, but ``maxsize`` is enforced.
+        coalesce_key: Optional callable returning a key for an item (or None
+                      to never coalesce it). A dict item whose key matches a
+                      record the consumer has not started reading is merged
+                      into that record with ``dict.update``.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, coalesce_key=None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        capacity = 1 << (maxsize - 1).bit_length()
+        self.maxsize = maxsize
+        self._mask = capacity - 1
+        self._slots = [None] * capacity
+        self._busy = [False] * capacity
+        self._head = 0  # Next sequence number to read (consumer only)
+        self._tail = 0  # Next sequence number to write (producers, under lock)
+        self._put_lock = threading.Lock()
+        # Consumer wake-up; only set when the consumer is parked
+        self._waiting = False
+        self._not_empty = threading.Event()
+        # Coalescing state: key -> sequence number of its pending record
+        self._coalesce_key = coalesce_key
+        self._pending = {}
+        self._reading = -1  # Sequence number the consumer last claimed
+        self.dropped = 0  # Items rejected by non-blocking puts on a full ring
+        self.coalesced = 0  # Items merged into an already-pending record
+
+    # --- Producer side ---
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Appends an item to the ring.
+
+        Args:
+            item: Object to enqueue (must not be None, which marks an empty read)
+            block: If True, wait for a free slot; otherwise raise queue.Full
+            timeout: Maximum seconds to wait when blocking (None = forever)
+        """
+        if self._try_put(item):
+            return
+        if not block:
+            self.dropped += 1
+            raise queue.Full
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.0001
+        while not self._try_put(item):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise queue.Full
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+    def put_nowait(self, item):
+        """Appends an item without blocking, raising queue.Full if full."""
+        self.put(item, block=False)
+
+    def push_many(self, items):
+        """
+        Appends several items under a single lock acquisition, without
+        blocking. Items that do not fit are dropped and counted in ``dropped``.
+
+        Args:
+            items: Sequence of objects to enqueue (none may be None)
+
+        Returns:
+            The number of items queued (or coalesced)
+        """
+        queued = 0
+        with self._put_lock:
+            for item in items:
+                if not self._put_locked(item):
+                    break
+                queued += 1
+        if queued:
+            self._wake_consumer()
+        self.dropped += len(items) - queued
+        return queued
+
+    def _try_put(self, item):
+        with self._put_lock:
+            if not self._put_locked(item):
+                return False
+        self._wake_consumer()
+        return True
+
+    def _wake_consumer(self):
+        """
+        Wakes the consumer if it is parked in wait(). A burst of puts only
+        signals once: Event.set() takes a lock, is_set() is a plain read.
+        """
+        if self._waiting and not self._not_empty.is_set():
+            self._not_empty.set()
+
+    def _put_locked(self, item):
+        """Queues or coalesces one item. Called with the put lock held."""
+        key = None
+        if self._coalesce_key is not None:
+            key = self._coalesce_key(item)
+            if key is not None and self._try_coalesce(key, item):
+                return True
+        tail = self._tail
+        if tail - self._head >= self.maxsize:
+            return False
+        idx = tail & self._mask
+        # The consumer may still be releasing this slot from a previous lap
+        while self._busy[idx]:
+            time.sleep(0)
+        self._slots[idx] = item
+        self._busy[idx] = True
+        self._tail = tail + 1
+        if key is not None:
+            self._pending[key] = tail
+            if len(self._pending) > 2 * self.maxsize:
+                self._prune_pending()
+        return True
+
+    def _try_coalesce(self, key, item):
+        """
+        Merges ``item`` into the pending record for ``key``, if there is one.
+        Called with the put lock held.
+
+        Returns:
+            True if the item was merged and must not be queued separately
+        """
+        seq = self._pending.get(key)
+        if seq is None or seq <= self._reading:
+            return False
+        pending = self._slots[seq & self._mask]
+        if not (isinstance(pending, dict) and isinstance(item, dict)):
+            return False
+        pending.update(item)
+        # The consumer claims a record before reading it. If it claimed this
+        # one while we were merging, it may have missed the update, so fall
+        # back to queueing the item as well; a duplicate is harmless, a lost
+        # update is not.
+        if seq <= self._reading:
+            return False
+        self.coalesced += 1
+        return True
+
+    def _prune_pending(self):
+        """Forgets keys whose records the consumer has already taken."""
+        reading = self._reading
+        self._pending = {k: seq for k, seq in self._pending.items() if seq > reading}
+
+    # --- Consumer side (single thread only) ---
+
+    def pop(self):
+        """
+        Removes and returns the oldest item, or None if the ring is empty.
+        Wait-free; must only be called from the consumer thread.
+        """
+        head = self._head
+        idx = head & self._mask
+        if not self._busy[idx]:
+            return None
+        self._reading = head
+        item = self._slots[idx]
+        self._slots[idx] = None
+        self._head = head + 1
+        self._busy[idx] = False
+        return item
+
+    def read_zero_copy(self, callback):
+        """
+        Passes the oldest item to ``callback`` without first removing it.
+
+        The slot stays occupied while the callback runs and is released only
+        after it returns (or raises), so the producer cannot reuse the slot
+        until the consumer is finished with the record.
+
+        Args:
+            callback: Callable taking the item
+
+        Returns:
+            True if an item was handled, False if the ring was empty
+        """
+        head = self._head
+        idx = head & self._mask
+        if not self._busy[idx]:
+            return False
+        self._reading = head
+        try:
+            callback(self._slots[idx])
+        finally:
+            self._slots[idx] = None
+            self._head = head + 1
+            self._busy[idx] = False
+        return True
+
+    def read_many_zero_copy(self, callback, max_items):
+        """
+        Like read_zero_copy(), for up to ``max_items`` items in one call, so
+        draining a burst costs one method call rather than one per item.
+        Each slot is released as soon as its callback returns (or raises;
+        the exception propagates and the remaining items stay queued).
+
+        Args:
+            callback: Callable taking each item
+            max_items: Maximum number of items to handle
+
+        Returns:
+            The number of items handled
+        """
+        slots = self._slots
+        busy = self._busy
+        mask = self._mask
+        head = start = self._head
+        end = start + max_items
+        while head < end:
+            idx = head & mask
+            if not busy[idx]:
+                break
+            self._reading = head
+            try:
+                callback(slots[idx])
+            finally:
+                slots[idx] = None
+                head += 1
+                self._head = head
+                busy[idx] = False
+        return head - start
+
+    def get_nowait(self):
+        """Removes and returns the oldest item, raising queue.Empty if empty."""
+        item = self.pop()
+        if item is None:
+            raise queue.Empty
+        return item
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the oldest item.
+
+        Args:
+            block: If True, wait for an item; otherwise raise queue.Empty
+            timeout: Maximum seconds to wait when blocking (None = forever)
+        """
+        item = self.pop()
+        if item is not None:
+            return item
+        if not block:
+            raise queue.Empty
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if not self.wait(remaining):
+                raise queue.Empty
+            item = self.pop()
+            if item is not None:
+                return item
+
+    def wait(self, timeout=None):
+        """
+        Blocks until at least one item is available, without removing it.
+
+        Args:
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            True if an item is available, False on timeout
+        """
+        if self._busy[self._head & self._mask]:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._not_empty.clear()
+            self._waiting = True
+            # Re-check after advertising that we are waiting, so a producer
+            # that published just before the flag was raised is not missed
+            if self._busy[self._head & self._mask]:
+                self._waiting = False
+                return True
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting = False
+                    return False
+            self._not_empty.wait(remaining)
+            self._waiting = False
+            if self._busy[self._head & self._mask]:
+                return True
+
+    # --- Introspection ---
+
+    def qsize(self):
+        """Returns the approximate number of queued items."""
+        return max(0, self._tail - self._head)
+
+    def empty(self):
+        """Returns True if the ring is (approximately) empty."""
+        return self.qsize() == 0
+
+    def full(self):
+        """Returns True if the ring is (approximately) full."""
+        return self.qsize() >= self.maxsize
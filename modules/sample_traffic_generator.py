@@ -17,11 +17,21 @@ import json
 from datetime import datetime, timezone
 import logging
 
+from .ring_buffer import RingBuffer
+
 # Constants for position calculations
 EARTH_RADIUS_NM = 3440.065  # Earth radius in nautical miles
 NM_TO_DEGREE_LAT = 1/60.0   # 1 nautical mile = 1/60 degree of latitude
 DEFAULT_PATTERN_SIZE = 5.0  # Default distance (in NM) from center to edge of pattern
 
+# (latitude sign, longitude sign) of travel along each X pattern arm
+ARM_DIRECTIONS = {
+    'NW-SE': (-1, 1),   # Northwest to Southeast: -lat, +lon
+    'SE-NW': (1, -1),   # Southeast to Northwest: +lat, -lon
+    'NE-SW': (-1, -1),  # Northeast to Southwest: -lat, -lon
+    'SW-NE': (1, 1),    # Southwest to Northeast: +lat, +lon
+}
+
 
 def run_generator(args, data_queue, stop_event):
     """
@@ -210,13 +220,15 @@ class SampleTrafficGenerator:
         self.ownship_data['longitude'] = 153.0251
         self.ownship_data['altitude_geo'] = 1500
     
-    def _calculate_position(self, direction, offset):
+    def _calculate_position(self, direction, offset, lon_scale=None):
         """
         Calculate a position along one of the X pattern arms.
         
         Args:
             direction: Direction string ('NW-SE', 'SE-NW', 'NE-SW', 'SW-NE')
             offset: Position offset along the arm (0.0 to 1.0)
+            lon_scale: Degrees of longitude per NM at the ownship latitude;
+                       computed if not given
             
         Returns:
             Tuple of (latitude, longitude)
@@ -224,41 +236,25 @@ class SampleTrafficGenerator:
         if self.ownship_data['latitude'] is None or self.ownship_data['longitude'] is None:
             logging.error("Sample Traffic Generator: Unable to calculate position - ownship position unknown")
             return None, None
-        
+
+        signs = ARM_DIRECTIONS.get(direction)
+        if signs is None:
+            return None, None
+
         # Center position
         center_lat = self.ownship_data['latitude']
         center_lon = self.ownship_data['longitude']
-        
-        # Convert offset to -0.5 to 0.5 range centered on ownship
-        centered_offset = offset - 0.5
-        
-        # Scale by pattern size
-        scaled_offset = centered_offset * self.pattern_size
-        
-        # Calculate deltas based on direction
-        if direction == 'NW-SE':
-            # Northwest to Southeast: -lat, +lon
-            delta_lat = -scaled_offset * NM_TO_DEGREE_LAT
-            delta_lon = scaled_offset * NM_TO_DEGREE_LAT / math.cos(math.radians(center_lat))
-        elif direction == 'SE-NW':
-            # Southeast to Northwest: +lat, -lon
-            delta_lat = scaled_offset * NM_TO_DEGREE_LAT
-            delta_lon = -scaled_offset * NM_TO_DEGREE_LAT / math.cos(math.radians(center_lat))
-        elif direction == 'NE-SW':
-            # Northeast to Southwest: -lat, -lon
-            delta_lat = -scaled_offset * NM_TO_DEGREE_LAT
-            delta_lon = -scaled_offset * NM_TO_DEGREE_LAT / math.cos(math.radians(center_lat))
-        elif direction == 'SW-NE':
-            # Southwest to Northeast: +lat, +lon
-            delta_lat = scaled_offset * NM_TO_DEGREE_LAT
-            delta_lon = scaled_offset * NM_TO_DEGREE_LAT / math.cos(math.radians(center_lat))
-        else:
-            return None, None
-        
+        if lon_scale is None:
+            lon_scale = NM_TO_DEGREE_LAT / math.cos(math.radians(center_lat))
+
+        # Convert offset to -0.5 to 0.5 range centered on ownship,
+        # then scale by pattern size
+        scaled_offset = (offset - 0.5) * self.pattern_size
+
         # Calculate new position
-        new_lat = center_lat + delta_lat
-        new_lon = center_lon + delta_lon
-        
+        new_lat = center_lat + signs[0] * scaled_offset * NM_TO_DEGREE_LAT
+        new_lon = center_lon + signs[1] * scaled_offset * lon_scale
+
         return new_lat, new_lon
     
     def _update_aircraft_positions(self):
@@ -266,6 +262,8 @@ class SampleTrafficGenerator:
         Update each aircraft's position based on pattern direction and elapsed time.
         """
         current_time = time.time()
+        # Same for every aircraft this tick, so work it out once
+        lon_scale = NM_TO_DEGREE_LAT / math.cos(math.radians(self.ownship_data['latitude']))
         logging.debug(f"Sample Traffic Generator: Updating positions with center at lat={self.ownship_data['latitude']}, lon={self.ownship_data['longitude']}")
         
         for aircraft in self.aircraft:
@@ -288,7 +286,8 @@ class SampleTrafficGenerator:
             # Calculate new position along the arm
             aircraft['lat'], aircraft['lon'] = self._calculate_position(
                 aircraft['direction'],
-                aircraft['position_offset']
+                aircraft['position_offset'],
+                lon_scale
             )
             
             # Debug output
@@ -299,9 +298,10 @@ class SampleTrafficGenerator:
     
     def _send_aircraft_data(self):
         """
-        Format and send aircraft data to the shared queue.
+        Format and send aircraft data to the shared queue in one batch.
         """
-        traffic_count = 0
+        records = []
+        timestamp = datetime.now(timezone.utc)
         for aircraft in self.aircraft:
             # Skip aircraft without calculated positions
             if aircraft['lat'] is None or aircraft['lon'] is None:
@@ -309,7 +309,7 @@ class SampleTrafficGenerator:
                 continue
             
             # Format data for queue, matching adsb_client structure + adding defaults
-            data = {
+            records.append({
                 'source': 'sample_traffic',
                 'icao': aircraft['icao'],
                 'callsign': aircraft['callsign'],
@@ -320,21 +320,17 @@ class SampleTrafficGenerator:
                 'track': aircraft['track'],       # Explicitly include track data
                 'speed': aircraft['speed'],
                 'vert_rate': aircraft['vert_rate'],
-                'timestamp': datetime.now(timezone.utc),
+                'timestamp': timestamp,
                 'nic': 8,  # Default NIC for simulation
                 'nac_p': 8, # Default NACp for simulation
                 'emitter_cat': 1, # Default Emitter Category (Light Aircraft)
                 'airborne_status': True # Assume airborne for simulation
-            }
-            
-            # Add to queue
-            try:
-                self.data_queue.put(data, block=False)
-                traffic_count += 1
-            except queue.Full:
-                logging.warning(f"Sample Traffic: Queue full, unable to send {aircraft['id']}")
-                # Skip if queue is full
-                pass
+            })
+        
+        # Add to queue; records that don't fit are dropped rather than blocking
+        traffic_count = self.data_queue.push_many(records)
+        if traffic_count < len(records):
+            logging.warning(f"Sample Traffic: Queue full, unable to send {len(records) - traffic_count} aircraft")
         
         if traffic_count > 0:
             logging.info(f"Sample Traffic: Sent {traffic_count} aircraft to queue")
@@ -357,7 +353,7 @@ if __name__ == '__main__':
         spoof_gps = True
         sample_traffic_distance = 5.0
 
-    test_queue = queue.Queue()
+    test_queue = RingBuffer()
     test_stop_event = threading.Event()
 
     # Start the generator in a thread
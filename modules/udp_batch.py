@@ -0,0 +1,225 @@
+"""
+Batched UDP transmission for GDL90 frames.
+
+Sending every GDL90 frame with its own ``sendto`` costs one syscall per
+frame. This module sends a burst of frames with as few syscalls as the
+platform allows:
+
+    1. UDP GSO (Linux 4.18+): when every frame in the burst has the same
+       length, the frames are concatenated and handed to the kernel in one
+       ``sendmsg`` with a ``UDP_SEGMENT`` control message; the kernel splits
+       it back into individual datagrams.
+    2. ``sendmmsg(2)`` (Linux, via ctypes): one syscall for the whole burst.
+    3. Plain ``sendto`` per frame everywhere else.
+
+When the socket is connected to the destination, every path sends without
+an address (``send``, ``sendmsg`` and ``sendmmsg`` with no ``msg_name``),
+so the kernel uses the route cached at ``connect()`` time.
+
+Unsupported paths are detected at runtime and permanently disabled for the
+sender, so the fallback costs nothing after the first attempt.
+"""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import socket
+import struct
+import sys
+
+# Linux socket option for UDP generic segmentation offload
+SOL_UDP = getattr(socket, 'SOL_UDP', 17)
+UDP_SEGMENT = getattr(socket, 'UDP_SEGMENT', 103)
+UDP_MAX_SEGMENTS = 64  # Kernel limit on segments per GSO send
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+
+# Errors that mean "this kernel/NIC can't do GSO", not "the send failed"
+_GSO_UNSUPPORTED_ERRNOS = (errno.EINVAL, errno.EIO, errno.ENOPROTOOPT, errno.EOPNOTSUPP)
+
+
+class _Iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p),
+                ('iov_len', ctypes.c_size_t)]
+
+
+class _Msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p),
+                ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_Iovec)),
+                ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p),
+                ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class _Mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _Msghdr),
+                ('msg_len', ctypes.c_uint)]
+
+
+def _load_sendmmsg():
+    """Returns libc's sendmmsg function, or None if unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_Mmsghdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+def _make_sockaddr_in(address):
+    """Builds a raw ``struct sockaddr_in`` for an (ip, port) tuple."""
+    ip, port = address
+    return (struct.pack('=H', socket.AF_INET) + struct.pack('>H', port)
+            + socket.inet_aton(ip) + bytes(8))
+
+
+def _packet_buffer(packet):
+    """
+    Returns a ctypes object pointing at a packet, for use in an iovec.
+
+    Writable buffers (bytearray, or memoryview slices of one) and bytes are
+    referenced in place; only other read-only buffers have to be copied. The
+    returned object keeps the packet's memory alive and must be held until
+    the send has completed.
+    """
+    if type(packet) is bytes:
+        # c_char_p points straight at the bytes object's internal buffer
+        return ctypes.c_char_p(packet)
+    try:
+        return (ctypes.c_char * len(packet)).from_buffer(packet)
+    except TypeError:
+        return (ctypes.c_char * len(packet)).from_buffer_copy(packet)
+
+
+def _buffer_address(buffer):
+    """Returns the address of the packet data behind a _packet_buffer()."""
+    if isinstance(buffer, ctypes.c_char_p):
+        return ctypes.cast(buffer, ctypes.c_void_p).value
+    return ctypes.addressof(buffer)
+
+
+class UdpBatchSender:
+    """
+    Sends bursts of UDP datagrams to a single destination.
+
+    Args:
+        sock: A bound/configured UDP socket
+        address: Destination (ip, port) tuple
+        connected: True if ``sock`` is already connected to ``address``
+    """
+
+    def __init__(self, sock, address, connected=False):
+        self.sock = sock
+        self.address = address
+        self.connected = connected
+        self.use_gso = sys.platform.startswith('linux')
+        self.use_sendmmsg = _sendmmsg is not None
+        self._sockaddr = None
+        if self.use_sendmmsg and not connected:
+            try:
+                self._sockaddr = ctypes.create_string_buffer(_make_sockaddr_in(address))
+            except (OSError, ValueError, struct.error):
+                # Not a dotted-quad address; sendto can still resolve it
+                self.use_sendmmsg = False
+
+    def send(self, packets):
+        """
+        Sends all packets, using the cheapest available mechanism.
+
+        Args:
+            packets: Sequence of bytes-like datagrams
+
+        Returns:
+            The number of datagrams handed to the kernel
+
+        Raises:
+            OSError: On a real socket failure
+        """
+        count = len(packets)
+        if count == 0:
+            return 0
+        if count == 1:
+            self._send_one(packets[0])
+            return 1
+        if self.use_gso and count <= UDP_MAX_SEGMENTS:
+            sent = self._send_gso(packets)
+            if sent is not None:
+                return sent
+        if self.use_sendmmsg:
+            sent = self._send_mmsg(packets)
+            if sent is not None:
+                return sent
+        for packet in packets:
+            self._send_one(packet)
+        return count
+
+    def _send_one(self, packet):
+        """Sends a single datagram."""
+        if self.connected:
+            self.sock.send(packet)
+        else:
+            self.sock.sendto(packet, self.address)
+
+    def _send_gso(self, packets):
+        """Sends equal-length packets as one GSO super-datagram."""
+        seg_size = len(packets[0])
+        for packet in packets:
+            if len(packet) != seg_size:
+                return None
+        try:
+            args = ([b''.join(packets)],
+                    [(SOL_UDP, UDP_SEGMENT, struct.pack('=H', seg_size))],
+                    MSG_DONTWAIT)
+            if self.connected:
+                self.sock.sendmsg(*args)
+            else:
+                self.sock.sendmsg(*args, self.address)
+            return len(packets)
+        except OSError as e:
+            if e.errno in _GSO_UNSUPPORTED_ERRNOS:
+                logging.info(f"UDP Batch: GSO unavailable ({e}), falling back to sendmmsg/sendto")
+                self.use_gso = False
+                return None
+            raise
+
+    def _send_mmsg(self, packets):
+        """Sends all packets with a single sendmmsg(2) call."""
+        count = len(packets)
+        iovecs = (_Iovec * count)()
+        msgs = (_Mmsghdr * count)()
+        # Keep the pointers alive for the duration of the call
+        buffers = [_packet_buffer(p) for p in packets]
+        if self._sockaddr is None:
+            # Connected socket: the kernel uses the peer address
+            name_ptr = None
+            name_len = 0
+        else:
+            name_ptr = ctypes.cast(self._sockaddr, ctypes.c_void_p)
+            name_len = ctypes.sizeof(self._sockaddr) - 1  # create_string_buffer adds a NUL
+        for i, packet in enumerate(packets):
+            iovecs[i].iov_base = _buffer_address(buffers[i])
+            iovecs[i].iov_len = len(packet)
+            hdr = msgs[i].msg_hdr
+            hdr.msg_name = name_ptr
+            hdr.msg_namelen = name_len
+            hdr.msg_iov = ctypes.pointer(iovecs[i])
+            hdr.msg_iovlen = 1
+        sent = _sendmmsg(self.sock.fileno(), msgs, count, MSG_DONTWAIT)
+        if sent < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSYS:
+                self.use_sendmmsg = False
+                return None
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                # Socket buffer full: drop the burst rather than stall
+                return 0
+            raise OSError(err, f"sendmmsg failed: {errno.errorcode.get(err, err)}")
+        return sent
@@ -0,0 +1,135 @@
+"""
+Tests for the ADS-B client's message filtering and decoding.
+"""
+import socket
+import threading
+import unittest
+from unittest import mock
+from modules import adsb_client
+from modules.adsb_client import AdsbClient, split_raw_messages
+from modules.ring_buffer import RingBuffer
+
+# Even/odd airborne position pair, identification and velocity messages
+EVEN_POSITION = '8D40621D58C382D690C8AC2863A7'
+ODD_POSITION = '8D40621D58C386435CC412692AD6'
+IDENTIFICATION = '8D4840D6202CC371C32CE0576098'
+VELOCITY = '8D485020994409940838175B284F'
+
+
+class TestAdsbClient(unittest.TestCase):
+    """Test cases for AdsbClient.handle_messages without a dump1090 connection."""
+
+    def setUp(self):
+        self.queue = RingBuffer()
+        self.client = AdsbClient('127.0.0.1', 30002, self.queue, threading.Event())
+
+    def _drain(self):
+        items = []
+        while True:
+            item = self.queue.pop()
+            if item is None:
+                return items
+            items.append(item)
+
+    def test_filter_messages(self):
+        """Only framed or bare DF17 messages with a valid CRC pass the filter."""
+        corrupt = IDENTIFICATION[:-1] + '9'
+        frames = self.client.filter_messages([
+            ['*' + IDENTIFICATION + ';', 1.0],
+            [VELOCITY, 2.0],
+            ['5D4840D6A1B2C3', 3.0],  # DF11, short
+            [corrupt, 4.0],
+            ['ZZ' + IDENTIFICATION[2:], 5.0],
+            [IDENTIFICATION[:2] + '\xe9' + IDENTIFICATION[3:], 6.0],  # non-ASCII byte
+        ])
+        self.assertEqual([(msg, ts) for msg, _, ts in frames],
+                         [(IDENTIFICATION, 1.0), (VELOCITY, 2.0)])
+        self.assertEqual(frames[0][1], bytes.fromhex(IDENTIFICATION))
+
+    def test_identification_and_velocity(self):
+        """Callsign and velocity messages are decoded into queue records."""
+        self.client.handle_messages([[IDENTIFICATION, 1.0], [VELOCITY, 2.0]])
+        ident, vel = self._drain()
+        self.assertEqual(ident['icao'], '4840D6')
+        self.assertEqual(ident['callsign'], 'KLM1023')
+        self.assertEqual(vel['icao'], '485020')
+        self.assertEqual(vel['speed'], 159)
+        self.assertEqual(vel['vert_rate'], -832)
+        self.assertAlmostEqual(vel['track'], 182.88, places=2)
+
+    def test_position_pair(self):
+        """A position is reported once both CPR frames have been seen."""
+        self.client.handle_messages([[ODD_POSITION, 1457996400.0]])
+        self.client.handle_messages([[EVEN_POSITION, 1457996402.0]])
+        first, second = self._drain()
+        self.assertEqual(first['altitude'], 38000)
+        self.assertNotIn('latitude', first)
+        self.assertAlmostEqual(second['latitude'], 52.25720, places=5)
+        self.assertAlmostEqual(second['longitude'], 3.91937, places=5)
+
+    def test_cpr_state_is_bounded(self):
+        """CPR state is evicted for the aircraft updated longest ago."""
+        def position_message(icao):
+            return EVEN_POSITION[:2] + icao + EVEN_POSITION[8:]
+
+        with mock.patch.object(adsb_client, 'MAX_CPR_AIRCRAFT', 2):
+            for icao in ('AAAAAA', 'BBBBBB', 'AAAAAA', 'CCCCCC'):
+                msg = position_message(icao)
+                self.client.decode_message(msg, bytes.fromhex(msg), 1.0)
+        self.assertEqual(list(self.client.cpr_data), ['AAAAAA', 'CCCCCC'])
+
+    def test_decode_error_keeps_earlier_updates(self):
+        """An unexpected decoder error still queues the updates already made."""
+        with mock.patch('modules.adsb_client.pms.adsb.velocity', side_effect=RuntimeError("bad")), \
+                self.assertLogs('modules.adsb_client', level='ERROR'):
+            self.client.handle_messages([[IDENTIFICATION, 1.0], [VELOCITY, 2.0]])
+        records = self._drain()
+        self.assertEqual([r['icao'] for r in records], ['4840D6'])
+
+    def test_batch_coalesced_per_aircraft(self):
+        """Updates for one aircraft within a batch are merged into one record."""
+        self.client.handle_messages([[ODD_POSITION, 1457996400.0],
+                                     [IDENTIFICATION, 1457996401.0],
+                                     [EVEN_POSITION, 1457996402.0]])
+        position, ident = self._drain()
+        self.assertEqual(position['icao'], '40621D')
+        self.assertEqual(position['altitude'], 38000)
+        self.assertAlmostEqual(position['latitude'], 52.25720, places=5)
+        self.assertEqual(position['timestamp'], 1457996402.0)
+        self.assertEqual(ident['callsign'], 'KLM1023')
+
+
+class TestRawFeed(unittest.TestCase):
+    """Test cases for reading dump1090's raw-format feed."""
+
+    def test_split_raw_messages(self):
+        """Frames are split on ';' and stripped of '*' and line endings."""
+        data = b'*' + IDENTIFICATION.encode() + b';\r\n*5D4840D6A1B2C3;\ngarbage;\n*' + VELOCITY.encode() + b';'
+        self.assertEqual(split_raw_messages(data, 7.0),
+                         [[IDENTIFICATION, 7.0], ['5D4840D6A1B2C3', 7.0], [VELOCITY, 7.0]])
+        self.assertEqual(split_raw_messages(b'', 7.0), [])
+
+    def test_reads_messages_split_across_packets(self):
+        """A message split across TCP segments is reassembled before decoding."""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        self.addCleanup(server.close)
+        data = ('*' + IDENTIFICATION + ';\n*' + VELOCITY + ';\n').encode()
+        queue = RingBuffer()
+        client = AdsbClient('127.0.0.1', server.getsockname()[1], queue, threading.Event())
+        # Smaller than two lines, so every read ends part-way through a message
+        client._buffer = bytearray(40)
+        client.connect()
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(data)
+        client.read_messages()
+        client.close()
+        records = [queue.pop(), queue.pop()]
+        self.assertEqual([r['icao'] for r in records], ['4840D6', '485020'])
+        self.assertIsNone(queue.pop())
+
+
+if __name__ == '__main__':
+    unittest.main()
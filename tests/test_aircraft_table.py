@@ -0,0 +1,62 @@
+"""
+Tests for the per-aircraft state table used by the broadcaster.
+"""
+import unittest
+from modules.aircraft_table import AircraftTable
+
+
+class TestAircraftTable(unittest.TestCase):
+    """Test cases for AircraftTable."""
+
+    def test_partial_updates_merge(self):
+        """Partial updates for one aircraft merge into a single record."""
+        table = AircraftTable()
+        table.update('ABC123', {'altitude': 5000}, now=100.0)
+        table.update('ABC123', {'latitude': 34.0, 'longitude': -118.0}, now=101.0)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.get('ABC123'), {
+            'altitude': 5000, 'latitude': 34.0, 'longitude': -118.0
+        })
+        self.assertEqual(table.last_seen['ABC123'], 101.0)
+
+    def test_take_dirty_returns_each_aircraft_once(self):
+        """Many updates per aircraft produce one dirty entry per aircraft."""
+        table = AircraftTable()
+        for i in range(5):
+            table.update('ABC123', {'altitude': 1000 + i})
+            table.update('DEF456', {'altitude': 2000 + i})
+        dirty = table.take_dirty()
+        self.assertEqual([icao for icao, _ in dirty], ['ABC123', 'DEF456'])
+        self.assertEqual(dirty[0][1]['altitude'], 1004)
+        self.assertEqual(table.take_dirty(), [])
+
+    def test_take_dirty_rate_limit(self):
+        """Aircraft taken within min_interval stay dirty until they are due."""
+        table = AircraftTable()
+        table.update('ABC123', {'altitude': 1000})
+        self.assertEqual(len(table.take_dirty(1.0, now=10.0)), 1)
+        self.assertIsNone(table.next_due(1.0))
+        table.update('ABC123', {'altitude': 1100})
+        table.update('DEF456', {'altitude': 2000})
+        # The new aircraft goes out at once, the repeat is held back
+        self.assertEqual([icao for icao, _ in table.take_dirty(1.0, now=10.4)], ['DEF456'])
+        self.assertEqual(table.next_due(1.0), 11.0)
+        self.assertEqual(table.take_dirty(1.0, now=10.9), [])
+        taken = table.take_dirty(1.0, now=11.0)
+        self.assertEqual(taken, [('ABC123', {'altitude': 1100})])
+        self.assertIsNone(table.next_due(1.0))
+
+    def test_expire_removes_stale_aircraft(self):
+        """Aircraft older than max_age are dropped, including pending dirty flags."""
+        table = AircraftTable()
+        table.update('OLD001', {'altitude': 1000}, now=100.0)
+        table.update('NEW001', {'altitude': 2000}, now=125.0)
+        self.assertEqual(table.expire(max_age=30.0, now=140.0), ['OLD001'])
+        self.assertNotIn('OLD001', table)
+        self.assertIn('NEW001', table)
+        self.assertEqual(list(table.last_seen), ['NEW001'])
+        self.assertEqual([icao for icao, _ in table.take_dirty()], ['NEW001'])
+
+
+if __name__ == '__main__':
+    unittest.main()
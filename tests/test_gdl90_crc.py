@@ -1,8 +1,9 @@
 """
 Tests for the GDL90 CRC calculation functionality.
 """
+import random
 import unittest
-from modules.gdl90.crc import calculate_crc
+from modules.gdl90.crc import calculate_crc, calculate_crc_py, crc16
 
 
 class TestGDL90CRC(unittest.TestCase):
@@ -45,6 +46,20 @@ class TestGDL90CRC(unittest.TestCase):
         # For a more thorough test, we could calculate the CRC manually and compare,
         # but that would essentially duplicate the implementation
 
+    def test_matches_reference_table_implementation(self):
+        """The binascii-based CRC matches the ICD table algorithm for any input."""
+        rng = random.Random(90)
+        for length in range(0, 48):
+            for _ in range(20):
+                data = bytes(rng.randrange(256) for _ in range(length))
+                self.assertEqual(calculate_crc(data), calculate_crc_py(data), data.hex())
+
+    def test_crc16_accepts_buffer_slices(self):
+        """crc16 over a memoryview slice matches calculate_crc over a copy."""
+        buf = bytearray(range(40))
+        view = memoryview(buf)[5:33]
+        self.assertEqual(crc16(view).to_bytes(2, 'little'), calculate_crc(bytes(view)))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
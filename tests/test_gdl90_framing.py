@@ -1,9 +1,10 @@
 """
 Tests for the GDL90 framing functionality.
 """
+import random
 import unittest
-from modules.gdl90.framing import byte_stuff, frame_message
-from modules.gdl90.constants import FLAG_BYTE
+from modules.gdl90.framing import byte_stuff, frame_message, frame_message_into
+from modules.gdl90.constants import FLAG_BYTE, CONTROL_ESCAPE, ESCAPE_XOR
 
 
 class TestGDL90Framing(unittest.TestCase):
@@ -31,6 +32,36 @@ class TestGDL90Framing(unittest.TestCase):
         self.assertTrue(framed_message.endswith(bytes([FLAG_BYTE])))
         self.assertGreater(len(framed_message), 2)  # Should be more than just flags
 
+    def test_frame_message_into(self):
+        """Framing into a preallocated buffer matches frame_message()."""
+        payload = bytes([0x00, 0x7E, 0x14, 0x7D, 0xAB])
+        buf = bytearray(32)
+        written = frame_message_into(buf, 3, payload)
+        self.assertEqual(bytes(buf[3:3 + written]), frame_message(payload))
+        self.assertEqual(len(buf), 32)  # Never grows the buffer
+        with self.assertRaises(ValueError):
+            frame_message_into(buf, 30, payload)
+
+
+    def test_byte_stuff_matches_bytewise_escape(self):
+        """byte_stuff escapes exactly the flag and escape bytes, in place."""
+        def reference(data):
+            out = bytearray()
+            for byte in data:
+                if byte in (FLAG_BYTE, CONTROL_ESCAPE):
+                    out += bytes([CONTROL_ESCAPE, byte ^ ESCAPE_XOR])
+                else:
+                    out.append(byte)
+            return bytes(out)
+
+        rng = random.Random(7)
+        for _ in range(500):
+            # Bias towards the special bytes, including runs of them
+            data = bytes(rng.choice((0x7D, 0x7E, 0x5D, 0x5E, rng.randrange(256)))
+                         for _ in range(rng.randrange(32)))
+            self.assertEqual(byte_stuff(data), reference(data), data.hex())
+        self.assertEqual(byte_stuff(bytearray(b'\x7d\x7e')), b'\x7d\x5d\x7d\x5e')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -6,7 +6,9 @@ import struct
 import time
 
 # Import from modules
-from modules.gdl90.messages import create_heartbeat_message
+from modules.gdl90.messages import (create_heartbeat_message, create_heartbeat_payload,
+                                    set_heartbeat_timestamp, heartbeat_timestamp,
+                                    create_heartbeat_frame_template, frame_heartbeat)
 from modules.gdl90.framing import frame_message
 from modules.gdl90.crc import calculate_crc
 from modules.gdl90.constants import FLAG_BYTE, CONTROL_ESCAPE, ESCAPE_XOR
@@ -89,5 +91,30 @@ class TestGDL90HeartbeatEncodingDecoding(unittest.TestCase):
         
         print(f"Expected timestamp: {test_timestamp}, Decoded timestamp: {decoded_seconds}")
 
+    def test_heartbeat_template_reuse(self):
+        """A cached heartbeat payload can be re-stamped and re-framed."""
+        template = create_heartbeat_payload(gps_valid=True)
+        # 0x1FFFF sets bit 16, which lives in status byte 2
+        for test_timestamp in (0x1FFFF / 10, 12345.6, 0.0):
+            ts_field = int(round(test_timestamp * 10))
+            set_heartbeat_timestamp(template, ts_field)
+            decoded = decode_heartbeat(parse_frame(frame_message(bytes(template)))[0])
+            self.assertEqual(decoded["GPS Valid"], True)
+            self.assertAlmostEqual(float(decoded["Seconds Since Midnight"]), test_timestamp, delta=0.1)
+
+        # Noon is 43200 s since midnight, encoded in 0.1 s units
+        noon = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(heartbeat_timestamp(noon), 432000)
+
+    def test_heartbeat_frame_template(self):
+        """A pre-encoded heartbeat frames identically to the full encoder."""
+        for gps_valid in (True, False):
+            template = create_heartbeat_frame_template(gps_valid=gps_valid)
+            payload = create_heartbeat_payload(gps_valid=gps_valid)
+            # Includes bit 16 set, and timestamps whose bytes need stuffing
+            for ts_field in (0, 1, 0x7E, 0x7D7E, 0x1007E, 0x1FFFF, 432000, 863999):
+                set_heartbeat_timestamp(payload, ts_field)
+                self.assertEqual(frame_heartbeat(template, ts_field), frame_message(bytes(payload)))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Tests for the frame parsing and decoding helpers in gdl90_tester.
+"""
+import random
+import unittest
+from datetime import datetime, timezone
+from gdl90_tester import (
+    unstuff_data, unstuff_and_check, parse_frame, parse_frames,
+    decode_lat_lon, decode_icao_address, decode_vertical_velocity, decode_callsign,
+    decode_heartbeat, decode_ownship_geo_altitude, decode_traffic_report,
+    read_traffic_report, read_traffic_reports, format_for_display, utc_time_str
+)
+from modules.gdl90.constants import CONTROL_ESCAPE, ESCAPE_XOR
+from modules.gdl90.crc import calculate_crc
+from modules.gdl90 import create_traffic_report
+from modules.gdl90.framing import byte_stuff, frame_message
+
+
+def reference_unstuff(stuffed_data):
+    """Byte-at-a-time unstuffing, as originally implemented."""
+    unstuffed = bytearray()
+    escape_next = False
+    for byte in stuffed_data:
+        if escape_next:
+            unstuffed.append(byte ^ ESCAPE_XOR)
+            escape_next = False
+        elif byte == CONTROL_ESCAPE:
+            escape_next = True
+        else:
+            unstuffed.append(byte)
+    return bytes(unstuffed)
+
+
+class TestUnstuffData(unittest.TestCase):
+    """Test cases for GDL90 byte unstuffing."""
+
+    def test_round_trip(self):
+        """Unstuffing reverses byte_stuff for payloads full of flag/escape bytes."""
+        rng = random.Random(7)
+        for _ in range(200):
+            data = bytes(rng.choice((0x7E, 0x7D, 0x00, 0x5D, 0x5E, 0xFF)) for _ in range(rng.randrange(40)))
+            self.assertEqual(unstuff_data(byte_stuff(data)), data)
+
+    def test_matches_reference_on_malformed_input(self):
+        """Doubled and trailing escapes are handled like the byte-wise loop."""
+        for data in (b'\x7d', b'\x01\x7d', b'\x7d\x7d', b'\x7d\x7d\x7d\x5e', b'\x01\x7d\x7d\x02'):
+            self.assertEqual(unstuff_data(data), reference_unstuff(data), data.hex())
+        self.assertEqual(unstuff_data(b'\x01\x02'), b'\x01\x02')
+
+    def test_unstuff_and_check(self):
+        """The fused check agrees with calculate_crc, including 1-byte payloads."""
+        rng = random.Random(11)
+        for length in (1, 2, 3, 28):
+            payload = bytes(rng.randrange(256) for _ in range(length))
+            body = byte_stuff(payload + calculate_crc(payload))
+            self.assertEqual(unstuff_and_check(body), (payload, True))
+            corrupt = byte_stuff(payload + bytes(b ^ 0xFF for b in calculate_crc(payload)))
+            self.assertEqual(unstuff_and_check(corrupt), (payload, False))
+        self.assertEqual(unstuff_and_check(b'\x01\x02'), (None, False))
+
+
+class TestParseFrame(unittest.TestCase):
+    """Test cases for extracting frames from a receive buffer."""
+
+    def test_parses_consecutive_frames(self):
+        """Frames are returned in order with the bytes each one consumed."""
+        first = frame_message(b'\x00\x7e\x7d\x01')
+        second = frame_message(b'\x0b\x01\x02\x03\x04')
+        buffer = first + second
+        payload, consumed = parse_frame(buffer)
+        self.assertEqual((payload, consumed), (b'\x00\x7e\x7d\x01', len(first)))
+        payload, consumed = parse_frame(buffer[consumed:])
+        self.assertEqual((payload, consumed), (b'\x0b\x01\x02\x03\x04', len(second)))
+
+    def test_offset_cursor(self):
+        """With an offset, frames are read in place and counts are relative to it."""
+        first = frame_message(b'\x00\x01\x02')
+        second = frame_message(b'\x0b\x7e\x04')
+        buffer = bytearray(first + second)
+        head = 0
+        payloads = []
+        while True:
+            payload, consumed = parse_frame(buffer, head)
+            if not consumed:
+                break
+            payloads.append(payload)
+            head += consumed
+        self.assertEqual(payloads, [b'\x00\x01\x02', b'\x0b\x7e\x04'])
+        self.assertEqual(head, len(buffer))
+
+    def test_resumes_partial_frame_scan(self):
+        """A partial frame can be completed without rescanning its start."""
+        frame = frame_message(b'\x0b\x01\x02\x03\x04')
+        buffer = bytearray(b'\x99' + frame[:4])
+        self.assertEqual(parse_frame(buffer, 1), (None, 0))
+        scan_from = len(buffer)
+        buffer += frame[4:]
+        self.assertEqual(parse_frame(buffer, 1, len(buffer), scan_from),
+                         (b'\x0b\x01\x02\x03\x04', len(frame)))
+
+    def test_parse_frames_single_pass(self):
+        """All complete frames are returned at once; a partial tail is left."""
+        good = frame_message(b'\x0b\x01\x02\x03\x04')
+        bad = bytearray(good)
+        bad[2] ^= 0x01
+        partial = frame_message(b'\x00\x01\x02')[:-1]
+        buffer = bytearray(b'\x99' + good + bytes(bad) + good + partial)
+        payloads, offset = parse_frames(buffer, 1)
+        self.assertEqual(payloads, [b'\x0b\x01\x02\x03\x04', None, b'\x0b\x01\x02\x03\x04'])
+        self.assertEqual(offset, len(buffer) - len(partial))
+        self.assertEqual(parse_frames(buffer, offset), ([], offset))
+
+    def test_bad_crc_is_consumed(self):
+        """A corrupt frame is consumed but yields no payload."""
+        frame = bytearray(frame_message(b'\x0b\x01\x02\x03\x04'))
+        frame[2] ^= 0x01
+        self.assertEqual(parse_frame(bytes(frame)), (None, len(frame)))
+
+    def test_incomplete_frame_waits(self):
+        """A frame without its closing flag consumes nothing."""
+        self.assertEqual(parse_frame(frame_message(b'\x0b\x01\x02')[:-1]), (None, 0))
+
+
+class TestValueDecoders(unittest.TestCase):
+    """Test cases for the GDL90 field decoders."""
+
+    def test_decode_lat_lon(self):
+        """24-bit semicircles decode with sign extension."""
+        self.assertEqual(decode_lat_lon(b'\x00\x00\x00'), 0.0)
+        self.assertEqual(decode_lat_lon(b'\x40\x00\x00'), 90.0)
+        self.assertEqual(decode_lat_lon(b'\xc0\x00\x00'), -90.0)
+        self.assertEqual(decode_lat_lon(b'\x80\x00\x00'), -180.0)
+        self.assertIsNone(decode_lat_lon(b'\x00\x00'))
+
+    def test_decode_icao_address(self):
+        """ICAO addresses decode to six upper-case hex digits."""
+        self.assertEqual(decode_icao_address(b'\xab\x01\x02'), 'AB0102')
+        self.assertEqual(decode_icao_address(b'\x00\x00\x0f'), '00000F')
+        self.assertEqual(decode_icao_address(b'\x01'), 'Invalid')
+
+    def test_decode_vertical_velocity(self):
+        """12-bit two's complement in units of 64 fpm; 0x800 means unknown."""
+        self.assertEqual(decode_vertical_velocity(b'\x00\x01'), 64.0)
+        self.assertEqual(decode_vertical_velocity(b'\xf7\xff'), 2047 * 64.0)
+        self.assertEqual(decode_vertical_velocity(b'\x0f\xff'), -64.0)
+        self.assertEqual(decode_vertical_velocity(b'\x08\x01'), -2047 * 64.0)
+        self.assertIsNone(decode_vertical_velocity(b'\x08\x00'))
+
+    def test_decode_callsign(self):
+        """Non-printable bytes become '?' and surrounding spaces are stripped."""
+        self.assertEqual(decode_callsign(b'QFA1    '), 'QFA1')
+        self.assertEqual(decode_callsign(b' N12\x00AB '), 'N12?AB')
+        self.assertEqual(decode_callsign(b'\xff' * 8), '?' * 8)
+        self.assertEqual(decode_callsign(b'SHORT'), 'Invalid')
+
+    def test_decode_heartbeat_timestamp(self):
+        """The 17-bit timestamp combines status byte 2 bit 7 with a LE short."""
+        decoded = decode_heartbeat(b'\x00\x81\xc1\x10\x27')
+        self.assertTrue(decoded["GPS Valid"])
+        self.assertEqual(decoded["Seconds Since Midnight"], f"{(0x10000 + 10000) / 10.0:.1f}")
+        self.assertIsNone(decode_heartbeat(b'\x00\x81\xc1\x10'))
+
+    def test_decode_ownship_geo_altitude(self):
+        """Geometric altitude and VPL are read as big-endian shorts."""
+        decoded = decode_ownship_geo_altitude(b'\x0b\x01\x2c\x00\x0a')
+        self.assertEqual(decoded["Altitude (Geo)"], "500 ft")
+        self.assertEqual(decoded["VPL"], "Code 10")
+        decoded = decode_ownship_geo_altitude(b'\x0b\xff\xff\xff\xff')
+        self.assertEqual(decoded["Altitude (Geo)"], "Invalid")
+        self.assertEqual(decoded["VPL"], "Unknown (>185m)")
+
+    def test_decode_traffic_report(self):
+        """Position, altitude and velocity fields survive an encode/decode round trip."""
+        frame = create_traffic_report('ABC123', -33.5, 151.25, 3500, 9, 8, 9, 120, -640, 90.0, 1, 'QFA1')
+        decoded = decode_traffic_report(parse_frame(frame)[0])
+        self.assertEqual(decoded["ICAO"], "ABC123")
+        self.assertEqual(decoded["Latitude"], "-33.50000")
+        self.assertEqual(decoded["Longitude"], "151.24998")
+        self.assertEqual(decoded["Altitude (Press)"], "3500 ft")
+        self.assertEqual((decoded["NIC"], decoded["NACp"]), (8, 9))
+        self.assertEqual(decoded["Ground Speed"], "120 kts")
+        self.assertEqual(decoded["Vertical Velocity"], "-640 fpm")
+        self.assertIsNone(decode_traffic_report(bytes(27)))
+
+    def test_read_traffic_report_raw_values(self):
+        """read_traffic_report returns numbers; formatting is a separate step."""
+        frame = create_traffic_report('ABC123', -33.5, 151.25, 3500, 9, 8, 9, 120, -640, 90.0, 1, 'QFA1')
+        payload = parse_frame(frame)[0]
+        record = read_traffic_report(payload)
+        self.assertEqual(record.icao, 'ABC123')
+        self.assertAlmostEqual(record.latitude, -33.5, places=4)
+        self.assertEqual(record.altitude_pressure, 3500.0)
+        self.assertEqual(record.vertical_velocity, -640.0)
+        self.assertEqual(format_for_display(record), decode_traffic_report(payload))
+
+    def test_read_traffic_reports_batch(self):
+        """Batch reading matches reading each payload, skipping short ones."""
+        rng = random.Random(15)
+        payloads = [bytes([0x14]) + bytes(rng.randrange(256) for _ in range(27)) for _ in range(50)]
+        batch = payloads[:10] + [b'\x14\x00'] + [p + b'\x00' for p in payloads[10:]]
+        self.assertEqual(read_traffic_reports(batch), [read_traffic_report(p) for p in payloads])
+        self.assertEqual(read_traffic_reports([]), [])
+
+
+
+class TestUtcTimeStr(unittest.TestCase):
+    """Test cases for the cached output timestamp."""
+
+    def test_matches_datetime_formatting(self):
+        """Output matches datetime's %H:%M:%S.%f truncated to milliseconds."""
+        for now in (1700000000.0, 1700000000.999, 1700000000.5, 1700000001.25, 1700003599.001):
+            expected = datetime.fromtimestamp(now, timezone.utc).strftime("%H:%M:%S.%f")[:-3]
+            self.assertEqual(utc_time_str(now), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
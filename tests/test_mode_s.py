@@ -0,0 +1,88 @@
+"""
+Tests for the Mode-S message helpers.
+"""
+import math
+import unittest
+from modules.mode_s import crc24, cpr_nl, cpr_word, global_position, airborne_position
+
+
+class TestModeSCRC24(unittest.TestCase):
+    """Test cases for the table-driven Mode-S CRC-24."""
+
+    def test_valid_messages(self):
+        """Uncorrupted DF17 messages have a zero remainder."""
+        for msg in ('8D406B902015A678D4D220AA4BDA',
+                    '8D40621D58C382D690C8AC2863A7',
+                    '8D4840D6202CC371C32CE0576098'):
+            self.assertEqual(crc24(bytes.fromhex(msg)), 0, msg)
+
+    def test_corrupted_message(self):
+        """A single flipped bit gives a non-zero remainder."""
+        data = bytearray.fromhex('8D406B902015A678D4D220AA4BDA')
+        data[6] ^= 0x01
+        self.assertNotEqual(crc24(data), 0)
+
+    def test_matches_bitwise_reference(self):
+        """The table-driven CRC matches a bit-at-a-time polynomial division."""
+        def reference(data):
+            n = int.from_bytes(data, 'big')
+            bits = len(data) * 8
+            for shift in range(bits - 1, 23, -1):
+                if n & (1 << shift):
+                    n ^= 0x1FFF409 << (shift - 24)
+            return n
+
+        for msg in ('8D406B902015A678D4D220AA4BDA', '5D4840D6A1B2C3', 'FFFFFFFFFFFFFFFFFFFFFFFFFFFF'):
+            data = bytes.fromhex(msg)
+            self.assertEqual(crc24(data), reference(data), msg)
+            self.assertEqual(crc24(memoryview(data)), reference(data), msg)
+
+
+class TestModeSCPR(unittest.TestCase):
+    """Test cases for the airborne CPR position decode."""
+
+    EVEN = bytes.fromhex('8D40621D58C382D690C8AC2863A7')
+    ODD = bytes.fromhex('8D40621D58C386435CC412692AD6')
+
+    def test_nl_matches_formula(self):
+        """The table lookup agrees with the NL() formula away from boundaries."""
+        def reference(lat):
+            a = 1 - math.cos(math.pi / 30)
+            b = math.cos(math.radians(abs(lat))) ** 2
+            return math.floor(2 * math.pi / math.acos(1 - a / b))
+
+        for lat in (0.5, -10.0, 10.5, 33.3, -52.25, 75.0, 86.0):
+            self.assertEqual(cpr_nl(lat), reference(lat), lat)
+
+    def test_nl_limits(self):
+        """The equator, the 87 degree boundary and the poles."""
+        self.assertEqual(cpr_nl(0.0), 59)
+        self.assertEqual(cpr_nl(87.0), 2)
+        self.assertEqual(cpr_nl(-87.0), 2)
+        self.assertEqual(cpr_nl(88.0), 1)
+        self.assertEqual(cpr_nl(-90.0), 1)
+
+    def test_airborne_position(self):
+        """Known even/odd pair decodes to the reference position."""
+        lat, lon = airborne_position(self.EVEN, self.ODD, 1457996402, 1457996400)
+        self.assertAlmostEqual(lat, 52.25720, places=5)
+        self.assertAlmostEqual(lon, 3.91937, places=5)
+
+    def test_cpr_word(self):
+        """The CPR word holds the 17-bit latitude above the 17-bit longitude."""
+        word = cpr_word(self.EVEN)
+        self.assertEqual(word >> 17, 93000)
+        self.assertEqual(word & 0x1FFFF, 51372)
+        self.assertEqual(global_position(word, cpr_word(self.ODD), 2, 1),
+                         airborne_position(self.EVEN, self.ODD, 2, 1))
+
+    def test_airborne_position_uses_latest_frame(self):
+        """The latitude comes from whichever frame arrived last."""
+        lat_even, _ = airborne_position(self.EVEN, self.ODD, 2, 1)
+        lat_odd, _ = airborne_position(self.EVEN, self.ODD, 1, 2)
+        self.assertAlmostEqual(lat_even, 52.25720, places=5)
+        self.assertAlmostEqual(lat_odd, 52.26578, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the NMEA helpers.
+"""
+import unittest
+from modules.nmea import (nmea_to_decimal, parse_record, GgaRecord, RmcRecord, PgrmzRecord,
+                          GGA_NO_FIX)
+
+
+class TestNmeaToDecimal(unittest.TestCase):
+    """Test cases for NMEA coordinate conversion."""
+
+    def test_hemispheres(self):
+        """North/east are positive, south/west negative."""
+        self.assertAlmostEqual(nmea_to_decimal(4807.038), 48.1173, places=6)
+        self.assertAlmostEqual(nmea_to_decimal(4807.038, True), -48.1173, places=6)
+        self.assertAlmostEqual(nmea_to_decimal(1131.000), 11.516666666, places=6)
+        self.assertAlmostEqual(nmea_to_decimal(15301.506, True), -153.0251, places=6)
+
+    def test_matches_integer_split(self):
+        """Same result as splitting off the degrees with int()."""
+        for nmea in (0.0, 59.9999, 100.0, 2728.188, 8959.9999, 17959.9999):
+            degrees = int(nmea / 100)
+            expected = degrees + (nmea - degrees * 100) / 60.0
+            self.assertAlmostEqual(nmea_to_decimal(nmea), expected, places=12)
+
+
+
+class TestParseRecord(unittest.TestCase):
+    """Test cases for decoding GPS sentences into records."""
+
+    GGA = ['123519.00', '4807.038', 'N', '01131.000', 'E', '1', '08', '0.9', '545.4', 'M', '46.9', 'M', '', '']
+
+    def test_gga(self):
+        """GGA yields the position in decimal degrees and altitude in feet."""
+        record = parse_record('GPGGA', self.GGA)
+        self.assertIsInstance(record, GgaRecord)
+        self.assertAlmostEqual(record.latitude, 48.1173, places=6)
+        self.assertAlmostEqual(record.longitude, 11.516666666, places=6)
+        self.assertAlmostEqual(record.altitude_geo, 545.4 * 3.28084)
+        self.assertTrue(record.gps_valid)
+        self.assertEqual(parse_record('GNGGA', self.GGA), record)
+
+    def test_gga_without_fix(self):
+        """Empty position fields give the no-fix record; short sentences none."""
+        fields = list(self.GGA)
+        fields[5] = ''
+        self.assertEqual(parse_record('GPGGA', fields), GGA_NO_FIX)
+        fields = list(self.GGA)
+        fields[8] = ''
+        self.assertIsNone(parse_record('GPGGA', fields).altitude_geo)
+        self.assertIsNone(parse_record('GPGGA', self.GGA[:9]))
+        fields[1] = 'bad'
+        with self.assertRaises(ValueError):
+            parse_record('GPGGA', fields)
+
+    def test_rmc(self):
+        """Only active RMC sentences are decoded."""
+        fields = ['123519', 'A', '4807.038', 'N', '01131.000', 'E', '022.4', '084.4', '230394', '003.1', 'W']
+        self.assertEqual(parse_record('GPRMC', fields), RmcRecord(speed=22.4, track=84.4))
+        fields[7] = ''
+        self.assertEqual(parse_record('GNRMC', fields), RmcRecord(speed=22.4, track=None))
+        fields[1] = 'V'
+        self.assertIsNone(parse_record('GPRMC', fields))
+
+    def test_pgrmz(self):
+        """PGRMZ altitude is converted to feet."""
+        self.assertEqual(parse_record('PGRMZ', ['1234', 'F', '2']), PgrmzRecord(1234))
+        self.assertEqual(parse_record('PGRMZ', ['100', 'm', '2']), PgrmzRecord(328))
+        self.assertIsNone(parse_record('PGRMZ', ['', 'F', '2']))
+        self.assertIsNone(parse_record('PFLAA', ['0', '100', '200', '50', '1', 'FLR12345']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Tests for running a producer worker in a child process.
+"""
+import queue
+import threading
+import time
+import unittest
+from modules.process_worker import QueueWriter, process_target
+from modules.ring_buffer import RingBuffer
+
+
+def _producer(args, data_queue, stop_event):
+    """Child-side producer: one batch, then one record, then wait for stop."""
+    data_queue.push_many([{'n': i} for i in range(args['count'])])
+    data_queue.put_nowait({'n': 'last'})
+    if args.get('wait'):
+        stop_event.wait(10)
+
+
+class TestProcessWorker(unittest.TestCase):
+    """Test cases for process_target and QueueWriter."""
+
+    def _run(self, args, stop_after=None):
+        ring = RingBuffer()
+        stop = threading.Event()
+        thread = threading.Thread(target=process_target(_producer), args=(args, ring, stop))
+        thread.start()
+        if stop_after is not None:
+            time.sleep(stop_after)
+            stop.set()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        items = []
+        while not ring.empty():
+            items.append(ring.get_nowait())
+        return items
+
+    def test_records_reach_parent_ring(self):
+        """Batches from the child are forwarded in order; child exit ends the thread."""
+        items = self._run({'count': 3})
+        self.assertEqual(items, [{'n': 0}, {'n': 1}, {'n': 2}, {'n': 'last'}])
+
+    def test_stop_event_stops_child(self):
+        """Setting the parent's stop event stops a waiting child promptly."""
+        start = time.monotonic()
+        items = self._run({'count': 1, 'wait': True}, stop_after=0.5)
+        self.assertEqual(items, [{'n': 0}, {'n': 'last'}])
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_queue_writer_drops_when_full(self):
+        """A full queue drops the batch instead of blocking."""
+        writer = QueueWriter(queue.Queue(1))
+        self.assertEqual(writer.push_many([1, 2]), 2)
+        self.assertEqual(writer.push_many([3, 4]), 0)
+        self.assertEqual(writer.dropped, 2)
+        with self.assertRaises(queue.Full):
+            writer.put_nowait(5)
+        self.assertEqual(writer.push_many([]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
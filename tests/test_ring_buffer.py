@@ -0,0 +1,180 @@
+"""
+Tests for the MPSC ring buffer used between clients and the broadcaster.
+"""
+import queue
+import threading
+import unittest
+from modules.ring_buffer import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test cases for the RingBuffer implementation."""
+
+    def test_fifo_order(self):
+        """Items come out in the order they were put in."""
+        ring = RingBuffer(maxsize=8)
+        for i in range(5):
+            ring.put_nowait({'seq': i})
+        self.assertEqual(ring.qsize(), 5)
+        self.assertEqual([ring.pop()['seq'] for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertIsNone(ring.pop())
+        self.assertTrue(ring.empty())
+
+    def test_maxsize_is_enforced(self):
+        """maxsize is honoured even though slots are rounded to a power of two."""
+        ring = RingBuffer(maxsize=5)
+        for i in range(5):
+            ring.put(i + 1, block=False)
+        self.assertTrue(ring.full())
+        with self.assertRaises(queue.Full):
+            ring.put_nowait(99)
+        self.assertEqual(ring.get_nowait(), 1)
+        ring.put_nowait(6)
+        self.assertEqual([ring.pop() for _ in range(5)], [2, 3, 4, 5, 6])
+
+    def test_get_nowait_raises_empty(self):
+        """get_nowait mirrors queue.Queue semantics when empty."""
+        ring = RingBuffer()
+        with self.assertRaises(queue.Empty):
+            ring.get_nowait()
+        with self.assertRaises(queue.Empty):
+            ring.get(timeout=0.01)
+
+    def test_wraparound(self):
+        """Sequence numbers keep working after many laps of the slot array."""
+        ring = RingBuffer(maxsize=4)
+        for i in range(1, 100):
+            ring.put_nowait(i)
+            self.assertEqual(ring.pop(), i)
+
+    def test_read_zero_copy_releases_after_callback(self):
+        """The slot is held during the callback and freed afterwards."""
+        ring = RingBuffer(maxsize=1)
+        ring.put_nowait('record')
+        seen = []
+
+        def handler(item):
+            seen.append(item)
+            # Still occupied while the consumer is working on it
+            self.assertTrue(ring.full())
+
+        self.assertTrue(ring.read_zero_copy(handler))
+        self.assertEqual(seen, ['record'])
+        self.assertTrue(ring.empty())
+        self.assertFalse(ring.read_zero_copy(handler))
+
+    def test_read_zero_copy_releases_on_error(self):
+        """A failing callback does not wedge the ring."""
+        ring = RingBuffer(maxsize=2)
+        ring.put_nowait('bad')
+
+        def handler(item):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            ring.read_zero_copy(handler)
+        self.assertTrue(ring.empty())
+
+    def test_read_many_zero_copy(self):
+        """Bulk reads stop at max_items or when the ring is empty."""
+        ring = RingBuffer(maxsize=4)
+        seen = []
+        for lap in range(3):
+            for i in range(3):
+                ring.put_nowait((lap, i))
+            self.assertEqual(ring.read_many_zero_copy(seen.append, 2), 2)
+            self.assertEqual(ring.read_many_zero_copy(seen.append, 8), 1)
+            self.assertEqual(ring.read_many_zero_copy(seen.append, 8), 0)
+        self.assertEqual(seen, [(lap, i) for lap in range(3) for i in range(3)])
+        self.assertTrue(ring.empty())
+
+        def handler(item):
+            if item == 'bad':
+                raise RuntimeError("boom")
+            seen.append(item)
+
+        for item in ('ok', 'bad', 'next'):
+            ring.put_nowait(item)
+        with self.assertRaises(RuntimeError):
+            ring.read_many_zero_copy(handler, 8)
+        # The failing item was released, the rest is still queued
+        self.assertEqual(ring.qsize(), 1)
+        self.assertEqual(ring.pop(), 'next')
+
+    def test_blocking_get_wakes_on_put(self):
+        """A blocked consumer is woken by a producer on another thread."""
+        ring = RingBuffer()
+        timer = threading.Timer(0.05, ring.put_nowait, args=('hello',))
+        timer.start()
+        try:
+            self.assertEqual(ring.get(timeout=2.0), 'hello')
+        finally:
+            timer.cancel()
+
+    def test_multiple_producers(self):
+        """Concurrent producers never lose or duplicate items."""
+        ring = RingBuffer(maxsize=64)
+        per_producer = 500
+
+        def produce(base):
+            for i in range(per_producer):
+                ring.put((base, i), timeout=5.0)
+
+        producers = [threading.Thread(target=produce, args=(p,)) for p in range(3)]
+        for t in producers:
+            t.start()
+        received = [ring.get(timeout=5.0) for _ in range(3 * per_producer)]
+        for t in producers:
+            t.join()
+        self.assertEqual(len(set(received)), 3 * per_producer)
+        for p in range(3):
+            seqs = [i for base, i in received if base == p]
+            self.assertEqual(seqs, sorted(seqs))
+
+    def test_nonblocking_put_counts_drops(self):
+        """A full ring drops the newest item instead of blocking."""
+        ring = RingBuffer(maxsize=2)
+        ring.put_nowait('a')
+        ring.put_nowait('b')
+        for _ in range(3):
+            with self.assertRaises(queue.Full):
+                ring.put('c', block=False)
+        self.assertEqual(ring.dropped, 3)
+        self.assertEqual([ring.pop(), ring.pop()], ['a', 'b'])
+
+    def test_push_many(self):
+        """push_many queues what fits and drops the rest."""
+        ring = RingBuffer(maxsize=3)
+        self.assertEqual(ring.push_many(['a', 'b']), 2)
+        self.assertEqual(ring.push_many(['c', 'd', 'e']), 1)
+        self.assertEqual(ring.dropped, 2)
+        self.assertEqual([ring.pop() for _ in range(3)], ['a', 'b', 'c'])
+        self.assertIsNone(ring.pop())
+
+    def test_coalesces_pending_updates(self):
+        """Updates for a queued key merge into its record instead of a new slot."""
+        ring = RingBuffer(maxsize=2, coalesce_key=lambda d: d.get('icao'))
+        ring.put_nowait({'icao': 'ABC123', 'altitude': 1000})
+        ring.put_nowait({'icao': 'ABC123', 'latitude': 34.0})
+        ring.put_nowait({'icao': 'DEF456', 'altitude': 2000})
+        # Ring is full, but a pending key can still be updated
+        ring.put_nowait({'icao': 'DEF456', 'altitude': 2100})
+        self.assertEqual(ring.qsize(), 2)
+        self.assertEqual(ring.coalesced, 2)
+        self.assertEqual(ring.pop(), {'icao': 'ABC123', 'altitude': 1000, 'latitude': 34.0})
+        self.assertEqual(ring.pop(), {'icao': 'DEF456', 'altitude': 2100})
+
+    def test_no_coalescing_once_consumed(self):
+        """A record the consumer has taken is never modified afterwards."""
+        ring = RingBuffer(maxsize=4, coalesce_key=lambda d: d.get('icao'))
+        ring.put_nowait({'icao': 'ABC123', 'altitude': 1000})
+        first = ring.pop()
+        ring.put_nowait({'icao': 'ABC123', 'altitude': 1100})
+        ring.put_nowait({'seq': 1})  # No key: always queued
+        self.assertEqual(first, {'icao': 'ABC123', 'altitude': 1000})
+        self.assertEqual(ring.pop(), {'icao': 'ABC123', 'altitude': 1100})
+        self.assertEqual(ring.pop(), {'seq': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for batched UDP transmission.
+"""
+import socket
+import unittest
+from modules.udp_batch import UdpBatchSender
+
+
+class TestUdpBatchSender(unittest.TestCase):
+    """Test cases for UdpBatchSender over the loopback interface."""
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.receiver.settimeout(1.0)
+        self.address = self.receiver.getsockname()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.sock.close()
+        self.receiver.close()
+
+    def _receive(self, count):
+        return [self.receiver.recv(2048) for _ in range(count)]
+
+    def test_equal_length_burst(self):
+        """Equal-length frames arrive as separate datagrams in order."""
+        packets = [bytes([0x7E, i, 0x7E]) for i in range(5)]
+        sender = UdpBatchSender(self.sock, self.address)
+        self.assertEqual(sender.send(packets), 5)
+        self.assertEqual(self._receive(5), packets)
+
+    def test_mixed_length_burst(self):
+        """Frames of differing lengths are not merged together."""
+        packets = [b'\x7e\x00\x7e', b'\x7e\x14\x01\x02\x7e', b'\x7e\x0b\x7e']
+        sender = UdpBatchSender(self.sock, self.address)
+        self.assertEqual(sender.send(packets), 3)
+        self.assertEqual(self._receive(3), packets)
+
+    def test_sendmmsg_bytes_in_place(self):
+        """Bytes frames, including NUL bytes, go out intact via sendmmsg."""
+        packets = [b'\x7e\x00\x00\x7e', b'\x7e\x0a\x00\x01\x7e', bytes(3)]
+        sender = UdpBatchSender(self.sock, self.address)
+        sender.use_gso = False
+        self.assertEqual(sender.send(packets), 3)
+        self.assertEqual(self._receive(3), packets)
+
+    def test_sendto_fallback(self):
+        """With batching disabled every frame still goes out individually."""
+        packets = [b'one', b'two', b'six']
+        sender = UdpBatchSender(self.sock, self.address)
+        sender.use_gso = False
+        sender.use_sendmmsg = False
+        self.assertEqual(sender.send(packets), 3)
+        self.assertEqual(self._receive(3), packets)
+
+    def test_memoryview_slices(self):
+        """Slices of one preallocated buffer are sent without being merged."""
+        buf = bytearray(b'\x7e\x14\x01\x7e\x7e\x0a\x02\x03\x7e')
+        view = memoryview(buf)
+        packets = [view[0:4], view[4:9]]
+        sender = UdpBatchSender(self.sock, self.address)
+        self.assertEqual(sender.send(packets), 2)
+        self.assertEqual(self._receive(2), [bytes(p) for p in packets])
+
+    def test_empty_and_single(self):
+        """Empty bursts are a no-op and single frames use sendto."""
+        sender = UdpBatchSender(self.sock, self.address)
+        self.assertEqual(sender.send([]), 0)
+        self.assertEqual(sender.send([b'solo']), 1)
+        self.assertEqual(self._receive(1), [b'solo'])
+
+    def test_connected_socket(self):
+        """A connected socket sends without an address on every path."""
+        self.sock.connect(self.address)
+        packets = [b'\x7e\x00\x7e', b'\x7e\x14\x7e']
+        sender = UdpBatchSender(self.sock, self.address, connected=True)
+        self.assertEqual(sender.send([b'solo']), 1)
+        self.assertEqual(sender.send(packets), 2)  # GSO when available
+        sender.use_gso = False
+        self.assertEqual(sender.send(packets), 2)  # sendmmsg
+        sender.use_sendmmsg = False
+        self.assertEqual(sender.send(packets), 2)  # send
+        self.assertEqual(self._receive(7), [b'solo'] + packets * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()